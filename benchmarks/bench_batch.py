@@ -0,0 +1,42 @@
+"""batch_solve on a braided Colossal maze: many goals per start (an analytics
+workload) against one `BFS_Solver.solve` per pair, in-process and with a
+worker pool.
+
+Usage: python benchmarks/bench_batch.py [starts] [goals_per_start]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import ArraySquareGrid
+from maze_algorithms import RecursiveBacktracker, BFS_Solver
+from maze_batch import batch_solve
+
+def timed(fn):
+    t0 = time.perf_counter(); fn()
+    return time.perf_counter() - t0
+
+def main():
+    starts = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    goals = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    random.seed(3)
+    grid = ArraySquareGrid(161, 161, 2)
+    RecursiveBacktracker().generate(grid)
+    grid.braid(0.3)
+    cells = list(grid.each_cell())
+    pairs = [(s, random.choice(cells)) for s in random.sample(cells, starts) for _ in range(goals)]
+    solver = BFS_Solver()
+    sample = pairs[:20]
+    per_pair = timed(lambda: [solver.solve(grid, a, b) for a, b in sample]) / len(sample)
+    print(f"{len(pairs)} queries, {starts} starts, {os.cpu_count()} CPU(s)")
+    print(f"{'one solve per pair (est.)':<28}{per_pair * len(pairs):>9.2f}s")
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        for paths in (False, True):
+            t = timed(lambda: batch_solve(grid, pairs, paths=paths, workers=workers, chunk=2))
+            print(f"{f'batch, {workers} worker(s)' + (', paths' if paths else ''):<28}{t:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
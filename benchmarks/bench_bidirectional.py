@@ -0,0 +1,41 @@
+"""Nodes expanded and wall time of every solver on each topology.
+
+Each maze is a perfect Backtracker maze; the figures are totals over random
+start/goal pairs, with expansions counted from the `visit` events.
+
+Usage: python benchmarks/bench_bidirectional.py [rows] [columns] [pairs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid
+from maze_algorithms import (RecursiveBacktracker, BFS_Solver, DFS_Solver, AStar_Solver,
+                             BidirectionalBFS_Solver, BidirectionalAStar_Solver)
+
+SOLVERS = [("BFS", BFS_Solver()), ("DFS", DFS_Solver()), ("A*", AStar_Solver()),
+           ("Bi-BFS", BidirectionalBFS_Solver()), ("Bi-A*", BidirectionalAStar_Solver())]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 121
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 161
+    pairs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f"{'topology':<10}{'solver':<8}{'expanded':>10}{'seconds':>10}")
+    for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+        random.seed(1)
+        grid = GridClass(rows, cols)
+        RecursiveBacktracker().generate(grid)
+        cells = list(grid.each_cell())
+        tasks = [random.sample(cells, 2) for _ in range(pairs)]
+        for name, solver in SOLVERS:
+            expanded = sum(1 for s, g in tasks for e in solver.solve_step(grid, s, g) if e.kind == "visit")
+            t0 = time.perf_counter()
+            for s, g in tasks: solver.solve(grid, s, g)
+            elapsed = time.perf_counter() - t0
+            print(f"{grid.topology:<10}{name:<8}{expanded // pairs:>10}{elapsed / pairs:>10.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""A full `MazeBuildJob` (generation, braiding, geometry, path index) on a
+cache miss, a memory hit and a disk hit, for Colossal mazes.
+
+Without arcade installed the shape triangulation is replaced by a no-op, as in
+the tests, so the times cover the CPU-side work only.
+
+Usage: python benchmarks/bench_cache.py [levels]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import arcade
+except ImportError:
+    print("arcade not installed: shape triangulation is skipped")
+    sys.modules["arcade"], sys.modules["arcade.shape_list"] = MagicMock(), MagicMock()
+    sys.modules["arcade"].shape_list.create_polygon = lambda points, color: None  # no mock call records
+
+from renderer import MazeRenderer
+from maze_builder import MazeBuildJob
+from maze_cache import MazeCache, maze_key
+from maze_topology import SquareCellGrid, ArraySquareGrid, HexCellGrid
+from maze_algorithms import RecursiveBacktracker, Kruskals
+
+def run(GridClass, gtype, Generator, levels, cache):
+    grid = GridClass(121, 161, levels)
+    generator = Generator(7)
+    t0 = time.perf_counter()
+    job = MazeBuildJob(grid, MazeRenderer(grid, 45, gtype, 80, 60), generator, 0.3, 7,
+                       cache, maze_key(grid, generator, 0.3, 7)).start()
+    job.wait()
+    return time.perf_counter() - t0
+
+def main():
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    print(f"{'grid':<18}{'generator':<22}{'miss':>9}{'memory':>9}{'disk':>9}{'file':>9}")
+    for GridClass, gtype, Generator in ((SquareCellGrid, "rect", RecursiveBacktracker),
+                                        (ArraySquareGrid, "rect", Kruskals), (HexCellGrid, "hex", RecursiveBacktracker)):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MazeCache(directory=tmp)
+            miss = run(GridClass, gtype, Generator, levels, cache)
+            memory = run(GridClass, gtype, Generator, levels, cache)
+            disk = run(GridClass, gtype, Generator, levels, MazeCache(directory=tmp))
+            size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+            print(f"{GridClass.__name__:<18}{Generator.__name__:<22}{miss:>8.2f}s{memory:>8.2f}s{disk:>8.2f}s{size / 1024:>7.0f}KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Eller's algorithm on the Creative mode sizes, plus a grid-free row stream.
+
+Usage: python benchmarks/bench_ellers.py [stream_rows]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid
+from maze_algorithms import Ellers
+
+SIZES = [("Small", 11, 15), ("Medium", 21, 31), ("Large", 31, 41),
+         ("X-Large", 51, 71), ("Epic", 81, 101), ("Colossal", 121, 161)]
+
+def main():
+    stream_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{'size':<10}{'cells':>8}{'seconds':>10}{'us/cell':>10}")
+    for name, rows, cols in SIZES:
+        grid = SquareCellGrid(rows, cols)
+        t0 = time.perf_counter()
+        Ellers().generate(grid)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<10}{grid.size():>8}{elapsed:>10.3f}{elapsed / grid.size() * 1e6:>10.1f}")
+
+    cols = 161
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    links = sum(len(east) + len(south) for east, south in Ellers.stream_rows(cols, stream_rows))
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"stream {stream_rows}x{cols}: {links} links in {elapsed:.2f}s, peak {peak / 1024:.1f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time of one FOV update (`MazeRenderer.fov_polygon`) for the Python and NumPy
+ray casters and the exact angular sweep, at several ray counts (for the sweep,
+sides of the bounding polygon), on square, hex and polar mazes.
+
+Each time is the mean over about 100 player positions at a 6-cell radius, the
+game's default; a 60 fps frame has 16.7 ms for everything. The last column is
+the mean vertex count of the sweep's polygons at 60 sides.
+
+Usage: python benchmarks/bench_fov.py [rows] [cols]
+"""
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import arcade
+except ImportError:
+    sys.modules["arcade"], sys.modules["arcade.shape_list"] = MagicMock(), MagicMock()
+
+import renderer as renderer_module
+from renderer import MazeRenderer
+from maze_topology import ArraySquareGrid, ArrayHexGrid, ArrayPolarGrid
+from maze_algorithms import RecursiveBacktracker
+
+RAYS = (60, 180, 360, 720)
+
+def fov_time(renderer, origins, radius, rays, engine):
+    t0 = time.perf_counter()
+    for origin in origins: renderer.fov_polygon(origin, 0, radius, rays, engine)
+    return (time.perf_counter() - t0) / len(origins)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    if renderer_module.np is None: print("NumPy not installed: the NumPy rays are skipped")
+    print(f"{'grid':<16}{'engine':<8}" + "".join(f"{f'{n} rays':>11}" for n in RAYS) + f"{'vertices':>10}")
+    for GridClass, gtype, shape in ((ArraySquareGrid, "rect", "rectangle"), (ArrayHexGrid, "hex", "rectangle"), (ArrayPolarGrid, "polar", "circle")):
+        grid = GridClass(rows, cols, 1)
+        grid.mask_shape(shape)
+        RecursiveBacktracker(3).generate(grid)
+        renderer = MazeRenderer(grid, 45, gtype, 80, 60)
+        origins = [renderer.get_pixel(cell.row, cell.column) for cell in list(grid.each_cell_in_level(0))[::max(1, grid.size() // 100)]]
+        radius = renderer.cell_radius * 6
+        renderer.fov_polygon(origins[0], 0, radius, engine="rays")  # spatial hash and arrays
+        renderer.fov_polygon(origins[0], 0, radius, engine="sweep")  # wall outline
+        engines = [("python", "rays", None)] + ([("numpy", "rays", renderer_module.np)] if renderer_module.np is not None else [])
+        for name, engine, np in engines + [("sweep", "sweep", renderer_module.np)]:
+            with patch("renderer.np", np):
+                times = [fov_time(renderer, origins, radius, rays, engine) for rays in RAYS]
+            vertices = sum(len(renderer.fov_polygon(o, 0, radius, 60, "sweep")) for o in origins) / len(origins) if engine == "sweep" else 60
+            print(f"{GridClass.__name__:<16}{name:<8}" + "".join(f"{t * 1000:>9.2f}ms" for t in times) + f"{vertices:>10.0f}")
+
+if __name__ == "__main__":
+    main()
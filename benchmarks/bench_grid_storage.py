@@ -0,0 +1,43 @@
+"""Memory and build-time comparison of the object and array grid backends.
+
+Usage: python benchmarks/bench_grid_storage.py [rows cols levels]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, compact_grid_class
+from maze_algorithms import RecursiveBacktracker
+
+def measure(build):
+    """Build time without tracing, then retained memory of a second, traced build."""
+    t0 = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    grid = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return grid, elapsed, current
+
+def main():
+    rows, cols, levels = (int(a) for a in sys.argv[1:4]) if len(sys.argv) > 3 else (121, 161, 6) # Colossal, 6 floors
+    print(f"Grid {rows}x{cols}x{levels} ({rows*cols*levels} cells), shape=circle")
+    print(f"{'topology':<10}{'backend':<9}{'build+mask s':>14}{'memory MB':>12}{'generate s':>12}")
+    for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+        for name, cls in (("object", GridClass), ("array", compact_grid_class(GridClass))):
+            def build():
+                grid = cls(rows, cols, levels)
+                grid.mask_shape("circle")
+                return grid
+            grid, elapsed, mem = measure(build)
+            t0 = time.perf_counter()
+            RecursiveBacktracker().generate(grid)
+            gen = time.perf_counter() - t0
+            print(f"{GridClass.topology:<10}{name:<9}{elapsed:>14.3f}{mem / 2**20:>12.2f}{gen:>12.2f}")
+
+if __name__ == "__main__":
+    main()
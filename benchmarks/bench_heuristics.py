@@ -0,0 +1,51 @@
+"""A* heuristics per topology: the old Manhattan + 5x floor estimate against
+`Grid.planar_distance` with shaft-aware floor changes.
+
+Mazes are fully braided (many loops) with several floors, so the heuristic
+decides both how much is expanded and whether the path found is shortest.
+
+Usage: python benchmarks/bench_heuristics.py [rows] [columns] [levels] [pairs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid
+from maze_algorithms import RecursiveBacktracker, AStar_Solver
+from maze_analysis import DistanceFields
+
+class ManhattanAStar(AStar_Solver):
+    """The estimate every topology used before."""
+    def make_heuristic(self, grid, goal):
+        return lambda n: abs(n.row-goal.row) + abs(n.column-goal.column) + abs(n.level-goal.level)*5
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 61
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 81
+    levels = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    pairs = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+    print(f"{'topology':<10}{'heuristic':<11}{'expanded':>10}{'seconds':>10}{'excess':>8}")
+    for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+        random.seed(1)
+        grid = GridClass(rows, cols, levels)
+        RecursiveBacktracker().generate(grid)
+        grid.braid(1.0)
+        cells = list(grid.each_cell())
+        tasks = [random.sample(cells, 2) for _ in range(pairs)]
+        fields = DistanceFields(grid)
+        shortest = [fields.distance(s, g) for s, g in tasks]
+        for name, solver in (("manhattan", ManhattanAStar()), ("lattice", AStar_Solver())):
+            solver.stairs(grid)  # shaft scan is cached per grid version; keep it out of the timing
+            expanded = sum(1 for s, g in tasks for e in solver.solve_step(grid, s, g) if e.kind == "visit")
+            t0 = time.perf_counter()
+            lengths = [len(solver.solve(grid, s, g)) - 1 for s, g in tasks]
+            elapsed = time.perf_counter() - t0
+            # Steps beyond the true shortest path, summed over all pairs
+            excess = sum(a - b for a, b in zip(lengths, shortest))
+            print(f"{grid.topology:<10}{name:<11}{expanded // pairs:>10}{elapsed / pairs:>10.4f}{excess:>8}")
+
+if __name__ == "__main__":
+    main()
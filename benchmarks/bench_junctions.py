@@ -0,0 +1,48 @@
+"""Corridor contraction on Colossal mazes: cells expanded and solve time of
+BFS and A* against Dijkstra over the JunctionGraph, plus the one-off graph build
+and the dead-end-filled variant for a single start/goal pair.
+
+Usage: python benchmarks/bench_junctions.py [pairs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid
+from maze_algorithms import RecursiveBacktracker, HuntAndKill, BFS_Solver, AStar_Solver, JunctionSolver
+from maze_analysis import JunctionGraph
+
+MAZES = [("Backtracker", RecursiveBacktracker, 0.0), ("Hunt and Kill", HuntAndKill, 0.0),
+         ("Backtracker 50% braid", RecursiveBacktracker, 0.5)]
+
+def main():
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'maze':<24}{'solver':<10}{'expanded':>10}{'ms/solve':>10}")
+    for name, Generator, braid in MAZES:
+        random.seed(1)
+        grid = SquareCellGrid(121, 161)
+        Generator().generate(grid)
+        if braid: grid.braid(braid)
+        cells = list(grid.each_cell())
+        tasks = [random.sample(cells, 2) for _ in range(pairs)]
+        junctions = JunctionSolver()
+        t0 = time.perf_counter()
+        graph = junctions.graph(grid)
+        build = time.perf_counter() - t0
+        print(f"{name:<24}graph: {len(graph.adjacency)} nodes for {len(cells)} cells, built in {build:.2f}s")
+        for label, solver in (("BFS", BFS_Solver()), ("A*", AStar_Solver()), ("Junction", junctions)):
+            expanded = sum(1 for s, g in tasks for e in solver.solve_step(grid, s, g) if e.kind == "visit")
+            t0 = time.perf_counter()
+            for s, g in tasks: solver.solve(grid, s, g)
+            print(f"{'':<24}{label:<10}{expanded // pairs:>10}{(time.perf_counter() - t0) / pairs * 1e3:>10.1f}")
+        s, g = tasks[0]
+        t0 = time.perf_counter()
+        filled = JunctionGraph(grid, keep=(s, g))
+        filled.search(s, g)
+        print(f"{'':<24}dead-end fill + contract + solve, one pair: {len(filled.adjacency)} nodes, {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
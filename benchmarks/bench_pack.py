@@ -0,0 +1,53 @@
+"""Time to get an Adventure maze from a pack against generating it, per spatial
+tier, for the array grids Adventure plays on.
+
+Builds a small pack in a temporary directory first (`per_bucket` mazes per
+bucket, default 50); picking is O(1) in the pack size, so a bigger pack only
+changes the build time.
+
+Usage: python benchmarks/bench_pack.py [per_bucket]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from adventure_engine import AdventureEngine
+from maze_pack import MazePack, build_pack
+from maze_topology import ArraySquareGrid, ArrayHexGrid
+from maze_algorithms import RecursiveBacktracker, Kruskals
+
+TIERS = (1, 8, 24, 44)
+CASES = ((ArraySquareGrid, RecursiveBacktracker), (ArraySquareGrid, Kruskals), (ArrayHexGrid, RecursiveBacktracker))
+
+def main():
+    per_bucket = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    buckets = [(GridClass.topology, AdventureEngine.maze_shape(GridClass), Generator, *AdventureEngine.maze_size(tier), tier)
+               for tier in TIERS for GridClass, Generator in CASES]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pmpk")
+        t0 = time.perf_counter()
+        written = build_pack(path, buckets, per_bucket, seed=1)
+        print(f"built {written} mazes in {time.perf_counter() - t0:.1f}s, {os.path.getsize(path) / 2**20:.1f} MB")
+        pack, rng = MazePack(path), random.Random(2)
+        print(f"{'tier':>5}{'size':>12}  {'grid':<18}{'generator':<22}{'generate':>10}{'pick':>10}")
+        for topology, shape, Generator, rows, cols, levels, tier in buckets:
+            GridClass = next(G for G, _ in CASES if G.topology == topology)
+            t0 = time.perf_counter()
+            grid = GridClass(rows, cols, levels)
+            grid.mask_shape(shape)
+            Generator(rng.getrandbits(32)).generate(grid)
+            generate = time.perf_counter() - t0
+            bucket = pack.bucket(topology, shape, Generator.__name__, tier)
+            t0 = time.perf_counter()
+            for _ in range(100): pack.pick(bucket, rng)
+            pick = (time.perf_counter() - t0) / 100
+            print(f"{tier:>5}{f'{rows}x{cols}x{levels}':>12}  {GridClass.__name__:<18}{Generator.__name__:<22}"
+                  f"{generate * 1000:>8.1f}ms{pick * 1e6:>8.0f}us")
+        pack.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""generate_parallel on Colossal (121x161) grids against a plain single-process
+`generate`, per generator and worker count.
+
+Usage: python benchmarks/bench_parallel.py [max_workers]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import ArraySquareGrid
+from maze_algorithms import Kruskals, RandomizedPrims, RecursiveBacktracker, Wilsons
+from maze_parallel import generate_parallel
+
+def timed(fn):
+    t0 = time.perf_counter(); fn()
+    return time.perf_counter() - t0
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else max(4, os.cpu_count() or 1)
+    counts = [w for w in (1, 2, 4, 8, 16) if w <= max_workers]
+    print(f"{os.cpu_count()} CPU(s)")
+    print(f"{'generator':<22}{'levels':>7}{'serial':>9}" + "".join(f"{f'{w}w':>15}" for w in counts))
+    for levels in (1, 6):
+        for Generator in (Kruskals, RandomizedPrims, RecursiveBacktracker, Wilsons):
+            random.seed(1)
+            serial = timed(lambda: Generator().generate(ArraySquareGrid(121, 161, levels)))
+            cells = []
+            for w in counts:
+                t = timed(lambda: generate_parallel(ArraySquareGrid(121, 161, levels), Generator(), workers=w, seed=1))
+                cells.append(f"{t:>7.2f}s {serial / t:>4.1f}x")
+            print(f"{Generator.__name__:<22}{levels:>7}{serial:>8.2f}s" + "".join(f"{c:>15}" for c in cells))
+
+if __name__ == "__main__":
+    main()
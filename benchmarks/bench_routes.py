@@ -0,0 +1,48 @@
+"""Star routing on a braided Colossal maze: the old greedy solve-per-target loop
+against plan_route over distance fields.
+
+Usage: python benchmarks/bench_routes.py [star counts...]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid
+from maze_algorithms import RecursiveBacktracker, BFS_Solver
+from maze_analysis import DistanceFields, plan_route
+
+def greedy_solves(grid, start, targets, goal):
+    """The pre-routing solve_multi: a full solve per remaining target per round."""
+    solver, length, remaining = BFS_Solver(), 0, list(targets)
+    while remaining:
+        segments = [(len(solver.solve(grid, start, t)), t) for t in remaining]
+        steps, start = min(segments, key=lambda s: s[0])
+        length += steps - 1; remaining.remove(start)
+    return length + len(solver.solve(grid, start, goal)) - 1
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [3, 6, 10, 12, 20, 40]
+    random.seed(1)
+    grid = SquareCellGrid(121, 161)
+    RecursiveBacktracker().generate(grid)
+    grid.braid(0.5)
+    cells = list(grid.each_cell())
+    print(f"{'stars':>6}{'greedy s':>10}{'greedy len':>12}{'route s':>10}{'route len':>11}")
+    for k in counts:
+        start, goal, *stars = random.sample(cells, k + 2)
+        t0 = time.perf_counter()
+        old = greedy_solves(grid, start, stars, goal) if k <= 12 else None
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fields = DistanceFields(grid)
+        stops = [start] + plan_route(fields, start, stars, goal) + [goal]
+        new = sum(fields.distance(a, b) for a, b in zip(stops, stops[1:]))
+        t_new = time.perf_counter() - t0
+        old_s = f"{t_old:>10.2f}{old:>12}" if old is not None else f"{'-':>10}{'-':>12}"
+        print(f"{k:>6}{old_s}{t_new:>10.2f}{new:>11}")
+
+if __name__ == "__main__":
+    main()
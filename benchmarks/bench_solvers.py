@@ -0,0 +1,54 @@
+"""Solver cost on a Colossal maze: full solve, event stream, the animated trace,
+and the distance-field cache behind re-solves and star routes.
+
+Usage: python benchmarks/bench_solvers.py [rows] [columns]
+"""
+import os
+import sys
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid
+from maze_algorithms import RecursiveBacktracker, BFS_Solver, DFS_Solver, AStar_Solver, SolverTrace
+from maze_analysis import DistanceFields
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+def drain(events):
+    for _ in events: pass
+
+def animate(events):
+    trace = SolverTrace(events)
+    while trace.advance(5): pass
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 121
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 161
+    random.seed(1)
+    grid = SquareCellGrid(rows, cols)
+    RecursiveBacktracker().generate(grid)
+    start, goal = grid.get_cell(0, 0), grid.get_cell(rows - 1, cols - 1)
+    print(f"{'solver':<8}{'solve':>10}{'events':>10}{'trace':>10}{'path':>8}")
+    for name, solver in (("BFS", BFS_Solver()), ("DFS", DFS_Solver()), ("A*", AStar_Solver())):
+        path = solver.solve(grid, start, goal)
+        t_solve = timed(lambda: solver.solve(grid, start, goal))
+        t_events = timed(lambda: drain(solver.solve_step(grid, start, goal)))
+        t_trace = timed(lambda: animate(solver.solve_step(grid, start, goal)))
+        print(f"{name:<8}{t_solve:>10.3f}{t_events:>10.3f}{t_trace:>10.3f}{len(path):>8}")
+
+    fields = DistanceFields(grid)
+    t_field = timed(lambda: fields.field(goal).complete())
+    # Re-solve from every cell along the way, as when the player walks the solution
+    walk = [grid.get_cell(*p) for p in fields.path(start, goal)]
+    t_follow = timed(lambda: [fields.path(cell, goal) for cell in walk]) / len(walk)
+    stars = [grid.random_cell() for _ in range(3)]
+    t_multi = timed(lambda: drain(BFS_Solver().solve_multi(grid, start, stars, goal)))
+    print(f"goal field {t_field:.3f}s, re-solve {t_follow * 1e3:.2f} ms/step, 3-star route {t_multi:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Out-of-core generation: streams a maze to disk, then reads it back through mmap.
+
+Usage: python benchmarks/bench_stream.py [rows] [columns] [levels] [ellers|sidewinder]
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_algorithms import Ellers, Sidewinder
+from maze_storage import stream_maze, open_grid
+
+GENERATORS = {"ellers": Ellers, "sidewinder": Sidewinder}
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 2500
+    levels = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    generator = GENERATORS[sys.argv[4] if len(sys.argv) > 4 else "ellers"]
+    path = os.path.join(tempfile.mkdtemp(), "stream.pmaz")
+
+    t0 = time.perf_counter()
+    header = stream_maze(path, "rect", rows, cols, levels, generator)
+    elapsed = time.perf_counter() - t0
+    print(f"{generator.__name__} {rows}x{cols}x{levels} ({header.count:,} cells): {elapsed:.1f}s, "
+          f"{os.path.getsize(path) / 2**20:.1f} MiB on disk")
+
+    t0 = time.perf_counter()
+    grid = open_grid(path)
+    middle = grid.index(rows // 2, cols // 2, levels // 2)
+    links = grid.linked_indices(middle)
+    print(f"open_grid + one lookup: {(time.perf_counter() - t0) * 1e3:.2f} ms ({len(links)} links)")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS: {peak / 1024:.1f} MiB")
+    del grid
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""TreeIndex on perfect Colossal circles: build time, then distance and path
+queries between random cell pairs against a full BFS solve.
+
+Usage: python benchmarks/bench_tree_index.py [pairs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid, ArrayHexGrid
+from maze_algorithms import RecursiveBacktracker, BFS_Solver
+from maze_analysis import TreeIndex
+
+def per_call(fn, items):
+    t0 = time.perf_counter()
+    for a, b in items: fn(a, b)
+    return (time.perf_counter() - t0) / len(items)
+
+def main():
+    pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'grid':<16}{'cells':>8}{'build':>9}{'distance':>11}{'path':>10}{'BFS solve':>11}")
+    for GridClass, levels in ((SquareCellGrid, 1), (SquareCellGrid, 6), (ArrayHexGrid, 6)):
+        random.seed(2)
+        grid = GridClass(121, 161, levels)
+        grid.mask_shape("circle")
+        RecursiveBacktracker().generate(grid)
+        t0 = time.perf_counter()
+        tree = TreeIndex.build(grid)
+        build = time.perf_counter() - t0
+        cells = list(grid.each_cell())
+        tasks = [random.sample(cells, 2) for _ in range(pairs)]
+        t_dist = per_call(tree.distance, tasks)
+        t_path = per_call(tree.path, tasks[:200])
+        solver = BFS_Solver()
+        t_bfs = per_call(lambda a, b: solver.solve(grid, a, b), tasks[:20])
+        name = f"{GridClass.__name__} x{levels}"
+        print(f"{name:<16}{len(cells):>8}{build:>8.2f}s{t_dist * 1e6:>9.1f}us{t_path * 1e3:>8.2f}ms{t_bfs * 1e3:>9.1f}ms")
+
+if __name__ == "__main__":
+    main()
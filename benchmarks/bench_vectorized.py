@@ -0,0 +1,33 @@
+"""Vectorized Kruskal, Binary Tree and Sidewinder (NumPy, writing straight into
+an ArrayGrid's wall bitmasks) against their per-cell Python loops.
+
+Usage: python benchmarks/bench_vectorized.py [levels]
+"""
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import ArraySquareGrid, ArrayHexGrid
+from maze_algorithms import Kruskals, BinaryTree, Sidewinder
+
+def timed(fn):
+    t0 = time.perf_counter(); fn()
+    return time.perf_counter() - t0
+
+def main():
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    print(f"{'generator':<12}{'grid':<18}{'loop':>9}{'vectorized':>12}{'speedup':>9}")
+    for GridClass in (ArraySquareGrid, ArrayHexGrid):
+        for Generator in (Kruskals, BinaryTree, Sidewinder):
+            random.seed(1)
+            with patch("maze_vectorized.HAVE_NUMPY", False):
+                loop = timed(lambda: Generator().generate(GridClass(121, 161, levels)))
+            fast = timed(lambda: Generator().generate(GridClass(121, 161, levels)))
+            print(f"{Generator.__name__:<12}{GridClass.__name__:<18}{loop:>8.2f}s{fast * 1e3:>10.1f}ms{loop / fast:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
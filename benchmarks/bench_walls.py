@@ -0,0 +1,56 @@
+"""Wall geometry before and after collinear merging: polygons, FOV segments,
+spatial-hash entries, and the time of one `create_fov_geometry` call, per topology.
+
+Without arcade installed the shape calls are no-ops, so the FOV time is the ray
+casting only.
+
+Usage: python benchmarks/bench_walls.py [rows] [cols]
+"""
+import os
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+try:
+    import arcade
+except ImportError:
+    print("arcade not installed: shape calls are skipped")
+    sys.modules["arcade"], sys.modules["arcade.shape_list"] = MagicMock(), MagicMock()
+    sys.modules["arcade"].shape_list.create_polygon = lambda points, color: None
+    sys.modules["arcade"].shape_list.ShapeElementList = list
+
+from renderer import MazeRenderer
+from maze_topology import ArraySquareGrid, ArrayHexGrid, ArrayTriGrid, ArrayPolarGrid
+from maze_algorithms import RecursiveBacktracker
+
+def geometry(grid, gtype, merge):
+    renderer = MazeRenderer(grid, 45, gtype, 80, 60)
+    t0 = time.perf_counter()
+    polygons = renderer.get_occlusion_polygons(0, merge=merge)
+    build = time.perf_counter() - t0
+    renderer.cache_level_geometry(0, polygons)
+    entries = sum(map(len, renderer._spatial_segments[0].values()))
+    origins = [renderer.get_pixel(cell.row, cell.column) for cell in list(grid.each_cell_in_level(0))[::max(1, grid.size() // 200)]]
+    t0 = time.perf_counter()
+    for origin in origins: renderer.create_fov_geometry(origin, 0, 270)
+    fov = (time.perf_counter() - t0) / len(origins)
+    return len(polygons), len(renderer._get_segments(0)), entries, build, fov
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    print(f"{'grid':<16}{'':>8}{'polygons':>10}{'segments':>10}{'hashed':>10}{'build':>10}{'fov':>10}")
+    for GridClass, gtype, shape in ((ArraySquareGrid, "rect", "rectangle"), (ArrayHexGrid, "hex", "rectangle"),
+                                    (ArrayTriGrid, "tri", "rectangle"), (ArrayPolarGrid, "polar", "circle")):
+        grid = GridClass(rows, cols, 1)
+        grid.mask_shape(shape)
+        RecursiveBacktracker(3).generate(grid)
+        for merge in (False, True):
+            polygons, segments, entries, build, fov = geometry(grid, gtype, merge)
+            print(f"{GridClass.__name__:<16}{'merged' if merge else 'single':>8}{polygons:>10}{segments:>10}{entries:>10}"
+                  f"{build * 1000:>8.1f}ms{fov * 1000:>8.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Wall-clock scaling of Wilson's algorithm across the Creative mode sizes.
+
+Usage: python benchmarks/bench_wilsons.py [levels]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from maze_topology import SquareCellGrid
+from maze_algorithms import Wilsons
+
+SIZES = [("Small", 11, 15), ("Medium", 21, 31), ("Large", 31, 41),
+         ("X-Large", 51, 71), ("Epic", 81, 101), ("Colossal", 121, 161)]
+
+def main():
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    print(f"{'size':<10}{'cells':>8}{'seconds':>10}{'us/cell':>10}")
+    for name, rows, cols in SIZES:
+        grid = SquareCellGrid(rows, cols, levels)
+        t0 = time.perf_counter()
+        Wilsons().generate(grid)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<10}{grid.size():>8}{elapsed:>10.3f}{elapsed / grid.size() * 1e6:>10.1f}")
+
+if __name__ == "__main__":
+    main()
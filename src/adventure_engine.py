@@ -1,19 +1,38 @@
 import json
 import os
 import random
-from typing import Dict, Any, Tuple, Type
+from functools import partial
+from typing import Dict, Any, Tuple, Type, Optional, Callable
+import config
 from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, Grid
 from maze_algorithms import (
     RecursiveBacktracker, RandomizedPrims, AldousBroder,
     BinaryTree, Wilsons, Kruskals, Sidewinder, RecursiveDivision,
     HuntAndKill, Ellers, MazeGenerator
 )
+from maze_builder import MazeBuildJob
+from maze_cache import params_key, shared_cache
+from maze_pack import MazePack, default_pack
+
+# Structural skill above which each grid class and algorithm is offered
+GRID_UNLOCKS = [(float("-inf"), SquareCellGrid), (4, TriCellGrid), (8, PolarCellGrid), (12, HexCellGrid)]
+ALGORITHM_UNLOCKS = [
+    (float("-inf"), BinaryTree, "Binary Tree"), (float("-inf"), Sidewinder, "Sidewinder"),
+    (3, RandomizedPrims, "Prim's"), (3, RecursiveDivision, "Rec. Division"),
+    (7, Kruskals, "Kruskal's"), (7, HuntAndKill, "Hunt & Kill"),
+    (11, RecursiveBacktracker, "Backtracker"), (11, Wilsons, "Wilson's"), (11, AldousBroder, "Aldous-Broder"),
+    (15, Ellers, "Eller's")
+]
 
 class AdventureEngine:
-    def __init__(self, slot: int = 1):
+    def __init__(self, slot: int = 1, pack: Optional[MazePack] = None):
         self.slot = slot
         self.profile_path = f"player_profile_{slot}.json"
         self.data = self.load_profile()
+        # Speculative build of the next maze: (generation key, params, job)
+        self.prefetch: Optional[Tuple[tuple, Dict[str, Any], MazeBuildJob]] = None
+        # Pre-generated mazes (see maze_pack.py) used instead of generating, when one matches
+        self.pack = pack if pack is not None else default_pack()
 
     @staticmethod
     def get_profile_info(slot: int) -> Dict[str, Any]:
@@ -63,13 +82,26 @@ class AdventureEngine:
             except Exception: pass
         return default_data
 
-    def get_next_maze_params(self) -> Dict[str, Any]:
-        p = self.data["skill_profile"]
-        
-        # ... (previous logic for spatial, perception, etc.)
-        rows = int(10 + min(p["spatial"] * 2.5, 110))
-        cols = int(15 + min(p["spatial"] * 3.0, 140))
-        levels = int(1 + min(p["spatial"] // 8, 5))
+    def save_profile(self):
+        try:
+            with open(self.profile_path, "w") as f:
+                json.dump(self.data, f, indent=2)
+        except OSError: pass
+
+    def get_next_maze_params(self, profile: Optional[Dict[str, float]] = None, prefer: Optional[Tuple[Type[Grid], Type[MazeGenerator]]] = None) -> Dict[str, Any]:
+        """Maze parameters for `profile` (default: the player's current profile).
+
+        `prefer` is a (GridClass, generator class) pair used instead of a fresh random
+        pick whenever the profile allows both. Without an explicit profile, a matching
+        prefetched maze is attached as `grid` / `build_job` / `renderer`. Otherwise,
+        when the maze pack has the bucket, a pre-generated maze of the bucket's size
+        is attached as `grid`, to be braided and built but not generated.
+        """
+        predicting = profile is not None
+        p = profile if predicting else self.data["skill_profile"]
+        if not predicting and prefer is None and self.prefetch:
+            params = self.prefetch[1]
+            prefer = (params["GridClass"], type(params["generator"]))
         
         # 2. Perceptual Challenges
         explorative_map = False
@@ -90,27 +122,28 @@ class AdventureEngine:
             collect_stars = random.random() < min((p["collection"] - 2) * 0.2, 0.9)
 
         # 4. Structural Complexity
-        grid_classes = [SquareCellGrid]
-        if p["structural"] > 4: grid_classes.append(TriCellGrid)
-        if p["structural"] > 8: grid_classes.append(PolarCellGrid)
-        if p["structural"] > 12: grid_classes.append(HexCellGrid)
-        GridClass = random.choice(grid_classes)
+        grid_classes = [GridClass for unlock, GridClass in GRID_UNLOCKS if p["structural"] > unlock]
+        GridClass = prefer[0] if prefer and prefer[0] in grid_classes else random.choice(grid_classes)
         
-        algorithms = [(BinaryTree, "Binary Tree"), (Sidewinder, "Sidewinder")]
-        if p["structural"] > 3: algorithms += [(RandomizedPrims, "Prim's"), (RecursiveDivision, "Rec. Division")]
-        if p["structural"] > 7: algorithms += [(Kruskals, "Kruskal's"), (HuntAndKill, "Hunt & Kill")]
-        if p["structural"] > 11: algorithms += [(RecursiveBacktracker, "Backtracker"), (Wilsons, "Wilson's"), (AldousBroder, "Aldous-Broder")]
-        if p["structural"] > 15: algorithms += [(Ellers, "Eller's")]
-        AlgoClass, gen_name = random.choice(algorithms)
+        algorithms = [(AlgoClass, name) for unlock, AlgoClass, name in ALGORITHM_UNLOCKS if p["structural"] > unlock]
+        preferred = [a for a in algorithms if prefer and a[0] is prefer[1]]
+        AlgoClass, gen_name = preferred[0] if preferred else random.choice(algorithms)
+        shape, animate = self.maze_shape(GridClass), p["structural"] < 5.0
+
+        # 5. Spatial: with a pack, the size of the highest pre-generated tier at or below the skill.
+        # This rounds the size down to the tier's on purpose (see docs/adaptive_difficulty.md).
+        bucket = self.pack.bucket(GridClass.topology, shape, AlgoClass.__name__, p["spatial"]) if self.pack and not animate else None
+        rows, cols, levels = self.maze_size(bucket.tier if bucket else p["spatial"])
         
         braid_pct = min(0.5, p["efficiency"] * 0.03)
+        seed = random.getrandbits(32)
 
-        return {
+        params = {
             "GridClass": GridClass,
-            "shape": "rectangle" if GridClass != PolarCellGrid else "circle",
+            "shape": shape,
             "rows": rows, "cols": cols, "levels": levels,
-            "generator": AlgoClass(), "gen_name": gen_name,
-            "animate": p["structural"] < 5.0,
+            "generator": AlgoClass(seed), "gen_name": gen_name, "seed": seed,
+            "animate": animate,
             "braid_pct": braid_pct,
             "show_trace": True,
             "random_endpoints": p["spatial"] > 6.0,
@@ -119,6 +152,77 @@ class AdventureEngine:
             "explorative_map": explorative_map,
             "collect_stars": collect_stars
         }
+        if not predicting: self._claim_prefetch(params)
+        if bucket and "grid" not in params:  # a ready maze instead of generating one; it brings its own seed
+            grid, entry = self.pack.pick(bucket)
+            params.update(grid=grid, seed=entry.seed, generator=AlgoClass(entry.seed))
+        return params
+
+    @staticmethod
+    def maze_size(spatial: float) -> Tuple[int, int, int]:
+        """Rows, columns and floors of a maze for a spatial skill."""
+        return int(10 + min(spatial * 2.5, 110)), int(15 + min(spatial * 3.0, 140)), int(1 + min(spatial // 8, 5))
+
+    @staticmethod
+    def maze_shape(GridClass: Type[Grid]) -> str:
+        return "rectangle" if GridClass != PolarCellGrid else "circle"
+
+    @staticmethod
+    def masked_grid(GridClass: Type[Grid], shape: str, rows: int, cols: int, levels: int) -> Grid:
+        grid = GridClass(rows, cols, levels)
+        grid.mask_shape(shape)
+        return grid
+
+    @staticmethod
+    def generation_key(params: Dict[str, Any]) -> tuple:
+        """Everything that shapes the built grid but its seed; the other params only affect play.
+
+        Together with the seed this fully determines the maze. A prefetched maze
+        matches a key whatever its seed, and brings its own seed along."""
+        return (params["GridClass"], params["shape"], params["rows"], params["cols"], params["levels"],
+                type(params["generator"]), params["braid_pct"])
+
+    def start_prefetch(self, maze_difficulty: int, stars: int, make_renderer: Callable[[Grid], Any]) -> Optional[MazeBuildJob]:
+        """Starts building the maze that would follow a par run of the current one.
+
+        A par run finishes in the expected time without tools and collects every
+        star. `make_renderer(grid)` supplies the renderer the geometry is built for.
+        Animated mazes are generated on screen, so they are not prefetched.
+        """
+        self.discard_prefetch()
+        expected_time = maze_difficulty / 10.0 * 15.0
+        profile, _, _, _ = self.score_run(self.data["skill_profile"], self.data["momentum"],
+                                          expected_time, False, False, maze_difficulty, stars)
+        params = self.get_next_maze_params(profile)
+        if params["animate"]: return None
+        if "grid" in params:  # from the pack: only braiding and geometry are left to do
+            grid, make_grid, generator, key = params["grid"], None, None, None
+        else:
+            # A top-tier grid takes over a second to build and mask, so the worker does that too
+            grid, generator = None, params["generator"]
+            make_grid = partial(self.masked_grid, params["GridClass"], params["shape"], params["rows"], params["cols"], params["levels"])
+            key = params_key(params["GridClass"], params["shape"], params["rows"], params["cols"], params["levels"],
+                             generator, params["braid_pct"], params["seed"])
+        job = MazeBuildJob(grid, None, generator, params["braid_pct"], params["seed"], shared_cache(), key,
+                           make_grid=make_grid, make_renderer=make_renderer).start()
+        self.prefetch = (self.generation_key(params), params, job)
+        return job
+
+    def discard_prefetch(self):
+        if self.prefetch:
+            self.prefetch[2].cancel()
+            self.prefetch = None
+
+    def _claim_prefetch(self, params: Dict[str, Any]):
+        """Hands a prefetched maze to `params` if it was built for the same key."""
+        if not self.prefetch: return
+        key, predicted, job = self.prefetch
+        self.prefetch = None
+        if key != self.generation_key(params): job.cancel(); return
+        # Runs on the window thread: a grid still being built after PREFETCH_WAIT is dropped, not waited for
+        if not job.wait_prepared(config.PREFETCH_WAIT) or job.error or job.stage == "CANCELLED":
+            job.cancel(); return
+        params.update(generator=predicted["generator"], seed=predicted["seed"], grid=job.grid, build_job=job, renderer=job.renderer)
 
     def process_reset(self):
         """Penalty for manual reset in adventure mode."""
@@ -131,9 +235,11 @@ class AdventureEngine:
         self.save_profile()
         return loss
 
-    def process_result(self, time_taken: float, steps: int, used_solution: bool, used_map: bool, maze_difficulty: int, stars_collected: int = 0):
-        self.data["total_mazes"] += 1
-        p = self.data["skill_profile"]
+    @staticmethod
+    def score_run(profile: Dict[str, float], momentum: int, time_taken: float, used_solution: bool, used_map: bool, maze_difficulty: int, stars_collected: int = 0) -> Tuple[Dict[str, float], int, float, int]:
+        """Scores one finished maze without side effects.
+        Returns (updated profile copy, momentum, performance score, exp gain)."""
+        p = dict(profile)
         
         complexity_rating = maze_difficulty / 10.0
         expected_time = complexity_rating * 15.0 
@@ -149,13 +255,13 @@ class AdventureEngine:
 
         # Update Momentum
         if tool_penalty > 0.9 and speed_ratio > 1.1:
-            self.data["momentum"] += 1
+            momentum += 1
         elif tool_penalty < 0.5 or speed_ratio < 0.4:
-            self.data["momentum"] = max(-3, self.data["momentum"] - 1)
+            momentum = max(-3, momentum - 1)
         else:
-            self.data["momentum"] = 0
+            momentum = 0
 
-        growth_rate = 0.2 + (max(0, self.data["momentum"]) * 0.1)
+        growth_rate = 0.2 + (max(0, momentum) * 0.1)
         
         if perf_score > 0.8: # Success threshold lowered but growth scaled
             p["spatial"] += growth_rate * 1.2
@@ -167,6 +273,13 @@ class AdventureEngine:
             for k in p: p[k] = max(1.0, p[k] - 0.15)
             
         exp_gain = int(100 * complexity_rating * perf_score)
+        return p, momentum, perf_score, exp_gain
+
+    def process_result(self, time_taken: float, steps: int, used_solution: bool, used_map: bool, maze_difficulty: int, stars_collected: int = 0, shortest: int = 0):
+        self.data["total_mazes"] += 1
+        p, self.data["momentum"], perf_score, exp_gain = self.score_run(
+            self.data["skill_profile"], self.data["momentum"], time_taken, used_solution, used_map, maze_difficulty, stars_collected)
+        self.data["skill_profile"] = p
         self.data["exp"] += exp_gain
         
         self.data["level_history"].append({
@@ -174,6 +287,8 @@ class AdventureEngine:
             "exp_gain": exp_gain,
             "time": time_taken,
             "score": perf_score,
-            "stars": stars_collected
+            "stars": stars_collected,
+            "steps": steps,
+            "shortest": shortest # start-to-exit path length, for step efficiency
         })
         self.save_profile()
@@ -13,6 +13,24 @@ WALL_THICKNESS = 2
 ROWS = 21
 COLS = 31
 
+# Saved mazes (binary maze file, see maze_storage.py)
+SAVE_FILE = "maze_save.pmaz"
+
+# Built-maze cache (see maze_cache.py): entries kept in memory, directory and byte cap on disk
+MAZE_CACHE_ENTRIES = 8
+MAZE_CACHE_DIR = "maze_cache"
+MAZE_CACHE_BYTES = 64 * 1024 * 1024
+
+# Pre-generated Adventure mazes (see maze_pack.py); used when the file exists
+MAZE_PACK_FILE = "adventure.pmpk"
+# Seconds the window waits for a prefetched Adventure grid to exist before building the next maze afresh
+PREFETCH_WAIT = 0.5
+
+# FOV: rays cast per update (vectorized when NumPy is installed; 360 gives smoother shadows)
+FOV_RAYS = 60
+# FOV engine: "rays" samples FOV_RAYS angles, "sweep" computes the exact visibility polygon
+FOV_ENGINE = "rays"
+
 # Physics
 MOVEMENT_SPEED = 6
 
@@ -41,7 +59,7 @@ CURRENT_THEME_NAME = DEFAULT_THEME
 # Initialize colors with default theme
 def apply_theme(theme_name):
     global CURRENT_THEME_NAME, BG_COLOR, WALL_COLOR, PLAYER_COLOR, GOAL_COLOR, PATH_TRACE_COLOR
-    global COLOR_SOL_BFS, COLOR_SOL_DFS, COLOR_SOL_ASTAR, TEXT_COLOR, GENERATION_COLOR, HIGHLIGHT_COLOR
+    global COLOR_SOL_BFS, COLOR_SOL_DFS, COLOR_SOL_ASTAR, COLOR_SOL_BIBFS, COLOR_SOL_BIASTAR, COLOR_SOL_ROUTE, TEXT_COLOR, GENERATION_COLOR, HIGHLIGHT_COLOR
     
     theme = ALL_THEMES.get(theme_name, ALL_THEMES.get(DEFAULT_THEME))
     if not theme:
@@ -54,6 +72,9 @@ def apply_theme(theme_name):
         COLOR_SOL_BFS = (0, 255, 255)
         COLOR_SOL_DFS = (255, 165, 0)
         COLOR_SOL_ASTAR = (255, 215, 0)
+        COLOR_SOL_BIBFS = (186, 85, 211)
+        COLOR_SOL_BIASTAR = (255, 105, 180)
+        COLOR_SOL_ROUTE = (173, 255, 47)
         TEXT_COLOR = (255, 255, 255)
         GENERATION_COLOR = (50, 205, 50)
         HIGHLIGHT_COLOR = (255, 215, 0)
@@ -68,6 +89,9 @@ def apply_theme(theme_name):
     COLOR_SOL_BFS = tuple(theme["COLOR_SOL_BFS"])
     COLOR_SOL_DFS = tuple(theme["COLOR_SOL_DFS"])
     COLOR_SOL_ASTAR = tuple(theme["COLOR_SOL_ASTAR"])
+    COLOR_SOL_BIBFS = tuple(theme["COLOR_SOL_BIBFS"])
+    COLOR_SOL_BIASTAR = tuple(theme["COLOR_SOL_BIASTAR"])
+    COLOR_SOL_ROUTE = tuple(theme.get("COLOR_SOL_ROUTE", theme["TEXT_COLOR"]))  # optional: older theme files lack it
     TEXT_COLOR = tuple(theme["TEXT_COLOR"])
     GENERATION_COLOR = tuple(theme["GENERATION_COLOR"])
     HIGHLIGHT_COLOR = tuple(theme["HIGHLIGHT_COLOR"])
@@ -1,21 +1,57 @@
 # maze_algorithms.py
 import random
 import heapq
+import itertools
 from collections import deque
-from maze_topology import Grid, Cell
-from typing import List, Tuple, Dict
+from maze_topology import Grid, Cell, ArrayGrid
+from maze_analysis import DistanceFields, JunctionGraph, plan_route
+import maze_vectorized
+from typing import List, Tuple, Dict, NamedTuple, Optional, Union
 
 # --- GENERATORS ---
 
+def _descends(grid: Grid):
+    """`descends(r, c)` for the row streamers: whether (r, c) borders the cell below it."""
+    return lambda r, c: (1, 0) in grid.planar_deltas(r, c)
+
 class MazeGenerator:
+    """Base of all generators. Every random draw comes from `self.rng`.
+
+    `seed` is an int or a `random.Random` to draw from. Without one, the generator
+    seeds a private `random.Random` from the global `random` module, so
+    `random.seed` still reproduces its output, and generators running in separate
+    threads do not share one.
+
+    Generators with a NumPy path return all passages at once from `passages`;
+    `generate` carves them in bulk and `generate_step` links them one by one, so
+    both build the same maze for the same seed.
+
+    Walk-based generators run on indices on an `ArrayGrid` (`neighbor_slots`,
+    `link_bits`, `link_index`) and create views only for the pairs they yield.
+    They draw the same random numbers in the same order as on `Cell` objects, so
+    the maze for a seed does not depend on the backend.
+    """
+    vectorized = False  # whether `passages` has a NumPy path
+    def __init__(self, seed: Union[int, random.Random, None] = None):
+        self.rng = seed if isinstance(seed, random.Random) else \
+            random.Random(random.getrandbits(64) if seed is None else seed)
+
+    def passages(self, grid: Grid) -> Optional[tuple]:
+        """Every passage as `maze_vectorized` arrays (u, du, v, dv), or None without a NumPy path for `grid`."""
+        return None
+
     def generate(self, grid: Grid):
-        for _ in self.generate_step(grid): pass
+        passages = self.passages(grid)
+        if passages is not None: maze_vectorized.carve(grid, *passages)
+        else:
+            for _ in self.generate_step(grid): pass
     def generate_step(self, grid: Grid):
         raise NotImplementedError
 
 class RecursiveBacktracker(MazeGenerator):
     def generate_step(self, grid: Grid):
-        start = grid.random_cell()
+        if isinstance(grid, ArrayGrid): yield from self._index_steps(grid); return
+        start = grid.random_cell(self.rng)
         stack = [start]
         visited = {start}
         while stack:
@@ -23,20 +59,35 @@ class RecursiveBacktracker(MazeGenerator):
             unvisited_neighbors = [n for n in current.active_neighbors if not n.get_links()]
             if not unvisited_neighbors: stack.pop()
             else:
-                neighbor = random.choice(unvisited_neighbors)
+                neighbor = self.rng.choice(unvisited_neighbors)
                 current.link(neighbor)
                 visited.add(neighbor)
                 stack.append(neighbor)
                 yield current, neighbor
 
+    def _index_steps(self, grid: ArrayGrid):
+        mask, bits = grid.active_mask, grid.link_bits
+        start = grid.random_cell(self.rng)
+        stack = [start.index] if start else []
+        while stack:
+            i = stack[-1]
+            unvisited = [j for _, j in grid.neighbor_slots(i) if mask[j] and not bits[j]]
+            if not unvisited: stack.pop()
+            else:
+                j = self.rng.choice(unvisited)
+                grid.link_index(i, j)
+                stack.append(j)
+                yield grid.cell_at(i), grid.cell_at(j)
+
 class RandomizedPrims(MazeGenerator):
     def generate_step(self, grid: Grid):
-        visited = {grid.random_cell()}
+        if isinstance(grid, ArrayGrid): yield from self._index_steps(grid); return
+        visited = {grid.random_cell(self.rng)}
         frontier = []
         for v in visited:
             for n in v.active_neighbors: frontier.append((v, n))
         while frontier:
-            prev, cell = frontier.pop(random.randrange(len(frontier)))
+            prev, cell = frontier.pop(self.rng.randrange(len(frontier)))
             if cell in visited: continue
             prev.link(cell)
             visited.add(cell)
@@ -44,24 +95,58 @@ class RandomizedPrims(MazeGenerator):
                 if n not in visited: frontier.append((cell, n))
             yield prev, cell
 
+    def _index_steps(self, grid: ArrayGrid):
+        mask = grid.active_mask
+        visited = bytearray(grid.count)
+        start = grid.random_cell(self.rng).index
+        visited[start] = 1
+        frontier = [(start, j) for _, j in grid.neighbor_slots(start) if mask[j]]
+        while frontier:
+            i, j = frontier.pop(self.rng.randrange(len(frontier)))
+            if visited[j]: continue
+            grid.link_index(i, j)
+            visited[j] = 1
+            frontier.extend((j, n) for _, n in grid.neighbor_slots(j) if mask[n] and not visited[n])
+            yield grid.cell_at(i), grid.cell_at(j)
+
 class AldousBroder(MazeGenerator):
     def generate_step(self, grid: Grid):
-        cell = grid.random_cell()
+        if isinstance(grid, ArrayGrid): yield from self._index_steps(grid); return
+        cell = grid.random_cell(self.rng)
         unvisited = grid.size() - 1
         while unvisited > 0:
-            neighbor = random.choice(cell.active_neighbors)
+            neighbor = self.rng.choice(cell.active_neighbors)
             if not neighbor.get_links():
                 cell.link(neighbor)
                 unvisited -= 1
                 yield cell, neighbor
             cell = neighbor
 
+    def _index_steps(self, grid: ArrayGrid):
+        mask, bits = grid.active_mask, grid.link_bits
+        i = grid.random_cell(self.rng).index
+        unvisited = grid.size() - 1
+        while unvisited > 0:
+            j = self.rng.choice([n for _, n in grid.neighbor_slots(i) if mask[n]])
+            if not bits[j]:
+                grid.link_index(i, j)
+                unvisited -= 1
+                yield grid.cell_at(i), grid.cell_at(j)
+            i = j
+
 class BinaryTree(MazeGenerator):
+    vectorized = True
+
+    def passages(self, grid: Grid):
+        return maze_vectorized.binary_tree(grid, self.rng) if maze_vectorized.vectorizable(grid) else None
+
     def generate_step(self, grid: Grid):
+        passages = self.passages(grid)
+        if passages is not None: yield from maze_vectorized.link_steps(grid, passages); return
         for cell in grid.each_cell():
             neighbors = [n for n in cell.active_neighbors if (n.level == cell.level and (n.row < cell.row or (n.row == cell.row and n.column > cell.column)))]
             if neighbors:
-                cell.link(random.choice(neighbors))
+                cell.link(self.rng.choice(neighbors))
                 yield cell, None
             elif grid.levels > 1:
                 # Vertical bias if no 2D neighbors
@@ -70,31 +155,71 @@ class BinaryTree(MazeGenerator):
 
 class Wilsons(MazeGenerator):
     def generate_step(self, grid: Grid):
-        unvisited = list(grid.each_cell())
-        visited = {unvisited.pop(random.randrange(len(unvisited)))}
+        if isinstance(grid, ArrayGrid): yield from self._index_steps(grid); return
+        # Unvisited cells live in a swap-remove list indexed by `slot`: O(1) pick and removal
+        unvisited = [c for c in grid.each_cell() if c.active_neighbors]
+        slot = {cell: i for i, cell in enumerate(unvisited)}
+        def visit(cell):
+            i, last = slot.pop(cell), unvisited.pop()
+            if last != cell: unvisited[i] = last; slot[last] = i
+        if not unvisited: return
+        visit(unvisited[self.rng.randrange(len(unvisited))])
+        exit_to = {} # Last exit taken from each cell; retracing it erases loops implicitly
+        while unvisited:
+            start = cell = self.rng.choice(unvisited)
+            while cell in slot:
+                nxt = self.rng.choice(cell.active_neighbors)
+                exit_to[cell] = nxt; cell = nxt
+            cell = start
+            while cell in slot:
+                nxt = exit_to[cell]
+                cell.link(nxt); visit(cell)
+                yield cell, nxt
+                cell = nxt
+
+    def _index_steps(self, grid: ArrayGrid):
+        mask = grid.active_mask
+        def neighbors(i):
+            return [j for _, j in grid.neighbor_slots(i) if mask[j]]
+        unvisited = [i for i in range(grid.count) if mask[i] and neighbors(i)]
+        slot = {i: k for k, i in enumerate(unvisited)}
+        def visit(i):
+            k, last = slot.pop(i), unvisited.pop()
+            if last != i: unvisited[k] = last; slot[last] = k
+        if not unvisited: return
+        visit(unvisited[self.rng.randrange(len(unvisited))])
+        exit_to = {}
         while unvisited:
-            cell = random.choice(unvisited)
-            path = [cell]
-            while cell not in visited:
-                cell = random.choice(cell.active_neighbors)
-                if cell in path: path = path[:path.index(cell)+1]
-                else: path.append(cell)
-            for i in range(len(path)-1):
-                path[i].link(path[i+1])
-                if path[i] in unvisited: unvisited.remove(path[i])
-                visited.add(path[i]); yield path[i], path[i+1]
+            start = i = self.rng.choice(unvisited)
+            while i in slot:
+                j = self.rng.choice(neighbors(i))
+                exit_to[i] = j; i = j
+            i = start
+            while i in slot:
+                j = exit_to[i]
+                grid.link_index(i, j); visit(i)
+                yield grid.cell_at(i), grid.cell_at(j)
+                i = j
 
 class Kruskals(MazeGenerator):
+    vectorized = True
+
+    def passages(self, grid: Grid):
+        return maze_vectorized.kruskal(grid, self.rng) if maze_vectorized.vectorizable(grid) else None
+
     def generate_step(self, grid: Grid):
+        passages = self.passages(grid)
+        if passages is not None: yield from maze_vectorized.link_steps(grid, passages); return
         parent = {cell: cell for cell in grid.each_cell()}
         def find(i):
-            if parent[i] == i: return i
-            parent[i] = find(parent[i]); return parent[i]
+            while parent[i] != i: # path halving, no recursion depth to run out of
+                parent[i] = parent[parent[i]]; i = parent[i]
+            return i
         edges = []
         for cell in grid.each_cell():
             for n in cell.active_neighbors:
-                if id(cell) < id(n): edges.append((cell, n))
-        random.shuffle(edges)
+                if cell < n: edges.append((cell, n))  # CellViews are transient: order by position, not id()
+        self.rng.shuffle(edges)
         for u, v in edges:
             root_u, root_v = find(u), find(v)
             if root_u != root_v:
@@ -102,110 +227,237 @@ class Kruskals(MazeGenerator):
                 u.link(v); yield u, v
 
 class Sidewinder(MazeGenerator):
+    vectorized = True
+
+    @staticmethod
+    def stream_rows(columns: int, rows: int, row_mask=None, rng=random, descends=None):
+        """Yields (east, south) per row, like `Ellers.stream_rows`. Each run of eastward
+        links is closed by one southward link, except on the last row."""
+        is_open = row_mask(0) if row_mask else [True] * columns
+        for r in range(rows):
+            last = r == rows - 1
+            below = None if last else (row_mask(r + 1) if row_mask else is_open)
+            down = below if last or not descends else [below[c] and descends(r, c) for c in range(columns)]
+            east, south = [], []
+            start, exits = None, []  # current run: first column and cells with an open cell below
+            for c in range(columns):
+                if not is_open[c]: continue
+                if start is None: start = c
+                if not last and down[c]: exits.append(c)
+                # A run without an exit below keeps going east while it can
+                if c + 1 < columns and is_open[c + 1] and (last or not exits or rng.randint(0, 1)):
+                    east.append(c)
+                    continue
+                if exits: south.append(rng.choice(exits))
+                elif not last and start > 0 and is_open[start - 1]:
+                    east.append(start - 1)  # join the previous run, which has its exit
+                start, exits = None, []
+            east.sort()
+            south.sort()
+            yield east, south
+            is_open = below
+
+    def passages(self, grid: Grid):
+        if maze_vectorized.vectorizable(grid) and maze_vectorized.row_streamable(grid): return maze_vectorized.sidewinder(grid, self.rng)
+        return None
+
     def generate_step(self, grid: Grid):
+        passages = self.passages(grid)
+        if passages is not None: yield from maze_vectorized.link_steps(grid, passages); return
+        descends = _descends(grid)
         for l in range(grid.levels):
-            for r in range(grid.rows):
-                run = []
-                for c in range(grid.columns):
-                    cell = grid.get_cell(r, c, l)
-                    run.append(cell)
-                    if c == grid.columns - 1 or (r < grid.rows - 1 and random.randint(0, 1) == 0):
-                        member = random.choice(run)
-                        north = grid.get_cell(member.row + 1, member.column, l)
-                        if north: member.link(north); yield member, north
-                        elif l < grid.levels - 1:
-                            above = grid.get_cell(member.row, member.column, l+1)
-                            if above: member.link(above); yield member, above
-                        run = []
-                    else:
-                        east = grid.get_cell(r, c + 1, l)
-                        if east: cell.link(east); yield cell, east
+            window = {}
+            def row_cells(r, l=l):
+                window.pop(r - 2, None)
+                window[r] = [grid.get_cell(r, c, l) for c in range(grid.columns)]
+                return window[r]
+            for r, (east, south) in enumerate(self.stream_rows(grid.columns, grid.rows, row_cells, self.rng, descends)):
+                cells = window[r]
+                for c in east:
+                    cells[c].link(cells[c + 1]); yield cells[c], cells[c + 1]
+                for c in south:
+                    bottom = window[r + 1][c]
+                    cells[c].link(bottom); yield cells[c], bottom
+            # The last row is one open corridor; a random cell of it climbs to the next floor
+            if l < grid.levels - 1:
+                top = [cell for cell in window[grid.rows - 1] if cell]
+                member = self.rng.choice(top) if top else None
+                above = grid.get_cell(member.row, member.column, l + 1) if member else None
+                if above: member.link(above); yield member, above
 
 class HuntAndKill(MazeGenerator):
     def generate_step(self, grid: Grid):
-        current = grid.random_cell()
+        if isinstance(grid, ArrayGrid): yield from self._index_steps(grid); return
+        # The hunt pops the first cell in scan order that borders the carved region
+        # from a heap, instead of rescanning the grid from the top on every dead end.
+        order = {cell: i for i, cell in enumerate(grid.each_cell())}
+        frontier = []
+        def border(cell):
+            for n in cell.active_neighbors:
+                if not n.get_links(): heapq.heappush(frontier, (order[n], n))
+        current = grid.random_cell(self.rng)
         while current:
             unvisited_neighbors = [n for n in current.active_neighbors if not n.get_links()]
             if unvisited_neighbors:
-                neighbor = random.choice(unvisited_neighbors)
+                neighbor = self.rng.choice(unvisited_neighbors)
+                fresh = not current.get_links()
                 current.link(neighbor)
+                if fresh: border(current)
+                border(neighbor)
                 yield current, neighbor
                 current = neighbor
             else:
                 current = None
-                for cell in grid.each_cell():
-                    visited_neighbors = [n for n in cell.active_neighbors if n.get_links()]
-                    if not cell.get_links() and visited_neighbors:
-                        current = cell
-                        neighbor = random.choice(visited_neighbors)
-                        current.link(neighbor)
-                        yield current, neighbor
-                        break
+                while frontier:
+                    _, cell = heapq.heappop(frontier)
+                    if cell.get_links(): continue # Carved since it was queued
+                    current = cell
+                    neighbor = self.rng.choice([n for n in cell.active_neighbors if n.get_links()])
+                    current.link(neighbor)
+                    border(current)
+                    yield current, neighbor
+                    break
+
+    def _index_steps(self, grid: ArrayGrid):
+        # Scan order is index order, so the heap holds bare indices.
+        mask, bits = grid.active_mask, grid.link_bits
+        frontier = []
+        def border(i):
+            for _, j in grid.neighbor_slots(i):
+                if mask[j] and not bits[j]: heapq.heappush(frontier, j)
+        start = grid.random_cell(self.rng)
+        i = start.index if start else None
+        while i is not None:
+            unvisited = [j for _, j in grid.neighbor_slots(i) if mask[j] and not bits[j]]
+            if unvisited:
+                j = self.rng.choice(unvisited)
+                fresh = not bits[i]
+                grid.link_index(i, j)
+                if fresh: border(i)
+                border(j)
+                yield grid.cell_at(i), grid.cell_at(j)
+                i = j
+            else:
+                i = None
+                while frontier:
+                    k = heapq.heappop(frontier)
+                    if bits[k]: continue # Carved since it was queued
+                    j = self.rng.choice([n for _, n in grid.neighbor_slots(k) if mask[n] and bits[n]])
+                    grid.link_index(k, j)
+                    border(k)
+                    yield grid.cell_at(k), grid.cell_at(j)
+                    i = k
+                    break
 
 class Ellers(MazeGenerator):
+    @staticmethod
+    def stream_rows(columns: int, rows: int, row_mask=None, rng=random, descends=None):
+        """Yields (east, south) per row: the columns linked to their east neighbour and
+        the columns linked to the row below. Only one row of set ids is kept, so memory
+        is O(columns) however tall the maze is. row_mask(r), if given, is called once per
+        row in order and returns a sequence whose falsy entries are closed cells. `rng`
+        supplies the random draws. descends(r, c), if given, tells whether cell c of row
+        r borders the cell below it (on triangles only every other cell does); the
+        others never link south."""
+        is_open = row_mask(0) if row_mask else [True] * columns
+        carried = [-1] * columns  # set id handed down from the row above (a column index)
+        for r in range(rows):
+            last = r == rows - 1
+            below = None if last else (row_mask(r + 1) if row_mask else is_open)
+            down = below if last or not descends else [below[c] and descends(r, c) for c in range(columns)]
+            # Per-row union-find over column positions, seeded with the carried sets
+            parent = list(range(columns))
+            def find(x):
+                while parent[x] != x:
+                    parent[x] = parent[parent[x]]
+                    x = parent[x]
+                return x
+            first = {}
+            for c in range(columns):
+                sid = carried[c]
+                if sid >= 0:
+                    if sid in first: parent[c] = first[sid]
+                    else: first[sid] = c
+
+            # 1. Merge right (always on the last row, so every set joins up)
+            east = []
+            for c in range(columns - 1):
+                if is_open[c] and is_open[c + 1]:
+                    a, b = find(c), find(c + 1)
+                    if a != b and (last or rng.random() < 0.5):
+                        parent[b] = a
+                        east.append(c)
+            if not last:
+                # Masked rows can narrow: a set with no open cell below would be sealed
+                # off, so it is merged into a neighbouring set instead.
+                exits = {}
+                for c in range(columns):
+                    if is_open[c] and down[c]: exits[find(c)] = True
+                for c in range(columns - 1):
+                    if is_open[c] and is_open[c + 1]:
+                        a, b = find(c), find(c + 1)
+                        if a != b and not (exits.get(a) and exits.get(b)):
+                            parent[b] = a
+                            exits[a] = exits.get(a) or exits.get(b)
+                            east.append(c)
+                east.sort()
+
+            # 2. Down: at least one per set, then random
+            carried = [-1] * columns
+            if not last:
+                sets = {}
+                for c in range(columns):
+                    if is_open[c] and down[c]: sets.setdefault(find(c), []).append(c)
+                for sid, cols in sets.items():
+                    rng.shuffle(cols)
+                    carried[cols[0]] = sid
+                    for c in cols[1:]:
+                        if rng.random() < 0.5: carried[c] = sid
+            yield east, [c for c in range(columns) if carried[c] >= 0]
+            is_open = below
+
     def generate_step(self, grid: Grid):
         # Works best on 2D, but we'll iterate levels too
+        descends = _descends(grid)
         for l in range(grid.levels):
-            row_sets = {} # cell -> set_id
-            next_set_id = 0
-            
-            for r in range(grid.rows):
-                row_cells = [grid.get_cell(r, c, l) for c in range(grid.columns)]
-                # 1. Initialize
-                for cell in row_cells:
-                    if cell not in row_sets:
-                        row_sets[cell] = next_set_id
-                        next_set_id += 1
-                
-                # 2. Merge Right
-                for c in range(grid.columns - 1):
-                    cell = row_cells[c]
-                    next_cell = row_cells[c+1]
-                    if row_sets[cell] != row_sets[next_cell]:
-                        if r == grid.rows - 1 or random.choice([True, False]):
-                            cell.link(next_cell)
-                            old_set, new_set = row_sets[next_cell], row_sets[cell]
-                            # Merge sets - naive linear scan is fine for these sizes
-                            for k, v in list(row_sets.items()):
-                                if v == old_set: row_sets[k] = new_set
-                            yield cell, next_cell
-                
-                # 3. Vertical (Down)
-                if r < grid.rows - 1:
-                    sets = {}
-                    for cell in row_cells:
-                        sid = row_sets[cell]
-                        if sid not in sets: sets[sid] = []
-                        sets[sid].append(cell)
-                    
-                    for sid, cells in sets.items():
-                        random.shuffle(cells)
-                        count = 0
-                        for cell in cells:
-                            # At least one per set, then random
-                            if count == 0 or random.choice([True, False]):
-                                bottom = grid.get_cell(r+1, cell.column, l)
-                                if bottom:
-                                    cell.link(bottom)
-                                    row_sets[bottom] = sid
-                                    yield cell, bottom
-                                    count += 1
-            
+            window = {}  # the two rows stream_rows is currently looking at
+            def row_cells(r, l=l):
+                window.pop(r - 2, None)
+                window[r] = [grid.get_cell(r, c, l) for c in range(grid.columns)]
+                return window[r]
+            for r, (east, south) in enumerate(self.stream_rows(grid.columns, grid.rows, row_cells, self.rng, descends)):
+                cells = window[r]
+                for c in east:
+                    cells[c].link(cells[c + 1])
+                    yield cells[c], cells[c + 1]
+                for c in south:
+                    bottom = window[r + 1][c]
+                    cells[c].link(bottom)
+                    yield cells[c], bottom
+
             # Link levels (basic vertical shaft)
             if l < grid.levels - 1:
-                u = grid.get_cell(random.randint(0, grid.rows-1), random.randint(0, grid.columns-1), l)
-                v = grid.get_cell(u.row, u.column, l+1)
-                if u and v:
+                shafts = [(u, v) for u in grid.each_cell_in_level(l)
+                          for v in (grid.get_cell(u.row, u.column, l+1),) if v]
+                if shafts:
+                    u, v = self.rng.choice(shafts)
                     u.link(v); yield u, v
 
 class RecursiveDivision(MazeGenerator):
     def generate_step(self, grid: Grid):
         for cell in grid.each_cell():
             for n in cell.active_neighbors: cell.link(n)
+        descends = _descends(grid)
+        # Triangles border the row below only every other column, so a chamber one
+        # column wide would fall apart: there walls down the rows leave two columns a
+        # side, and a wall across the columns passes where the cells on both sides touch.
+        narrowest = 1 if all(descends(r, c) for r in (0, 1) for c in (0, 1)) else 2
         def divide(r, c, h, w, l):
             if h <= 1 or w <= 1: return
-            if random.choice([True, False]) if h != w else h > w:
-                wall_r, pass_c = random.randint(r, r+h-2), random.randint(c, c+w-1)
+            horizontal = self.rng.choice([True, False]) if h != w else h > w
+            if horizontal or w < 2 * narrowest:
+                wall_r, pass_c = self.rng.randint(r, r+h-2), self.rng.randint(c, c+w-1)
+                if not descends(wall_r, pass_c): pass_c += 1 if pass_c < c+w-1 else -1
                 for col in range(c, c+w):
                     if col != pass_c:
                         u, v = grid.get_cell(wall_r, col, l), grid.get_cell(wall_r+1, col, l)
@@ -214,7 +466,7 @@ class RecursiveDivision(MazeGenerator):
                 yield from divide(r, c, wall_r-r+1, w, l)
                 yield from divide(wall_r+1, c, r+h-wall_r-1, w, l)
             else:
-                wall_c, pass_r = random.randint(c, c+w-2), random.randint(r, r+h-1)
+                wall_c, pass_r = self.rng.randint(c+narrowest-1, c+w-narrowest-1), self.rng.randint(r, r+h-1)
                 for row in range(r, r+h):
                     if row != pass_r:
                         u, v = grid.get_cell(row, wall_c, l), grid.get_cell(row, wall_c+1, l)
@@ -225,55 +477,60 @@ class RecursiveDivision(MazeGenerator):
         for l in range(grid.levels):
             yield from divide(0, 0, grid.rows, grid.columns, l)
             if l < grid.levels - 1:
-                # One guaranteed vertical passage per division level
-                u, v = grid.get_cell(random.randint(0, grid.rows-1), random.randint(0, grid.columns-1), l), grid.get_cell(0, 0, l+1)
-                # Just random link to next level
-                target = grid.get_cell(random.randint(0, grid.rows-1), random.randint(0, grid.columns-1), l+1)
-                u.link(target); yield u, target
+                # One guaranteed vertical passage per division level, between cells stacked on each other
+                shafts = [(u, v) for u in grid.each_cell_in_level(l)
+                          for v in (grid.get_cell(u.row, u.column, l+1),) if v]
+                if shafts:
+                    u, v = self.rng.choice(shafts)
+                    u.link(v); yield u, v
 
 # --- SOLVERS ---
 
+class SolverEvent(NamedTuple):
+    """One step of a solver's search, as streamed by `MazeSolver.solve_step`.
+
+    `frontier` - `cell` was discovered from `parent`; `visit` - `cell` was
+    expanded; `path` - the search finished and `path` holds the result.
+    `side` is 1 for the goal-rooted half of a bidirectional search, else 0.
+    """
+    kind: str
+    cell: Cell
+    parent: Optional[Cell] = None
+    path: Optional[List[Tuple[int, int, int]]] = None
+    side: int = 0
+
 class MazeSolver:
+    optimal = False  # whether `solve` always returns a shortest path
     def solve(self, grid: Grid, start: Cell, goal: Cell):
-        res = []
-        for path in self.solve_step(grid, start, goal): res = path
-        return res
-
-    def solve_multi(self, grid: Grid, start: Cell, targets: List[Cell], goal: Cell):
-        """Finds path through all targets using a greedy nearest-neighbor approach."""
-        current_start = start
-        remaining_targets = list(targets)
-        full_path = []
-        
-        while remaining_targets:
-            # Simple greedy: find nearest target from current position
-            best_target = None
-            shortest_len = float('inf')
-            best_segment = []
-            
-            for t in remaining_targets:
-                segment = self.solve(grid, current_start, t)
-                if len(segment) < shortest_len:
-                    shortest_len = len(segment)
-                    best_target = t
-                    best_segment = segment
-            
-            if full_path:
-                full_path.extend(best_segment[1:]) # Don't duplicate target/start node
-            else:
-                full_path.extend(best_segment)
-                
-            current_start = best_target
-            remaining_targets.remove(best_target)
-            yield full_path
-            
-        # Final leg to goal
-        final_segment = self.solve(grid, current_start, goal)
-        if full_path:
-            full_path.extend(final_segment[1:])
-        else:
-            full_path.extend(final_segment)
-        yield full_path
+        came_from = {start: None}
+        for _ in self._search(grid, start, goal, came_from, False): pass
+        return self.reconstruct(came_from, start, goal)
+
+    def solve_step(self, grid: Grid, start: Cell, goal: Cell):
+        """Yields `SolverEvent`s as the search runs, ending with the `path` event."""
+        came_from = {start: None}
+        yield from self._search(grid, start, goal, came_from, True)
+        yield SolverEvent("path", goal, path=self.reconstruct(came_from, start, goal))
+
+    def _search(self, grid: Grid, start: Cell, goal: Cell, came_from: Dict[Cell, Cell], trace: bool):
+        """Fills `came_from` until `goal` is reached; yields frontier/visit events only when tracing."""
+        raise NotImplementedError
+
+    def solve_multi(self, grid: Grid, start: Cell, targets: List[Cell], goal: Cell, fields: Optional[DistanceFields] = None):
+        """Finds the shortest route through all reachable targets to the goal.
+
+        The visiting order comes from `plan_route` and the legs from target-rooted
+        distance fields, so each target is searched once (and never again if
+        `fields` is a cache kept by the caller). Yields a `path` event with the
+        route so far after each leg. The route comes from the fields alone, so it
+        is the same whichever solver it is called on.
+        """
+        fields = fields or DistanceFields(grid)
+        full_path = [(start.row, start.column, start.level)]
+        for target in plan_route(fields, start, targets, goal) + [goal]:
+            full_path.extend(fields.path(start, target)[1:]) # Don't duplicate target/start node
+            start = target
+            yield SolverEvent("path", target, path=list(full_path))
 
     def reconstruct(self, came_from, start, goal):
         path, curr = [], goal
@@ -284,40 +541,216 @@ class MazeSolver:
         return path[::-1]
 
 class BFS_Solver(MazeSolver):
-    def solve_step(self, grid, start, goal):
-        q, came_from = deque([start]), {start: None}
+    optimal = True
+    def _search(self, grid, start, goal, came_from, trace):
+        q = deque([start])
         while q:
             curr = q.popleft()
+            if trace: yield SolverEvent("visit", curr)
             if curr == goal: break
             for n in curr.get_links():
                 if n not in came_from:
                     came_from[n] = curr; q.append(n)
-                    yield self.reconstruct(came_from, start, n)
-        yield self.reconstruct(came_from, start, goal)
+                    if trace: yield SolverEvent("frontier", n, curr)
 
 class DFS_Solver(MazeSolver):
-    def solve_step(self, grid, start, goal):
-        stack, came_from = [start], {start: None}
+    def _search(self, grid, start, goal, came_from, trace):
+        stack = [start]
         while stack:
             curr = stack.pop()
+            if trace: yield SolverEvent("visit", curr)
             if curr == goal: break
             for n in curr.get_links():
                 if n not in came_from:
                     came_from[n] = curr; stack.append(n)
-                    yield self.reconstruct(came_from, start, n)
-        yield self.reconstruct(came_from, start, goal)
+                    if trace: yield SolverEvent("frontier", n, curr)
+
+# Shaft lists longer than this are not scanned per heuristic call; the bound then
+# keeps only the stair count and the goal's own nearest shaft.
+STAIR_SCAN_LIMIT = 16
 
 class AStar_Solver(MazeSolver):
-    def solve_step(self, grid, start, goal):
-        pq, came_from, g = [(0, start)], {start: None}, {start: 0}
+    """A* guided by the grid's own lattice distance (`Grid.planar_distance`).
+
+    Heap entries are (f, h, -seq, cell): ties on f go to the cell nearer the
+    goal, then to the newest entry, so cells themselves are never compared.
+    """
+    optimal = True
+    def __init__(self):
+        self._stairs = None # (grid, version, shaft positions per floor)
+
+    def stairs(self, grid: Grid) -> List[List[Tuple[int, int]]]:
+        """(row, col) of every shaft between floor l and l + 1, cached per grid version."""
+        cached = self._stairs
+        if cached and cached[0] is grid and cached[1] == grid.version: return cached[2]
+        stairs = [[] for _ in range(grid.levels - 1)]
+        for l in range(grid.levels - 1):
+            for cell in grid.each_cell_in_level(l):
+                if any(n.level > l for n in cell.get_links()): stairs[l].append((cell.row, cell.column))
+        self._stairs = (grid, grid.version, stairs)
+        return stairs
+
+    def make_heuristic(self, grid: Grid, goal: Cell):
+        """h(cell) towards `goal`: the planar distance, or, across floors, one move per
+        floor plus the walk to the nearest usable shaft and from the goal's nearest one."""
+        dist, gr, gc, gl = grid.planar_distance, goal.row, goal.column, goal.level
+        stairs = self.stairs(grid) if grid.levels > 1 else []
+        def nearest(shafts, r, c):
+            if not shafts or len(shafts) > STAIR_SCAN_LIMIT: return 0
+            return min(dist(r, c, sr, sc) for sr, sc in shafts)
+        from_below = nearest(stairs[gl - 1], gr, gc) if gl > 0 else 0
+        from_above = nearest(stairs[gl], gr, gc) if gl < grid.levels - 1 else 0
+        def h(cell):
+            r, c, l = cell.row, cell.column, cell.level
+            planar = dist(r, c, gr, gc)
+            if l == gl: return planar
+            if l < gl: via = nearest(stairs[l], r, c) + from_below
+            else: via = nearest(stairs[l - 1], r, c) + from_above
+            return abs(l - gl) + max(planar, via)
+        return h
+
+    def _search(self, grid, start, goal, came_from, trace):
+        h, seq = self.make_heuristic(grid, goal), itertools.count()
+        pq, g = [(h(start), 0, 0, start)], {start: 0}
         while pq:
-            _, curr = heapq.heappop(pq)
+            curr = heapq.heappop(pq)[3]
+            if trace: yield SolverEvent("visit", curr)
             if curr == goal: break
             for n in curr.get_links():
                 score = g[curr] + 1
                 if n not in g or score < g[n]:
-                    g[n] = score
-                    f = score + abs(n.row-goal.row) + abs(n.column-goal.column) + abs(n.level-goal.level)*5
-                    heapq.heappush(pq, (f, n)); came_from[n] = curr
-                    yield self.reconstruct(came_from, start, n)
-        yield self.reconstruct(came_from, start, goal)
\ No newline at end of file
+                    g[n], hn = score, h(n)
+                    heapq.heappush(pq, (score + hn, hn, -next(seq), n)); came_from[n] = curr
+                    if trace: yield SolverEvent("frontier", n, curr)
+
+def _splice(came_from: Dict[Cell, Cell], came_back: Dict[Cell, Cell], meet: Cell):
+    """Points `came_from` along the backward search's chain from `meet` to the goal."""
+    node, nxt = meet, came_back[meet]
+    while nxt is not None:
+        came_from[nxt] = node
+        node, nxt = nxt, came_back[nxt]
+
+class BidirectionalBFS_Solver(MazeSolver):
+    """Breadth-first search from both ends, growing the smaller frontier a layer at a time."""
+    optimal = True
+    def _search(self, grid, start, goal, came_from, trace):
+        if start == goal: return
+        came_back, dist = {goal: None}, ({start: 0}, {goal: 0})
+        frontiers = [[start], [goal]]
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, d, other = (came_from, came_back)[side], dist[side], dist[1 - side]
+            layer, meet, best = [], None, float('inf')
+            for curr in frontiers[side]:
+                if trace: yield SolverEvent("visit", curr, side=side)
+                for n in curr.get_links():
+                    if n in seen: continue
+                    seen[n], d[n] = curr, d[curr] + 1; layer.append(n)
+                    if trace: yield SolverEvent("frontier", n, curr, side=side)
+                    # Finish the layer: a later meeting in it may still be shorter
+                    if n in other and d[n] + other[n] < best: meet, best = n, d[n] + other[n]
+            if meet is not None:
+                _splice(came_from, came_back, meet); return
+            frontiers[side] = layer
+
+class BidirectionalAStar_Solver(AStar_Solver):
+    """A* from both ends, each side aiming at the other's root.
+
+    Stops once either queue's best f can no longer beat the shortest meeting
+    found so far, then joins the two half-paths at that meeting cell.
+    """
+    def _search(self, grid, start, goal, came_from, trace):
+        if start == goal: return
+        hs, seq, came_back = (self.make_heuristic(grid, goal), self.make_heuristic(grid, start)), itertools.count(), {goal: None}
+        parents, g = (came_from, came_back), ({start: 0}, {goal: 0})
+        queues, closed = ([(hs[0](start), 0, 0, start)], [(hs[1](goal), 0, 0, goal)]), (set(), set())
+        meet, best = None, float('inf')
+        while queues[0] and queues[1] and max(queues[0][0][0], queues[1][0][0]) < best:
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            curr = heapq.heappop(queues[side])[3]
+            if curr in closed[side]: continue
+            closed[side].add(curr)
+            if trace: yield SolverEvent("visit", curr, side=side)
+            gs, other, h = g[side], g[1 - side], hs[side]
+            for n in curr.get_links():
+                score = gs[curr] + 1
+                if n not in gs or score < gs[n]:
+                    gs[n], parents[side][n], hn = score, curr, h(n)
+                    heapq.heappush(queues[side], (score + hn, hn, -next(seq), n))
+                    if trace: yield SolverEvent("frontier", n, curr, side=side)
+                    if n in other and score + other[n] < best: meet, best = n, score + other[n]
+        if meet is not None: _splice(came_from, came_back, meet)
+
+class JunctionSolver(MazeSolver):
+    """Dijkstra over the grid's `JunctionGraph`, which is cached per grid version.
+
+    Only junctions, dead ends and stairs are expanded; corridors are crossed in
+    one step. `solve_step` reports the expanded junctions, then the path.
+    """
+    optimal = True
+    def __init__(self):
+        self._graph = None # (grid, version, JunctionGraph)
+
+    def graph(self, grid: Grid) -> JunctionGraph:
+        cached = self._graph
+        if cached and cached[0] is grid and cached[1] == grid.version: return cached[2]
+        graph = JunctionGraph(grid)
+        self._graph = (grid, grid.version, graph)
+        return graph
+
+    def _search(self, grid, start, goal, came_from, trace):
+        graph, expanded = self.graph(grid), []
+        route = graph.search(start, goal, expanded.append if trace else None)
+        for node in expanded:
+            yield SolverEvent("visit", grid.get_cell(*graph.coords(node)))
+        cells = [grid.get_cell(*graph.coords(i)) for i in route]
+        for a, b in zip(cells, cells[1:]): came_from[b] = a
+
+class SolverTrace:
+    """Turns a solver's event stream into the partial path drawn while it animates.
+
+    The shown path runs from the start (or, for the goal-rooted half of a
+    bidirectional search, the goal) to the most recently discovered cell.
+    It is rebuilt at most once per `advance`, and only patched when the new
+    cell is a child or sibling of the current tip, so animating costs O(1) per event
+    plus O(L) per frame instead of O(L) per event.
+    """
+    def __init__(self, events):
+        self.events = events
+        self.parents: Tuple[Dict[Cell, Cell], Dict[Cell, Cell]] = ({}, {})  # per search side
+        self.side = 0  # side of the search the shown path belongs to
+        self.path: List[Tuple[int, int, int]] = []
+        self.done = False
+
+    def advance(self, budget: int = 5) -> bool:
+        """Consumes events until `budget` cells were discovered; False once the stream ends."""
+        tip, stale = None, False
+        try:
+            while budget > 0:
+                ev = next(self.events)
+                if ev.kind == "frontier":
+                    self.parents[ev.side][ev.cell] = ev.parent
+                    stale = stale or ev.side != self.side or not self._patch(ev.cell, ev.parent)
+                    tip, self.side, budget = ev.cell, ev.side, budget - 1
+                elif ev.kind == "path":
+                    self.path, tip, stale, budget = ev.path, None, False, budget - 1
+        except StopIteration:
+            self.done = True
+        if stale: self._rebuild(tip)
+        return not self.done
+
+    def _patch(self, cell: Cell, parent: Cell) -> bool:
+        """Moves the tip to `cell` in O(1) if it is a child or sibling of the current tip."""
+        path, key = self.path, (parent.row, parent.column, parent.level)
+        if path and path[-1] == key:
+            path.append((cell.row, cell.column, cell.level)); return True
+        if len(path) > 1 and path[-2] == key:
+            path[-1] = (cell.row, cell.column, cell.level); return True
+        return False
+
+    def _rebuild(self, tip: Cell):
+        path, curr, parents = [], tip, self.parents[self.side]
+        while curr is not None:
+            path.append((curr.row, curr.column, curr.level))
+            curr = parents.get(curr)
+        self.path = path[::-1]
@@ -0,0 +1,430 @@
+# maze_analysis.py
+"""Whole-maze queries answered from precomputed search results.
+
+A `DistanceField` is one breadth-first search from a root cell, kept as flat
+distance and parent arrays indexed like `ArrayGrid` (level-major, then row,
+then column). Any cell's shortest path to the root is then a parent-pointer
+walk, so re-solving after the player moves costs O(path length).
+
+`DistanceFields` caches one field per root for a grid and drops them all as
+soon as `Grid.version` changes, i.e. after any link, unlink or mask change.
+`plan_route` orders star pickups from the same fields. On perfect mazes a
+`TreeIndex` answers the same queries by lowest common ancestor instead.
+`JunctionGraph` contracts corridors so searches only visit junctions.
+"""
+import heapq
+import itertools
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from maze_topology import Grid, Cell
+
+Coord = Tuple[int, int, int]
+INF = float('inf')
+
+def _linked_indices(grid: Grid):
+    """Index -> linked indices, straight from the bitmasks when the grid has them."""
+    if hasattr(grid, "link_bits"): return grid.linked_indices
+    cells = [cell for level in grid.grid for row in level for cell in row]
+    L, C = grid.rows * grid.columns, grid.columns
+    return lambda i: [n.level * L + n.row * C + n.column for n in cells[i].links]
+
+def _active_indices(grid: Grid) -> List[int]:
+    if hasattr(grid, "link_bits"): return list(grid._index())
+    L, C = grid.rows * grid.columns, grid.columns
+    return [c.level * L + c.row * C + c.column for c in grid.each_cell()]
+
+class DistanceField:
+    """Shortest-path distance and parent of every cell reachable from `root`.
+
+    The search is lazy: it only runs until the queried cell has been reached,
+    and resumes from its saved queue on the next query further out. A field
+    therefore never costs more than the searches it replaces.
+    """
+    def __init__(self, grid: Grid, root: Cell):
+        self.grid = grid
+        self.version = grid.version
+        self.columns, self.layer_size = grid.columns, grid.rows * grid.columns
+        self.root = self.index(root)
+        count = self.layer_size * grid.levels
+        self.dist = array('i', [-1]) * count
+        self.parent = array('i', [-1]) * count
+        self.dist[self.root] = 0
+        self._queue = deque([self.root])
+        self._neighbors = _linked_indices(grid)
+
+    def index(self, cell: Cell) -> int:
+        return cell.level * self.layer_size + cell.row * self.columns + cell.column
+
+    def coords(self, i: int) -> Coord:
+        l, rem = divmod(i, self.layer_size)
+        r, c = divmod(rem, self.columns)
+        return (r, c, l)
+
+    def _reach(self, target: int = -1) -> int:
+        """Runs the BFS until `target` is discovered (or to completion for -1); returns its distance."""
+        dist, parent, neighbors, q = self.dist, self.parent, self._neighbors, self._queue
+        while q and (target < 0 or dist[target] < 0):
+            i = q.popleft()
+            d = dist[i] + 1
+            for j in neighbors(i):
+                if dist[j] < 0:
+                    dist[j], parent[j] = d, i
+                    q.append(j)
+        return dist[target] if target >= 0 else -1
+
+    def complete(self) -> 'DistanceField':
+        """Finishes the search, so every reachable cell has its distance."""
+        self._reach(); return self
+
+    def distance(self, cell: Cell) -> int:
+        """Steps from `cell` to the root, or -1 if it cannot reach it."""
+        i = self.index(cell)
+        return self.dist[i] if self.dist[i] >= 0 else self._reach(i)
+
+    def path_from(self, cell: Cell) -> List[Coord]:
+        """Shortest path from `cell` to the root as (row, col, level) tuples; [] if unreachable."""
+        if self.distance(cell) < 0: return []
+        i, parent, coords, path = self.index(cell), self.parent, self.coords, []
+        while i >= 0:
+            path.append(coords(i))
+            i = parent[i]
+        return path
+
+    def next_step(self, cell: Cell) -> Optional[Coord]:
+        """The neighbour to move to from `cell` to get closer to the root (a hint)."""
+        if self.distance(cell) <= 0: return None
+        return self.coords(self.parent[self.index(cell)])
+
+class DistanceFields:
+    """Per-grid cache of goal- and star-rooted `DistanceField`s."""
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self._fields: Dict[Coord, DistanceField] = {}
+        self._version = grid.version
+
+    def field(self, root: Cell) -> DistanceField:
+        if self.grid.version != self._version:
+            self._fields.clear(); self._version = self.grid.version
+        key = (root.row, root.column, root.level)
+        f = self._fields.get(key)
+        if f is None: f = self._fields[key] = DistanceField(self.grid, root)
+        return f
+
+    def distance(self, start: Cell, goal: Cell) -> int:
+        return self.field(goal).distance(start)
+
+    def path(self, start: Cell, goal: Cell) -> List[Coord]:
+        """Shortest path from `start` to `goal`, in the same form as `MazeSolver.solve`."""
+        return self.field(goal).path_from(start)
+
+class TreeIndex:
+    """Path queries on a perfect maze by binary lifting.
+
+    When every connected region of the maze is a tree (no braiding), the path
+    between two cells is unique and runs through their lowest common ancestor.
+    Building is O(n log n); `distance` is then O(log n) and `path` O(path
+    length), with no search at all. It answers the same `distance` / `path`
+    calls as `DistanceFields`; see `path_index`.
+    """
+    def __init__(self, grid: Grid, parent: array, depth: array):
+        self.grid, self.version = grid, grid.version
+        self.columns, self.layer_size = grid.columns, grid.rows * grid.columns
+        self.depth = depth
+        # up[k][i]: the 2^k-th ancestor of i (roots are their own parent)
+        self.up = [parent]
+        for _ in range(max(1, max(depth, default=0)).bit_length() - 1):
+            prev = self.up[-1]
+            self.up.append(array('i', [prev[j] if j >= 0 else -1 for j in prev]))
+
+    @classmethod
+    def build(cls, grid: Grid) -> Optional['TreeIndex']:
+        """Roots a BFS tree in every region; None if any region has a loop."""
+        neighbors, count = _linked_indices(grid), grid.rows * grid.columns * grid.levels
+        parent, depth = array('i', [-1]) * count, array('i', [-1]) * count
+        for root in _active_indices(grid):
+            if depth[root] >= 0: continue
+            parent[root], depth[root] = root, 0
+            queue = [root]
+            for i in queue:
+                d = depth[i] + 1
+                for j in neighbors(i):
+                    if depth[j] < 0:
+                        parent[j], depth[j] = i, d
+                        queue.append(j)
+                    elif j != parent[i]: return None # reached twice: a loop
+        return cls(grid, parent, depth)
+
+    def index(self, cell: Cell) -> int:
+        return cell.level * self.layer_size + cell.row * self.columns + cell.column
+
+    def coords(self, i: int) -> Coord:
+        l, rem = divmod(i, self.layer_size)
+        r, c = divmod(rem, self.columns)
+        return (r, c, l)
+
+    def _lca(self, a: int, b: int) -> int:
+        """Lowest common ancestor of two indices, or -1 if they are in different regions."""
+        depth, up = self.depth, self.up
+        if depth[a] < depth[b]: a, b = b, a
+        diff, k = depth[a] - depth[b], 0
+        while diff:
+            if diff & 1: a = up[k][a]
+            diff >>= 1; k += 1
+        if a == b: return a
+        for k in range(len(up) - 1, -1, -1):
+            if up[k][a] != up[k][b]: a, b = up[k][a], up[k][b]
+        a, b = up[0][a], up[0][b]
+        return a if a == b else -1
+
+    def distance(self, start: Cell, goal: Cell) -> int:
+        """Steps between two cells, or -1 if they are not connected."""
+        a, b = self.index(start), self.index(goal)
+        m = self._lca(a, b)
+        if m < 0: return -1
+        return self.depth[a] + self.depth[b] - 2 * self.depth[m]
+
+    def path(self, start: Cell, goal: Cell) -> List[Coord]:
+        """The unique path from `start` to `goal` as (row, col, level) tuples; [] if disconnected."""
+        a, b = self.index(start), self.index(goal)
+        m = self._lca(a, b)
+        if m < 0: return []
+        parent, coords = self.up[0], self.coords
+        head, tail = [], []
+        while a != m: head.append(coords(a)); a = parent[a]
+        while b != m: tail.append(coords(b)); b = parent[b]
+        return head + [coords(m)] + tail[::-1]
+
+def path_index(grid: Grid):
+    """A `TreeIndex` for a perfect maze, else (braided) a `DistanceFields` cache.
+
+    Both answer `distance(start, goal)` and `path(start, goal)`. Build it once
+    the maze is finished: unlike the fields, a tree index ignores later edits.
+    """
+    return TreeIndex.build(grid) or DistanceFields(grid)
+
+def dead_end_fill(grid: Grid, keep: Tuple[Cell, ...] = ()) -> bytearray:
+    """Repeatedly fills dead ends that are not in `keep`; returns the open-cell mask.
+
+    What survives is every cell on some loop or on a route between kept cells:
+    for a perfect maze and keep=(start, goal), exactly the solution path.
+    """
+    neighbors, count = _linked_indices(grid), grid.rows * grid.columns * grid.levels
+    L, C = grid.rows * grid.columns, grid.columns
+    kept = {c.level * L + c.row * C + c.column for c in keep}
+    alive, degree = bytearray(count), array('i', [0]) * count
+    for i in _active_indices(grid):
+        alive[i], degree[i] = 1, len(neighbors(i))
+    stack = [i for i in _active_indices(grid) if degree[i] <= 1 and i not in kept]
+    while stack:
+        i = stack.pop()
+        if not alive[i]: continue
+        alive[i] = 0
+        for j in neighbors(i):
+            if alive[j]:
+                degree[j] -= 1
+                if degree[j] == 1 and j not in kept: stack.append(j)
+    return alive
+
+class JunctionGraph:
+    """Corridor-contracted view of a grid.
+
+    Nodes are junctions, dead ends and stair cells; every chain of plain
+    two-way cells between them becomes one weighted edge that remembers its
+    cells. Searches run over nodes only and `path` expands the winning edges
+    back into cells. With `keep`, `dead_end_fill` runs first and only the
+    surviving cells are contracted (useful for one start/goal pair).
+    """
+    def __init__(self, grid: Grid, keep: Tuple[Cell, ...] = ()):
+        self.grid, self.version = grid, grid.version
+        self.columns, self.layer_size = grid.columns, grid.rows * grid.columns
+        count = self.layer_size * grid.levels
+        linked = _linked_indices(grid)
+        if keep:
+            alive = dead_end_fill(grid, keep)
+            links = lambda i: [j for j in linked(i) if alive[j]]
+            cells = [i for i in _active_indices(grid) if alive[i]]
+        else:
+            links, cells = linked, _active_indices(grid)
+        layer = self.layer_size
+        adjacency = {i: links(i) for i in cells}
+        # node -> [(neighbor node, length, edge id)]
+        self.adjacency: Dict[int, List[Tuple[int, int, int]]] = {}
+        self.edges: List[Tuple[int, int, List[int]]] = [] # (u, v, corridor cells from u to v)
+        self.edge_of = array('i', [-1]) * count # corridor cell -> edge id
+        self.offset = array('i', [-1]) * count  # corridor cell -> position in its edge
+        for i in cells:
+            ns = adjacency[i]
+            if len(ns) != 2 or any(j // layer != i // layer for j in ns): self.adjacency[i] = []
+        for u in list(self.adjacency):
+            self._walk_from(u, adjacency)
+        # Loops made only of two-way cells have no node yet: promote one cell of each
+        for i in cells:
+            if i not in self.adjacency and self.edge_of[i] < 0:
+                self.adjacency[i] = []
+                self._walk_from(i, adjacency)
+
+    def _walk_from(self, u: int, adjacency: Dict[int, List[int]]):
+        nodes, edge_of, offset = self.adjacency, self.edge_of, self.offset
+        for j in adjacency[u]:
+            if j in nodes:
+                if u < j: self._add_edge(u, j, [])
+                continue
+            if edge_of[j] >= 0: continue # walked from its other end
+            eid, corridor, prev, cur = len(self.edges), [], u, j
+            while cur not in nodes:
+                edge_of[cur], offset[cur] = eid, len(corridor)
+                corridor.append(cur)
+                a, b = adjacency[cur]
+                prev, cur = cur, (b if a == prev else a)
+            self._add_edge(u, cur, corridor)
+
+    def _add_edge(self, u: int, v: int, corridor: List[int]):
+        eid = len(self.edges)
+        self.edges.append((u, v, corridor))
+        if u == v: return # a closed loop back to its own node never shortens a route
+        self.adjacency[u].append((v, len(corridor) + 1, eid))
+        self.adjacency[v].append((u, len(corridor) + 1, eid))
+
+    def index(self, cell: Cell) -> int:
+        return cell.level * self.layer_size + cell.row * self.columns + cell.column
+
+    def coords(self, i: int) -> Coord:
+        l, rem = divmod(i, self.layer_size)
+        r, c = divmod(rem, self.columns)
+        return (r, c, l)
+
+    def _exits(self, i: int) -> List[Tuple[int, int, List[int]]]:
+        """(node, steps, cells walked from i towards it, excluding i and the node) for cell i."""
+        if i in self.adjacency: return [(i, 0, [])]
+        eid = self.edge_of[i]
+        if eid < 0: return []
+        u, v, corridor = self.edges[eid]
+        p = self.offset[i]
+        return [(u, p + 1, corridor[:p][::-1]), (v, len(corridor) - p, corridor[p + 1:])]
+
+    def search(self, start: Cell, goal: Cell, visit=None) -> List[int]:
+        """Dijkstra over the nodes; the shortest start -> goal route as cell indices, [] if none.
+
+        `visit(node)` is called for every node taken off the queue.
+        """
+        s, g = self.index(start), self.index(goal)
+        if s == g: return [s]
+        best, route = INF, None
+        # Both ends on the same corridor: walking straight along it is one candidate
+        if self.edge_of[s] >= 0 and self.edge_of[s] == self.edge_of[g]:
+            corridor, ps, pg = self.edges[self.edge_of[s]][2], self.offset[s], self.offset[g]
+            best, route = abs(ps - pg), corridor[ps:pg + 1] if ps < pg else corridor[pg:ps + 1][::-1]
+        targets = {}
+        for node, steps, cells in self._exits(g):
+            if steps < targets.get(node, (INF,))[0]: targets[node] = (steps, cells)
+        dist, prev, seq = {}, {}, itertools.count()
+        queue = []
+        for node, steps, cells in self._exits(s):
+            if steps < dist.get(node, INF):
+                dist[node], prev[node] = steps, (None, cells)
+                heapq.heappush(queue, (steps, next(seq), node))
+        done, end = set(), None
+        while queue:
+            d, _, u = heapq.heappop(queue)
+            if d >= best: break
+            if u in done: continue
+            done.add(u)
+            if visit: visit(u)
+            if u in targets and d + targets[u][0] < best: best, end = d + targets[u][0], u
+            for v, w, eid in self.adjacency[u]:
+                nd = d + w
+                if nd < dist.get(v, INF):
+                    dist[v], prev[v] = nd, (u, eid)
+                    heapq.heappush(queue, (nd, next(seq), v))
+        if end is None: return route or []
+        # Expand node to node back into cells
+        out, node = [end], end
+        while True:
+            before, via = prev[node]
+            if before is None:
+                # `via` runs from the start to this first node
+                if node != s: out.extend(via[::-1]); out.append(s)
+                break
+            u, v, corridor = self.edges[via]
+            out.extend(corridor[::-1] if u == before else corridor)
+            out.append(before); node = before
+        out.reverse()
+        if end != g: out.extend(targets[end][1][::-1] + [g])
+        return out
+
+    def path(self, start: Cell, goal: Cell) -> List[Coord]:
+        return [self.coords(i) for i in self.search(start, goal)]
+
+# Largest number of targets routed exactly; Held-Karp is O(2^k * k^2).
+EXACT_ROUTE_LIMIT = 12
+
+def _held_karp(from_start, between, to_goal) -> List[int]:
+    """Exact shortest start -> every target -> goal order over the distance matrix."""
+    k = len(from_start)
+    full = (1 << k) - 1
+    # best[mask][j]: shortest walk from the start through `mask`, ending at target j
+    best = [[INF] * k for _ in range(full + 1)]
+    prev = [[-1] * k for _ in range(full + 1)]
+    for j in range(k): best[1 << j][j] = from_start[j]
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for j in range(k):
+            cost = row[j]
+            if cost == INF: continue
+            dj = between[j]
+            for n in range(k):
+                bit = 1 << n
+                if mask & bit: continue
+                c = cost + dj[n]
+                if c < best[mask | bit][n]:
+                    best[mask | bit][n] = c; prev[mask | bit][n] = j
+    last = min(range(k), key=lambda j: best[full][j] + to_goal[j])
+    order, mask = [], full
+    while last >= 0:
+        order.append(last)
+        mask, last = mask & ~(1 << last), prev[mask][last]
+    return order[::-1]
+
+def _nearest_two_opt(from_start, between, to_goal) -> List[int]:
+    """Nearest-neighbour order polished with 2-opt segment reversals (ends stay fixed)."""
+    k = len(from_start)
+    left = set(range(k))
+    order = [min(left, key=lambda j: from_start[j])]
+    left.discard(order[0])
+    while left:
+        here = between[order[-1]]
+        nxt = min(left, key=lambda j: here[j])
+        order.append(nxt); left.discard(nxt)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(k - 1):
+            a = from_start[order[i]] if i == 0 else between[order[i - 1]][order[i]]
+            for j in range(i + 1, k):
+                b = to_goal[order[j]] if j == k - 1 else between[order[j]][order[j + 1]]
+                # Reversing order[i..j] swaps which ends the two outer edges attach to
+                na = from_start[order[j]] if i == 0 else between[order[i - 1]][order[j]]
+                nb = to_goal[order[i]] if j == k - 1 else between[order[i]][order[j + 1]]
+                if na + nb < a + b:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    a = na; improved = True
+    return order
+
+def plan_route(fields: DistanceFields, start: Cell, targets: List[Cell], goal: Cell) -> List[Cell]:
+    """Shortest order to visit every reachable target between `start` and `goal`.
+
+    The distance matrix costs one field per target (plus the goal's), reused from
+    `fields`, or nothing with a `TreeIndex` (any `path_index` result works). Up to `EXACT_ROUTE_LIMIT` targets the order is exact (Held-Karp);
+    beyond that it is nearest neighbour improved by 2-opt. Unreachable targets
+    are left out.
+    """
+    targets = [t for t in targets if fields.distance(start, t) >= 0]
+    if len(targets) < 2: return targets
+    from_start = [fields.distance(start, t) for t in targets]
+    between = [[fields.distance(a, b) for b in targets] for a in targets]
+    to_goal = [fields.distance(t, goal) for t in targets]
+    to_goal = [d if d >= 0 else INF for d in to_goal]
+    solve = _held_karp if len(targets) <= EXACT_ROUTE_LIMIT else _nearest_two_opt
+    return [targets[i] for i in solve(from_start, between, to_goal)]
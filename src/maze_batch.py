@@ -0,0 +1,91 @@
+# maze_batch.py
+"""Many shortest-path queries against one maze, optionally across processes.
+
+`batch_solve` groups (start, goal) pairs by start so that a single BFS (a lazy
+`DistanceField`) answers every goal of that start. With more than one worker
+the maze is written once to a temporary maze file, and each worker maps it
+read-only through `open_grid`: the workers share the page cache, and only
+coordinates and results cross the process boundary, never `Cell`
+graphs.
+"""
+import multiprocessing
+import os
+import tempfile
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from maze_topology import Grid
+from maze_analysis import DistanceField
+from maze_storage import save_grid, open_grid
+
+Coord = Tuple[int, int, int]
+# One task: (start, [(query position, goal), ...]) per start
+Group = Tuple[Coord, List[Tuple[int, Coord]]]
+
+class _At(NamedTuple):
+    """Stands in for a cell wherever only its coordinates are read."""
+    row: int
+    column: int
+    level: int
+
+class BatchResult(NamedTuple):
+    lengths: array # steps per query, -1 where the goal cannot be reached
+    paths: Optional[List[List[Coord]]] # per query, when requested
+
+def _solve_groups(grid: Grid, groups: List[Group], with_paths: bool):
+    """(position, length, path or None) for every query of the given groups."""
+    out = []
+    for source, queries in groups:
+        field = DistanceField(grid, _At(*source))
+        for pos, goal in queries:
+            cell = _At(*goal)
+            d = field.distance(cell)
+            out.append((pos, d, field.path_from(cell)[::-1] if with_paths and d >= 0 else None))
+    return out
+
+_worker_grid: Optional[Grid] = None
+
+def _init_worker(path: str):
+    global _worker_grid
+    _worker_grid = open_grid(path)
+
+def _run_chunk(args: Tuple[List[Group], bool]):
+    groups, with_paths = args
+    return _solve_groups(_worker_grid, groups, with_paths)
+
+def _coords(cell) -> Coord:
+    return (cell.row, cell.column, cell.level) if hasattr(cell, "row") else tuple(cell)
+
+def batch_solve(grid: Grid, pairs: Sequence, paths: bool = False,
+                workers: Optional[int] = None, chunk: int = 32) -> BatchResult:
+    """Shortest-path lengths (and optionally paths) for many (start, goal) pairs.
+
+    Pairs may hold cells or (row, col, level) tuples. `workers` defaults to the
+    CPU count; with one worker, or a single start, everything runs in-process.
+    `chunk` is the number of starts handed to a worker at a time.
+    """
+    groups: Dict[Coord, List[Tuple[int, Coord]]] = {}
+    for pos, (start, goal) in enumerate(pairs):
+        groups.setdefault(_coords(start), []).append((pos, _coords(goal)))
+    tasks = list(groups.items())
+    lengths = array('i', [-1]) * len(pairs)
+    found: Optional[List[List[Coord]]] = [[] for _ in pairs] if paths else None
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(tasks) < 2:
+        results = [_solve_groups(grid, tasks, paths)]
+    else:
+        fd, path = tempfile.mkstemp(suffix=".pmaz")
+        os.close(fd)
+        try:
+            save_grid(grid, path)
+            chunks = [(tasks[i:i + chunk], paths) for i in range(0, len(tasks), chunk)]
+            with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(path,)) as pool:
+                results = list(pool.imap_unordered(_run_chunk, chunks))
+        finally:
+            os.remove(path)
+    for result in results:
+        for pos, d, p in result:
+            lengths[pos] = d
+            if found is not None and p: found[pos] = p
+    return BatchResult(lengths, found)
@@ -0,0 +1,175 @@
+# maze_builder.py
+"""Off-thread maze construction.
+
+`MazeBuildJob` runs generation, braiding, all CPU-side geometry (wall and
+stair polygons for the game and map views, their triangulated shapes, FOV
+segments) and the maze's path index on a worker thread, publishing progress as it goes. The window thread
+polls the job and only batches the finished shapes into `ShapeElementList`s,
+which is the part that has to touch the GPU context.
+"""
+import random
+import threading
+import traceback
+from typing import Any, Callable, List, Optional
+
+import config
+import maze_vectorized
+from maze_topology import Grid
+from maze_algorithms import MazeGenerator
+from maze_analysis import path_index
+from maze_cache import CachedMaze, MazeCache, MazeKey
+
+# Share of the progress bar spent generating; geometry takes the rest.
+GENERATION_SHARE = 0.6
+
+def maze_rng(seed: int, stream: str) -> random.Random:
+    """The RNG for one stage ("braid", "layout") of building the maze named by `seed`.
+
+    The generator itself is seeded with `seed`; each other stage gets its own
+    stream, so one seed fixes the whole maze, whatever order the stages run in.
+    """
+    return random.Random(f"{seed}/{stream}")
+
+class BuildCancelled(Exception):
+    pass
+
+class MazeBuildJob:
+    """Builds a maze and its render geometry on a daemon thread.
+
+    `stage` and `progress` (0..1) may be read from any thread. Once `done` is
+    set, `walls`, `stairs`, `map_walls` and `map_stairs` hold per-level lists
+    of shapes ready for `MazeRenderer.upload_shapes` and `index` the finished
+    maze's `path_index`, or `error` holds the
+    exception that ended the job. Generation draws from the generator's own
+    RNG and braiding from `maze_rng(seed, "braid")`, so jobs on different
+    threads never share one, and `seed` is recorded as `grid.seed`. Until the
+    job is done, other threads may only read which cells are active (`size`,
+    `random_cell`, `each_cell`); that is fixed once `wait_prepared` returns.
+
+    With a `cache` and the maze's `key`, a cached maze replaces generation and
+    braiding, and its FOV segments and spatial hash the game-view wall geometry
+    when they were built for the same renderer layout; `cached` tells whether
+    that happened.
+    A maze built here is stored under `key`.
+
+    Instead of a grid and renderer, `make_grid()` and `make_renderer(grid)` may
+    be given, so that building and masking a large grid also happens on the
+    worker; `grid` and `renderer` are then None until `wait_prepared` returns.
+    """
+    def __init__(self, grid: Optional[Grid], renderer, generator: Optional[MazeGenerator] = None, braid_pct: float = 0.0,
+                 seed: Optional[int] = None, cache: Optional[MazeCache] = None, key: Optional[MazeKey] = None,
+                 make_grid: Optional[Callable[[], Grid]] = None, make_renderer: Optional[Callable[[Grid], Any]] = None):
+        self.grid, self.renderer, self.generator, self.braid_pct = grid, renderer, generator, braid_pct
+        self.make_grid, self.make_renderer = make_grid, make_renderer
+        self.cache, self.key = (cache, key) if key is not None else (None, None)
+        self.cached: Optional[CachedMaze] = None
+        self.seed = seed
+        self.braid_rng = maze_rng(seed, "braid") if seed is not None else random.Random(random.getrandbits(64))
+        if seed is not None and grid is not None: grid.seed = seed
+        self.stage: str = "QUEUED"
+        self.progress: float = 0.0
+        self.error: Optional[BaseException] = None
+        self.walls: List[list] = []
+        self.stairs: List[list] = []
+        self.map_walls: List[list] = []
+        self.map_stairs: List[list] = []
+        self.index = None
+        self._done = threading.Event()
+        self._prepared = threading.Event()
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, name="maze-build", daemon=True)
+
+    def start(self) -> 'MazeBuildJob':
+        self._thread.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def wait_prepared(self, timeout: Optional[float] = None) -> bool:
+        """Waits until `grid` and `renderer` exist (or the job has ended)."""
+        return self._prepared.wait(timeout)
+
+    def cancel(self):
+        """Asks the worker to stop at its next step; the grid is then left half-built."""
+        self._cancelled = True
+
+    def _check(self):
+        if self._cancelled: raise BuildCancelled()
+
+    def _prepare(self):
+        if self.grid is None:
+            self.stage = "PREPARING"; self.grid = self.make_grid()
+            if self.seed is not None: self.grid.seed = self.seed
+        # The active-cell index is built lazily: build it here, before the window thread lays out endpoints
+        self.grid.size()
+        if self.renderer is None: self.renderer = self.make_renderer(self.grid)
+        self._prepared.set()
+
+    def _run(self):
+        try:
+            self._prepare()
+            self._check()
+            # Only an unlinked grid can take a cached maze; an animated one was generated on screen
+            if self.cache and self.generator: self.cached = self.cache.get(self.key)
+            if self.cached:
+                self.stage = "LOADING"; self.cached.restore(self.grid)
+            else:
+                if self.generator: self._generate()
+                if self.braid_pct > 0:
+                    self.stage = "BRAIDING"; self.grid.braid(self.braid_pct, self.braid_rng)
+            self._build_geometry()
+            self.stage = "INDEXING"; self.index = path_index(self.grid)
+            if self.cache and not self.cached:
+                renderer, levels = self.renderer, range(self.grid.levels)
+                self.cache.put(self.key, CachedMaze.build(self.grid, renderer.layout_key(), [renderer._get_segments(l) for l in levels],
+                                                          [renderer._spatial_segments[l] for l in levels]))
+            self.stage, self.progress = "DONE", 1.0
+        except BuildCancelled:
+            self.stage = "CANCELLED"
+        except Exception as e:
+            self.error, self.stage = e, "FAILED"; traceback.print_exc()
+        finally:
+            self._prepared.set(); self._done.set()
+
+    def _generate(self):
+        self.stage = "GENERATING"
+        # A NumPy path builds every passage in one go: progress moves by whole stages
+        passages = self.generator.passages(self.grid)
+        if passages is not None:
+            maze_vectorized.carve(self.grid, *passages)
+            self.progress = GENERATION_SHARE; return
+        # A spanning tree carves size - 1 passages; generators that yield differently just cap out early.
+        expected = max(1, self.grid.size() - 1)
+        for steps, _ in enumerate(self.generator.generate_step(self.grid), 1):
+            if steps & 255 == 0:
+                self._check()
+                self.progress = GENERATION_SHARE * min(steps / expected, 0.99)
+
+    def _build_geometry(self):
+        self.stage = "BUILDING GEOMETRY"
+        renderer, levels = self.renderer, self.grid.levels
+        start = GENERATION_SHARE if self.generator and not self.cached else 0.0
+        mh = renderer.get_maze_size()[1]
+        reuse = self.cached is not None and self.cached.layout == renderer.layout_key()
+        for l in range(levels):
+            self._check()
+            if reuse:
+                segments = self.cached.level_segments(l)
+                walls, spatial = self.cached.outline_polygons(segments), self.cached.level_spatial(l, segments)
+            else:
+                segments, spatial, walls = None, None, renderer.get_occlusion_polygons(l)
+            renderer.cache_level_geometry(l, walls, segments, spatial)
+            if config.FOV_ENGINE == "sweep": renderer._sweep_segments(l, ()) # trace the wall outline here, not on the first frame
+            self.walls.append(renderer.make_shapes([(poly, config.WALL_COLOR) for poly in walls]))
+            self.stairs.append(renderer.make_shapes(renderer.get_stair_polygons(l)))
+            # Map view: levels stacked vertically with a gap, thinner walls
+            offset = (0, l * mh * 1.5)
+            map_walls = renderer.get_occlusion_polygons(l, offset=offset, thickness_mult=0.6)
+            self.map_walls.append(renderer.make_shapes([(poly, config.WALL_COLOR) for poly in map_walls]))
+            self.map_stairs.append(renderer.make_shapes(renderer.get_stair_polygons(l, offset=offset)))
+            self.progress = start + (1.0 - start) * (l + 1) / levels
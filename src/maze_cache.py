@@ -0,0 +1,254 @@
+# maze_cache.py
+"""Built mazes, kept by the parameters that determine them.
+
+A seeded generator, braided from `maze_rng(seed, "braid")`, always builds the
+same maze, through `generate` or `generate_step` alike, so a `MazeKey` (grid
+class, shape, size, levels, algorithm, braid percentage, seed) names one maze
+exactly. Generators with a NumPy path build a different maze for a seed than
+their Python loop, so on an `ArrayGrid` with NumPy installed their algorithm is
+keyed as e.g. "Kruskals+numpy". `MazeCache` keeps recently built
+mazes in memory, least recently used out first, and, given a directory, on
+disk up to a byte budget. An entry holds the link bitmasks in `ArrayGrid`
+encoding and, per level, the FOV occlusion segments that
+`MazeRenderer._get_segments` would compute and their spatial hash, tagged with
+the renderer layout they were computed for.
+
+A cache file is a magic number and version, then one zlib stream: a fixed
+header, the key's repr (checked on read, so a hash collision is a miss), the
+layout, the link section, and per level four length-prefixed arrays: segment
+coordinates, bucket keys, bucket offsets and bucket members.
+"""
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import config
+import maze_vectorized
+from maze_topology import ArrayGrid, Grid
+from maze_storage import _decode, _encode
+
+MAGIC = b"PMZC"
+VERSION = 3  # 2: merged wall geometry; 3: triangle rows and division shafts follow real neighbours
+_PREFIX = struct.Struct("<4sH")
+_HEADER = struct.Struct("<HHII")  # levels, layout values, key bytes, link bytes
+_COUNT = struct.Struct("<I")
+
+Segment = Tuple[Tuple[float, float], Tuple[float, float]]
+
+class MazeKey(NamedTuple):
+    grid_class: str
+    shape: str
+    rows: int
+    columns: int
+    levels: int
+    algorithm: str
+    braid_pct: float
+    seed: int
+
+def maze_key(grid: Grid, generator, braid_pct: float, seed: int) -> MazeKey:
+    """The key of the maze `generator` (seeded with `seed`) builds into the masked, unlinked `grid`."""
+    return params_key(type(grid), grid.shape, grid.rows, grid.columns, grid.levels, generator, braid_pct, seed)
+
+def params_key(GridClass: type, shape: str, rows: int, columns: int, levels: int, generator, braid_pct: float, seed: int) -> MazeKey:
+    """`maze_key` of a grid that has not been built yet."""
+    return MazeKey(GridClass.__name__, shape, rows, columns, levels, _algorithm(GridClass, generator), float(braid_pct), seed)
+
+def _algorithm(GridClass: type, generator) -> str:
+    name = type(generator).__name__
+    if getattr(generator, "vectorized", False) and maze_vectorized.HAVE_NUMPY and issubclass(GridClass, ArrayGrid):
+        name += "+numpy"
+    return name
+
+class CachedMaze(NamedTuple):
+    links: bytes
+    layout: Tuple[float, ...]  # `MazeRenderer.layout_key()` the geometry was built with
+    segments: List[array]  # per level, flat x1, y1, x2, y2 doubles
+    buckets: List[Tuple[array, array, array]]  # per level, the FOV spatial hash: (gx, gy) pairs, offsets, segment numbers
+
+    def restore(self, grid: Grid) -> Grid:
+        """Links an unlinked grid of the entry's key into the cached maze."""
+        return _decode(grid, self.links)
+
+    def level_segments(self, level: int) -> List[Segment]:
+        coords = iter(self.segments[level].tolist())
+        points = iter(list(zip(coords, coords)))
+        return list(zip(points, points))
+
+    def level_spatial(self, level: int, segments: List[Segment]) -> Dict[Tuple[int, int], List[Segment]]:
+        """The level's spatial hash, over the `segments` objects returned by `level_segments`."""
+        keys, offsets, members = self.buckets[level]
+        coords, pick = iter(keys.tolist()), segments.__getitem__
+        members = members.tolist()
+        return {key: list(map(pick, members[a:b])) for key, a, b in zip(zip(coords, coords), offsets, offsets[1:])}
+
+    @staticmethod
+    def outline_polygons(segments: List[Segment]) -> List[Tuple[Tuple[float, float], ...]]:
+        """The polygons whose closed outlines `segments` lists one after another."""
+        polygons, points = [], []
+        for a, b in segments:
+            points.append(a)
+            if b == points[0]:
+                polygons.append(tuple(points)); points = []
+        return polygons
+
+    @classmethod
+    def build(cls, grid: Grid, layout: Tuple[float, ...], segments: List[List[Segment]],
+              spatial: List[Dict[Tuple[int, int], List[Segment]]]) -> 'CachedMaze':
+        """An entry for a built `grid`, from the renderer's per-level segments and spatial hashes."""
+        flats, buckets = [], []
+        for level, hashed in zip(segments, spatial):
+            flats.append(array('d', chain.from_iterable(chain.from_iterable(level))))
+            number = {id(seg): i for i, seg in enumerate(level)}
+            keys, offsets, members = array('i', chain.from_iterable(hashed)), array('i', [0]), array('i')
+            for bucket in hashed.values():
+                members.extend([number[id(seg)] for seg in bucket])
+                offsets.append(len(members))
+            buckets.append((keys, offsets, members))
+        return cls(bytes(_encode(grid).link_bits), tuple(layout), flats, buckets)
+
+def _put(parts: list, values: array):
+    parts += [_COUNT.pack(len(values)), values.tobytes()]
+
+def _take(body: bytes, at: int, typecode: str) -> Tuple[array, int]:
+    (n,) = _COUNT.unpack_from(body, at); at += _COUNT.size
+    values = array(typecode)
+    values.frombytes(body[at:at + n * values.itemsize])
+    return values, at + n * values.itemsize
+
+def _pack(key: MazeKey, entry: CachedMaze) -> bytes:
+    name = repr(tuple(key)).encode()
+    parts = [_HEADER.pack(len(entry.segments), len(entry.layout), len(name), len(entry.links)),
+             name, array('d', entry.layout).tobytes(), entry.links]
+    for flat, bucket in zip(entry.segments, entry.buckets):
+        for values in (flat,) + bucket: _put(parts, values)
+    return _PREFIX.pack(MAGIC, VERSION) + zlib.compress(b"".join(parts), 1)
+
+def _unpack(key: MazeKey, data: bytes) -> Optional[CachedMaze]:
+    magic, version = _PREFIX.unpack_from(data)
+    if magic != MAGIC or version != VERSION: return None
+    body = zlib.decompress(data[_PREFIX.size:])
+    levels, nlayout, nname, nlinks = _HEADER.unpack_from(body)
+    at = _HEADER.size
+    if body[at:at + nname] != repr(tuple(key)).encode(): return None
+    at += nname
+    layout = array('d'); layout.frombytes(body[at:at + 8 * nlayout]); at += 8 * nlayout
+    links = body[at:at + nlinks]; at += nlinks
+    segments, buckets = [], []
+    for _ in range(levels):
+        flat, at = _take(body, at, 'd')
+        keys, at = _take(body, at, 'i')
+        offsets, at = _take(body, at, 'i')
+        members, at = _take(body, at, 'i')
+        segments.append(flat); buckets.append((keys, offsets, members))
+    return CachedMaze(links, tuple(layout), segments, buckets)
+
+class MazeCache:
+    """Two-tier cache of built mazes: an LRU of `capacity` entries in memory and,
+    when `directory` is given, compressed files there totalling at most
+    `max_bytes`, least recently read deleted first.
+
+    Safe to share between build threads. `hits`, `disk_hits` and `misses`
+    count lookups (a disk hit is also promoted to memory); `stats()` returns
+    them with the store and per-tier eviction counts.
+    """
+    def __init__(self, capacity: int = 8, directory: Optional[str] = None, max_bytes: int = 64 << 20):
+        self.capacity, self.directory, self.max_bytes = capacity, directory, max_bytes
+        self._memory: 'OrderedDict[MazeKey, CachedMaze]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = self.stores = self.evictions = self.disk_evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "stores": self.stores, "evictions": self.evictions, "disk_evictions": self.disk_evictions,
+                "entries": len(self._memory)}
+
+    def _path(self, key: MazeKey) -> str:
+        return os.path.join(self.directory, hashlib.sha1(repr(tuple(key)).encode()).hexdigest() + ".pmzc")
+
+    def get(self, key: MazeKey) -> Optional[CachedMaze]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = self._read(key) if self.directory else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: MazeKey, entry: CachedMaze):
+        with self._lock:
+            self.stores += 1
+            self._remember(key, entry)
+        if self.directory: self._write(key, entry)
+
+    def clear(self):
+        """Empties the memory tier; files on disk are kept."""
+        with self._lock: self._memory.clear()
+
+    def _remember(self, key: MazeKey, entry: CachedMaze):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _read(self, key: MazeKey) -> Optional[CachedMaze]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f: data = f.read()
+            entry = _unpack(key, data)
+            os.utime(path)  # mtime orders disk eviction
+        except (OSError, ValueError, struct.error, zlib.error):
+            return None
+        return entry
+
+    def _write(self, key: MazeKey, entry: CachedMaze):
+        data = _pack(key, entry)
+        if len(data) > self.max_bytes: return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f: f.write(data)
+            os.replace(tmp, path)  # readers never see half a file
+            self._trim()
+        except OSError:
+            pass  # the cache is an optimisation; a full or read-only disk just means misses
+
+    def _trim(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pmzc"): continue
+            try: st = os.stat(os.path.join(self.directory, name))
+            except OSError: continue
+            files.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes: break
+            try: os.remove(os.path.join(self.directory, name))
+            except OSError: continue
+            total -= size
+            with self._lock: self.disk_evictions += 1
+
+_shared: Optional[MazeCache] = None
+
+def shared_cache() -> MazeCache:
+    """The process-wide cache that game views and Adventure prefetching build through."""
+    global _shared
+    if _shared is None:
+        # Absolute, since build threads write to it whatever the working directory is by then
+        directory = os.path.abspath(config.MAZE_CACHE_DIR) if config.MAZE_CACHE_DIR else None
+        _shared = MazeCache(config.MAZE_CACHE_ENTRIES, directory, config.MAZE_CACHE_BYTES)
+    return _shared
@@ -0,0 +1,239 @@
+# maze_pack.py
+"""Pre-generated Adventure mazes, many per difficulty bucket, in one file.
+
+A bucket is one set of generation parameters Adventure can ask for: topology,
+shape, algorithm, and the size that a spatial-skill tier maps to (see
+`AdventureEngine.maze_size`). `build_pack` generates `per_bucket` perfect
+mazes for every bucket offline, across a process pool, and `MazePack` maps the
+file read-only and hands out any maze in O(1): a dict lookup for the bucket, a
+fixed-size index entry, and one buffer copy of that maze's bitmasks.
+
+Layout: a header, the bucket table, the maze index (at the offset the header
+records), then the mazes. Each maze
+is a complete maze file (see `maze_storage`), recording its seed. The stored
+links are what is played; the seed rebuilds the same maze through `generate`
+or `generate_step` given the same NumPy availability as the build (see
+`maze_vectorized`). Index entries
+hold each maze's offset and length, its seed, and difficulty metrics: the
+length of the path between the first and last cells (Adventure's fixed
+endpoints), and the numbers of dead ends and junctions. Mazes are stored
+unbraided; braiding is applied per player when a level starts.
+
+Usage: python src/maze_pack.py PACK [--per-bucket N] [--tiers 1,4,8] [--workers N] [--seed S]
+"""
+import argparse
+import bisect
+import mmap
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import config
+from maze_topology import ARRAY_GRIDS, ArrayGrid
+from maze_analysis import DistanceField
+from maze_storage import dump_grid, read_grid
+
+MAGIC = b"PMPK"
+VERSION = 2  # 2: empty buckets are left out and the header points at the maze index
+# magic, version, bucket count, maze count, offset of the maze index (version 1: of the first maze)
+HEADER = struct.Struct("<4sHxxIIQ")
+# topology, shape, algorithm, rows, columns, levels, spatial tier, first index entry, maze count
+BUCKET = struct.Struct("<8s16s24sIIIfII")
+# offset, length, seed, solution length, dead ends, junctions
+ENTRY = struct.Struct("<QIIIII")
+
+DEFAULT_TIERS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 44)
+
+# Number of set bits (links) of every wall bitmask byte
+_LINKS = bytes(bin(b).count("1") for b in range(256))
+
+class PackBucket(NamedTuple):
+    topology: str
+    shape: str
+    algorithm: str
+    rows: int
+    columns: int
+    levels: int
+    tier: float
+    first: int
+    count: int
+
+class PackEntry(NamedTuple):
+    offset: int
+    length: int
+    seed: int
+    solution: int  # steps from the first to the last active cell
+    dead_ends: int
+    junctions: int
+
+def maze_metrics(grid: ArrayGrid) -> Tuple[int, int, int]:
+    """(solution length, dead ends, junctions) of a maze; dead ends have one link,
+    junctions three or more."""
+    cells = grid._index()
+    first, last = grid.cell_at(cells[0]), grid.cell_at(cells[-1])
+    degrees = grid.link_bits.tobytes().translate(_LINKS)
+    dead_ends = junctions = 0
+    for i in cells:
+        d = degrees[i]
+        if d == 1: dead_ends += 1
+        elif d >= 3: junctions += 1
+    return DistanceField(grid, first).distance(last), dead_ends, junctions
+
+def _build_maze(task):
+    """Worker: one maze of a bucket, as (maze file bytes, seed, metrics), or None if
+    generation failed or left the endpoints disconnected."""
+    topology, shape, rows, columns, levels, Generator, seed = task
+    grid = ARRAY_GRIDS[topology](rows, columns, levels)
+    grid.mask_shape(shape)
+    try:
+        Generator(seed).generate(grid)
+    except Exception:
+        return None
+    metrics = maze_metrics(grid)
+    if metrics[0] < 0: return None
+    grid.seed = seed
+    return dump_grid(grid), seed, metrics
+
+def build_pack(path: str, buckets: Iterable[Tuple[str, str, type, int, int, int, float]], per_bucket: int,
+               workers: Optional[int] = None, seed: Optional[int] = None, progress=None) -> int:
+    """Writes a pack of `per_bucket` mazes for each (topology, shape, generator class,
+    rows, columns, levels, tier) bucket; returns the number of mazes written.
+
+    Seeds are drawn from `seed`, so a seeded build is reproducible. Mazes whose
+    generator raises, or whose endpoints it leaves disconnected, are left out
+    of their bucket, and a bucket where every maze failed is left out of the
+    pack. `progress(done, total)` is called as mazes are written."""
+    buckets = list(buckets)
+    rng = random.Random(seed)
+    tasks = [(topology, shape, rows, columns, levels, Generator, rng.getrandbits(32))
+             for topology, shape, Generator, rows, columns, levels, _ in buckets for _ in range(per_bucket)]
+    index_at = HEADER.size + len(buckets) * BUCKET.size  # room for every bucket and entry; failures leave some unused
+    offset = index_at + len(tasks) * ENTRY.size
+    workers = workers or os.cpu_count() or 1
+    table, written = [], 0
+    with open(path, "wb") as f:
+        f.seek(offset)
+        pool = multiprocessing.Pool(workers) if workers > 1 else None
+        try:
+            results = pool.imap(_build_maze, tasks, chunksize=8) if pool else map(_build_maze, tasks)
+            for b, (topology, shape, Generator, rows, columns, levels, tier) in enumerate(buckets):
+                first = written
+                for k in range(per_bucket):
+                    result = next(results)
+                    if result is None: continue
+                    data, maze_seed, metrics = result
+                    f.write(data)
+                    entry = ENTRY.pack(offset, len(data), maze_seed, *metrics)
+                    f.seek(index_at + written * ENTRY.size); f.write(entry)
+                    offset += len(data); written += 1
+                    f.seek(offset)
+                    if progress: progress(b * per_bucket + k + 1, len(tasks))
+                if written > first:
+                    table.append(BUCKET.pack(topology.encode(), shape.encode(), Generator.__name__.encode(),
+                                             rows, columns, levels, tier, first, written - first))
+        finally:
+            if pool: pool.terminate()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(table), written, index_at))
+        f.write(b"".join(table))
+    return written
+
+class MazePack:
+    """A read-only memory map of a pack file.
+
+    `bucket(topology, shape, algorithm, spatial)` finds the bucket of the highest
+    tier at or below a spatial skill, and `pick(bucket)` loads one of its mazes
+    at random into a new, mutable `ArrayGrid`. Only the pages of the picked maze
+    are read from disk. Adventure generates the mazes of buckets the pack lacks.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, buckets, self.mazes, index_at = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError("Not a maze pack: bad magic")
+        if version > VERSION:
+            self._mm.close()
+            raise ValueError(f"Unsupported maze pack version {version}")
+        self._index_at = index_at if version >= 2 else HEADER.size + buckets * BUCKET.size
+        # (topology, shape, algorithm) -> buckets by ascending tier
+        self.buckets: Dict[Tuple[str, str, str], List[PackBucket]] = {}
+        for b in range(buckets):
+            topology, shape, algorithm, *rest = BUCKET.unpack_from(self._mm, HEADER.size + b * BUCKET.size)
+            bucket = PackBucket(topology.rstrip(b"\0").decode(), shape.rstrip(b"\0").decode(),
+                                algorithm.rstrip(b"\0").decode(), *rest)
+            if bucket.count: self.buckets.setdefault(bucket[:3], []).append(bucket)  # version 1 kept empty ones
+        for tiers in self.buckets.values(): tiers.sort(key=lambda bucket: bucket.tier)
+        self._tiers = {key: [bucket.tier for bucket in tiers] for key, tiers in self.buckets.items()}
+
+    def bucket(self, topology: str, shape: str, algorithm: str, spatial: float) -> Optional[PackBucket]:
+        tiers = self._tiers.get((topology, shape, algorithm))
+        if not tiers: return None
+        at = bisect.bisect_right(tiers, spatial) - 1
+        return self.buckets[(topology, shape, algorithm)][at] if at >= 0 else None
+
+    def entry(self, i: int) -> PackEntry:
+        return PackEntry(*ENTRY.unpack_from(self._mm, self._index_at + i * ENTRY.size))
+
+    def grid(self, i: int) -> ArrayGrid:
+        entry = self.entry(i)
+        with memoryview(self._mm) as view:
+            return read_grid(view[entry.offset:entry.offset + entry.length])
+
+    def pick(self, bucket: PackBucket, rng=random) -> Tuple[ArrayGrid, PackEntry]:
+        i = bucket.first + rng.randrange(bucket.count)
+        return self.grid(i), self.entry(i)
+
+    def close(self):
+        self._mm.close()
+
+_default: Optional[MazePack] = None
+
+def default_pack() -> Optional[MazePack]:
+    """The pack at `config.MAZE_PACK_FILE`, opened once, or None if there is none."""
+    global _default
+    if _default is None and os.path.exists(config.MAZE_PACK_FILE):
+        try: _default = MazePack(config.MAZE_PACK_FILE)
+        except (OSError, ValueError, struct.error): return None
+    return _default
+
+def adventure_buckets(tiers: Iterable[float] = DEFAULT_TIERS):
+    """Every bucket Adventure can ask for at the given spatial tiers."""
+    from adventure_engine import AdventureEngine, GRID_UNLOCKS, ALGORITHM_UNLOCKS  # it imports this module
+    for tier in tiers:
+        rows, columns, levels = AdventureEngine.maze_size(tier)
+        for _, GridClass in GRID_UNLOCKS:
+            for _, Generator, _ in ALGORITHM_UNLOCKS:
+                yield GridClass.topology, AdventureEngine.maze_shape(GridClass), Generator, rows, columns, levels, tier
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds a pack of pre-generated Adventure mazes.")
+    parser.add_argument("path", nargs="?", default=config.MAZE_PACK_FILE)
+    parser.add_argument("--per-bucket", type=int, default=1000, help="mazes per bucket (default 1000)")
+    parser.add_argument("--tiers", default=",".join(map(str, DEFAULT_TIERS)), help="spatial skill tiers, comma separated")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    buckets = list(adventure_buckets(float(t) for t in args.tiers.split(",")))
+    started = time.perf_counter()
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"\r{done}/{total} mazes", end="", file=sys.stderr)
+    written = build_pack(args.path, buckets, args.per_bucket, args.workers, args.seed, progress)
+    print(f"\n{written} mazes in {len(buckets)} buckets, {os.path.getsize(args.path) / 2**20:.1f} MB, "
+          f"{time.perf_counter() - started:.1f}s", file=sys.stderr)
+    pack = MazePack(args.path)
+    packed = {bucket[:6] for tiers in pack.buckets.values() for bucket in tiers}
+    for topology, shape, Generator, rows, columns, levels, tier in buckets:
+        if (topology, shape, Generator.__name__, rows, columns, levels) not in packed:  # the generator never built a connected maze
+            print(f"warning: no maze for {topology}/{shape}/{Generator.__name__} {rows}x{columns}x{levels} "
+                  f"(tier {tier:g}); Adventure generates these mazes", file=sys.stderr)
+    pack.close()
+
+if __name__ == "__main__":
+    main()
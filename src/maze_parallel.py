@@ -0,0 +1,140 @@
+# maze_parallel.py
+"""Multi-process maze generation by tiles.
+
+`generate_parallel` cuts a grid into tiles: one per floor, and each floor into
+horizontal bands of rows. Every tile is generated as its own single-level
+`ArrayGrid` in a worker process, with an independently seeded RNG. Bands start
+on even rows, so a tile has the same row/column parity as its place in the full
+grid, and its wall bitmasks copy straight into the full grid's link store.
+
+A seam pass then joins the tiles. Candidate passages across band seams and
+between floors are shuffled and added Kruskal-style: only between components
+that are still apart. Each tile is a spanning forest, so the result is again a
+perfect maze, one spanning tree per connected region of the mask. Every seam
+is crossed once per pair of tile regions it joins, as floors are joined by one
+shaft each in `Ellers`.
+"""
+import multiprocessing
+import os
+import random
+from array import array
+from typing import List, Optional, Tuple
+
+from maze_topology import ARRAY_GRIDS, ArrayGrid, Grid
+from maze_algorithms import MazeGenerator, RecursiveBacktracker
+from maze_storage import _decode, _encode
+
+# level, first row, row count
+Tile = Tuple[int, int, int]
+
+def plan_tiles(grid: Grid, bands: int) -> List[Tile]:
+    """Splits every floor into up to `bands` even-aligned row bands."""
+    height = max(2, -(-grid.rows // bands))
+    height += height & 1
+    return [(l, r, min(height, grid.rows - r)) for l in range(grid.levels) for r in range(0, grid.rows, height)]
+
+def _regions(tile: ArrayGrid) -> Optional[array]:
+    """Connected-region label (its first cell's index) per cell of the tile's mask,
+    or None when the mask is a single region."""
+    mask = tile.active_mask
+    if not mask.count(0): return None  # a full rectangle is connected in every topology
+    labels = array('i', [-1]) * tile.count
+    roots = 0
+    for root in tile._index():
+        if labels[root] >= 0: continue
+        labels[root], stack, roots = root, [root], roots + 1
+        while stack:
+            for _, j in tile.neighbor_slots(stack.pop()):
+                if mask[j] and labels[j] < 0: labels[j] = root; stack.append(j)
+    return labels if roots > 1 else None
+
+def _generate_tile(task):
+    """Worker: generates one tile, region by region; returns its link bits and region labels.
+
+    Cutting a shaped floor into bands can leave a band in several pieces, and
+    generators only span the piece they start in (Wilsons never finishes), so
+    each piece is generated on its own copy of the mask."""
+    topology, rows, columns, mask, Generator, seed = task
+    Tile = ARRAY_GRIDS[topology]
+    tile = Tile(rows, columns, 1, active_mask=bytearray(mask))
+    generator = Generator(seed)
+    labels = _regions(tile)
+    if labels is None:
+        if tile.size(): generator.generate(tile)
+        return tile.link_bits.tobytes(), None
+    bits = tile.link_bits
+    for root in sorted(set(labels) - {-1}):
+        region = Tile(rows, columns, 1, active_mask=bytearray(1 if label == root else 0 for label in labels))
+        generator.generate(region)
+        for i, b in enumerate(region.link_bits):
+            if b: bits[i] |= b
+    return bits.tobytes(), labels
+
+def _seam_pairs(grid: ArrayGrid, tile: Tile) -> List[Tuple[int, int]]:
+    """Adjacent active pairs between `tile` and the band above it or the floor below."""
+    l, r0, height = tile
+    mask, pairs = grid.active_mask, []
+    if r0 > 0:
+        for i in range(grid.index(r0, 0, l), grid.index(r0 + 1, 0, l)):
+            if not mask[i]: continue
+            pairs.extend((i, j) for _, j in grid.neighbor_slots(i)
+                         if mask[j] and grid.index(r0, 0, l) > j >= grid.index(r0 - 1, 0, l))
+    if l > 0 and r0 == 0:
+        layer = grid.layer_size
+        pairs.extend((i, i - layer) for i in range(l * layer, (l + 1) * layer) if mask[i] and mask[i - layer])
+    return pairs
+
+def generate_parallel(grid: Grid, generator: Optional[MazeGenerator] = None, workers: Optional[int] = None,
+                      bands: Optional[int] = None, seed: Optional[int] = None) -> Grid:
+    """Generates a perfect maze into an unlinked `grid` with tiles built in parallel.
+
+    `generator` must span any connected masked grid with a tree, e.g.
+    `Kruskals`, `RandomizedPrims`, `RecursiveBacktracker` or `Wilsons`.
+    `workers` defaults to the CPU count; with one worker the tiles are built
+    in-process. `bands` is the number of row bands per floor and defaults to
+    enough tiles to keep every worker busy. The tile seeds are drawn from
+    `seed`, or from the generator's own RNG without one, so a seeded call
+    reproduces the maze for the same tiling.
+    """
+    generator = generator or RecursiveBacktracker()
+    workers = workers or os.cpu_count() or 1
+    bands = bands or max(1, -(-workers // grid.levels))
+    compact = _encode(grid)
+    rng = random.Random(seed) if seed is not None else generator.rng
+    tiles = plan_tiles(compact, bands)
+    tasks = []
+    for l, r0, height in tiles:
+        start = compact.index(r0, 0, l)
+        mask = bytes(compact.active_mask[start:start + height * compact.columns])
+        tasks.append((compact.topology, height, compact.columns, mask, type(generator), rng.getrandbits(64)))
+
+    if workers <= 1 or len(tasks) < 2:
+        results = [_generate_tile(t) for t in tasks]
+    else:
+        with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+            results = pool.map(_generate_tile, tasks)
+
+    # Union-find over tile regions, named by their first cell's global index
+    region = array('i', [-1]) * compact.count
+    candidates = []
+    for tile, (bits, labels) in zip(tiles, results):
+        start = compact.index(tile[1], 0, tile[0])
+        compact.link_bits[start:start + len(bits)] = array('B', bits)
+        region[start:start + len(bits)] = array('i', [start]) * len(bits) if labels is None else \
+            array('i', [start + label if label >= 0 else -1 for label in labels])
+        candidates.extend(_seam_pairs(compact, tile))
+    rng.shuffle(candidates)
+    parent = {}
+    def find(i):
+        while parent.setdefault(i, i) != i:
+            parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    for i, j in candidates:
+        a, b = find(region[i]), find(region[j])
+        if a != b:
+            parent[a] = b
+            compact.link_index(i, j)
+    compact.version += 1
+
+    if compact is not grid: _decode(grid, compact.link_bits)  # copy the links back onto the Cell graph
+    return grid
@@ -0,0 +1,266 @@
+# maze_storage.py
+"""On-disk maze files and out-of-core generation.
+
+A maze file is a fixed header followed by one wall bitmask byte per cell in
+`ArrayGrid` order and encoding (level-major, then row, then column), and, when
+the maze is masked, one activity byte per cell. With `FLAG_ZLIB` both sections
+are stored as a single zlib stream.
+
+`save_grid` / `load_grid` round-trip any grid without re-running generation.
+Row-by-row generators write the link section as they go, so a maze far larger
+than RAM is produced with only O(columns) state, and `open_grid` reads it back
+through a read-only memory map.
+"""
+import mmap
+import random
+import struct
+import zlib
+from array import array
+from typing import NamedTuple, Optional
+
+from maze_topology import ARRAY_GRIDS, ArrayGrid, Grid
+from maze_algorithms import Ellers
+
+MAGIC = b"PMAZ"
+VERSION = 1
+# magic, version, flags, topology, rows, columns, levels, seed, shape (padded to 64 bytes)
+HEADER = struct.Struct("<4sHH8sIIIq16s12x")
+FLAG_MASK = 1  # an activity byte per cell follows the link section
+FLAG_ZLIB = 2  # the sections after the header are zlib-compressed
+FLAG_SEED = 4  # the header's seed field is meaningful
+
+class MazeHeader(NamedTuple):
+    topology: str
+    rows: int
+    columns: int
+    levels: int
+    flags: int = 0
+    seed: int = 0
+    shape: str = "rectangle"
+
+    @property
+    def count(self) -> int:
+        return self.rows * self.columns * self.levels
+
+def pack_header(header: MazeHeader) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, header.flags, header.topology.encode(), header.rows,
+                       header.columns, header.levels, header.seed, header.shape.encode())
+
+def unpack_header(data: bytes) -> MazeHeader:
+    if len(data) < HEADER.size:
+        raise ValueError("Not a maze file: truncated header")
+    magic, version, flags, topology, rows, columns, levels, seed, shape = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a maze file: bad magic")
+    if version > VERSION:
+        raise ValueError(f"Unsupported maze file version {version}")
+    return MazeHeader(topology.rstrip(b"\0").decode(), rows, columns, levels,
+                      flags, seed, shape.rstrip(b"\0").decode())
+
+class _Unmasked:
+    """Activity mask of a maze without a mask section: every cell is active."""
+    def __init__(self, count: int):
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.count: raise IndexError(i)
+        return 1
+
+def _stream_bits(grid: ArrayGrid, r: int, c: int):
+    """(east, west, south, north, below, above) bits at (r, c) for a row-streaming topology."""
+    deltas = grid.planar_deltas(r, c)
+    try:
+        planar = [1 << deltas.index(d) for d in ((0, 1), (0, -1), (1, 0), (-1, 0))]
+    except ValueError:
+        raise ValueError(f"'{grid.topology}' cells have no row/column neighbours to stream") from None
+    k = len(deltas)
+    return (*planar, 1 << k, 1 << (k + 1))
+
+def stream_maze(path: str, topology: str, rows: int, columns: int, levels: int = 1,
+                generator=Ellers, shape: str = "rectangle", seed: Optional[int] = None) -> MazeHeader:
+    """Generates a maze row by row straight into a maze file.
+
+    `generator` is any class with a `stream_rows(columns, rows, row_mask)` method
+    (`Ellers`, `Sidewinder`). Floors are joined by one shaft each, as in
+    `Ellers.generate_step`. Topologies where every cell has east/west and
+    north/south neighbours (square, hex, polar) are supported. A given `seed`
+    reproduces the maze and is recorded in the header.
+    """
+    rng = random.Random(random.getrandbits(64) if seed is None else seed)
+    count = rows * columns * levels
+    # A buffer-less grid, used only for its geometry: offset tables and shape test
+    geometry = ARRAY_GRIDS[topology](rows, columns, levels, link_bits=b"", active_mask=_Unmasked(count))
+    bits = [_stream_bits(geometry, r, c) for r in (0, 1) for c in (0, 1)]
+    masked = shape != "rectangle"
+    def row_mask(r):
+        return [geometry._in_shape(shape, r, c) for c in range(columns)]
+    if masked and not any(any(row_mask(r)) for r in range(rows)):
+        raise ValueError(f"Shape '{shape}' leaves no active cells")
+
+    shafts = []  # (row, column) joining level l to l + 1
+    for _ in range(levels - 1):
+        while True:
+            r, c = rng.randrange(rows), rng.randrange(columns)
+            if not masked or geometry._in_shape(shape, r, c): break
+        shafts.append((r, c))
+
+    flags = (FLAG_MASK if masked else 0) | (FLAG_SEED if seed is not None else 0)
+    header = MazeHeader(topology, rows, columns, levels, flags, seed or 0, shape)
+    with open(path, "wb") as f:
+        f.write(pack_header(header))
+        for l in range(levels):
+            up = shafts[l] if l < levels - 1 else None
+            down = shafts[l - 1] if l > 0 else None
+            north = ()
+            stream = generator.stream_rows(columns, rows, row_mask if masked else None, rng)
+            for r, (east, south) in enumerate(stream):
+                row = bytearray(columns)
+                table = bits[(r & 1) << 1:]
+                for c in east:
+                    row[c] |= table[c & 1][0]
+                    row[c + 1] |= table[(c + 1) & 1][1]
+                for c in south: row[c] |= table[c & 1][2]
+                for c in north: row[c] |= table[c & 1][3]
+                if down and down[0] == r: row[down[1]] |= table[down[1] & 1][4]
+                if up and up[0] == r: row[up[1]] |= table[up[1] & 1][5]
+                f.write(row)
+                north = south
+        if masked:
+            for _ in range(levels):
+                for r in range(rows): f.write(bytes(row_mask(r)))
+    return header
+
+def _encode(grid: Grid) -> ArrayGrid:
+    """The grid itself if it is array-backed, else a compact copy of its links and mask."""
+    if hasattr(grid, "link_bits"): return grid
+    compact = ARRAY_GRIDS[grid.topology](grid.rows, grid.columns, grid.levels)
+    bits, mask = compact.link_bits, compact.active_mask
+    for l in range(grid.levels):
+        for r in range(grid.rows):
+            for c in range(grid.columns):
+                if not grid.grid[l][r][c]._active: mask[compact.index(r, c, l)] = 0
+    # (dr, dc) -> direction bit, per row/column parity
+    tables = [{(dr, dc): d for d, dr, dc, _ in compact._direction_table(r, c)} for r in (0, 1) for c in (0, 1)]
+    for cell in grid.each_cell():
+        r, c, l = cell.row, cell.column, cell.level
+        table = tables[(r & 1) << 1 | (c & 1)]
+        i = compact.index(r, c, l)
+        for n in cell.links:
+            if n.level != l:
+                d = len(table) + (n.level > l)
+            else:
+                dr, dc = n.row - r, n.column - c
+                if grid.wraps_columns and abs(dc) > 1: dc += -grid.columns if dc > 0 else grid.columns
+                d = table.get((dr, dc), -1)
+            if d >= 0: bits[i] |= 1 << d
+    return compact
+
+def _decode(grid: Grid, link_bits) -> Grid:
+    """Gives an unlinked `grid` the passages of `link_bits`, in `ArrayGrid` encoding."""
+    if hasattr(grid, "link_bits"):
+        grid.link_bits[:] = array('B', link_bits)
+        grid.version += 1
+        return grid
+    compact = ARRAY_GRIDS[grid.topology](grid.rows, grid.columns, grid.levels, link_bits=array('B', link_bits))
+    cells = [cell for level in grid.grid for row in level for cell in row]
+    for i, cell in enumerate(cells):
+        for j in compact.linked_indices(i):
+            if j > i: cell.link(cells[j])
+    return grid
+
+def dump_grid(grid: Grid, compress: bool = False, seed: Optional[int] = None) -> bytes:
+    """The maze file of any grid (object or array backed), as bytes.
+
+    `seed` defaults to the grid's own `seed`, if it has one."""
+    compact = _encode(grid)
+    if seed is None: seed = grid.seed
+    masked = not all(compact.active_mask)
+    flags = (FLAG_MASK if masked else 0) | (FLAG_ZLIB if compress else 0) | (FLAG_SEED if seed is not None else 0)
+    header = MazeHeader(grid.topology, grid.rows, grid.columns, grid.levels, flags,
+                        seed or 0, getattr(grid, "shape", "rectangle"))
+    body = bytes(compact.link_bits)
+    if masked: body += bytes(compact.active_mask)
+    return pack_header(header) + (zlib.compress(body) if compress else body)
+
+def save_grid(grid: Grid, path: str, compress: bool = False, seed: Optional[int] = None) -> MazeHeader:
+    """Writes any grid (object or array backed) to a maze file; see `dump_grid`."""
+    data = dump_grid(grid, compress, seed)
+    with open(path, "wb") as f:
+        f.write(data)
+    return unpack_header(data)
+
+def _sections(buf):
+    """(header, link section, mask section or None) of a maze file held in `buf`, as
+    views into it; both sections are None when the file is compressed."""
+    header = unpack_header(buf[:HEADER.size])
+    if header.flags & FLAG_ZLIB:
+        return header, None, None
+    count = header.count
+    end = HEADER.size + count * (2 if header.flags & FLAG_MASK else 1)
+    if len(buf) < end:
+        raise ValueError("Maze file is truncated")
+    view = memoryview(buf)
+    return header, view[HEADER.size:HEADER.size + count], \
+        view[HEADER.size + count:end] if header.flags & FLAG_MASK else None
+
+def _map(path: str):
+    """(memory map, header, link section, mask section or None) of a maze file."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return (mm,) + _sections(mm)
+
+def read_grid(buf) -> ArrayGrid:
+    """A new, mutable `ArrayGrid` from a maze file held in `buf` (bytes, a memory map
+    or a slice of one). Uncompressed sections cost one buffer copy each."""
+    header, links, mask = _sections(buf)
+    count = header.count
+    try:
+        if header.flags & FLAG_ZLIB:
+            body = zlib.decompress(buf[HEADER.size:])
+            if len(body) < count * (2 if header.flags & FLAG_MASK else 1):
+                raise ValueError("Maze file is truncated")
+            links, mask = body[:count], body[count:2 * count] if header.flags & FLAG_MASK else None
+        link_bits = array('B'); link_bits.frombytes(links)
+        active_mask = bytearray(mask) if mask is not None else None
+    finally:
+        links = mask = None  # release the views, so that a map can be closed
+    grid = ARRAY_GRIDS[header.topology](header.rows, header.columns, header.levels,
+                                        link_bits=link_bits, active_mask=active_mask)
+    grid.shape, grid.header = header.shape, header
+    if header.flags & FLAG_SEED: grid.seed = header.seed
+    return grid
+
+def load_grid(path: str) -> ArrayGrid:
+    """Loads a maze file into a new, mutable `ArrayGrid`.
+
+    Uncompressed sections are copied straight out of the memory map, so loading
+    costs one buffer copy per section; nothing is regenerated or reconfigured.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return read_grid(mm)
+    finally:
+        mm.close()
+
+def open_grid(path: str) -> ArrayGrid:
+    """Maps a maze file into a read-only `ArrayGrid` without reading it into memory.
+
+    Links are decoded on demand from the mapped pages; linking, unlinking or
+    masking the returned grid raises `TypeError`. Compressed files cannot be
+    mapped; use `load_grid` for those.
+    """
+    mm, header, links, mask = _map(path)
+    if header.flags & FLAG_ZLIB:
+        mm.close()
+        raise ValueError("Compressed maze files cannot be memory-mapped; use load_grid")
+    count = header.count
+    grid = ARRAY_GRIDS[header.topology](header.rows, header.columns, header.levels,
+                                        link_bits=links, active_mask=_Unmasked(count) if mask is None else mask)
+    grid.shape, grid.header = header.shape, header
+    if header.flags & FLAG_SEED: grid.seed = header.seed
+    grid._mmap = mm  # keeps the mapping alive as long as the grid
+    return grid
@@ -1,30 +1,46 @@
 import random
 import math
-from typing import List, Dict, Optional, Iterator
+from array import array
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Iterator, Tuple
 
 class Cell:
     """A node in the maze graph."""
-    def __init__(self, row: int, column: int, level: int = 0):
+    def __init__(self, row: int, column: int, level: int = 0, grid: Optional['Grid'] = None):
         self.row = row
         self.column = column
         self.level = level
         self.links: Dict['Cell', bool] = {} # Connected neighbors (Paths)
         self.neighbors: List['Cell'] = []   # All adjacent cells
-        self.active: bool = True # For masking shapes
+        self.grid = grid # Owner, notified when activity changes
+        self._active: bool = True # For masking shapes
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    @active.setter
+    def active(self, value: bool):
+        value = bool(value)
+        if value == self._active: return
+        self._active = value
+        if self.grid is not None: self.grid._on_activity_change(self, value)
 
     def link(self, cell: 'Cell', bidi=True):
-        if not self.active or not cell.active: return
+        if not self._active or not cell._active: return
         if cell in self.links: return
         self.links[cell] = True
+        if self.grid is not None: self.grid.version += 1
         if bidi: cell.link(self, bidi=False)
 
     @property
     def active_neighbors(self) -> List['Cell']:
-        return [n for n in self.neighbors if n.active]
+        return [n for n in self.neighbors if n._active]
 
     def unlink(self, cell: 'Cell', bidi=True):
         if cell in self.links:
             del self.links[cell]
+            if self.grid is not None: self.grid.version += 1
         if bidi: cell.unlink(self, bidi=False)
 
     def is_linked(self, cell: 'Cell') -> bool:
@@ -32,112 +48,163 @@ class Cell:
 
     def get_links(self) -> List['Cell']:
         return list(self.links.keys())
-    
+
     def __lt__(self, other):
         return (self.level, self.row, self.column) < (other.level, other.row, other.column)
 
 class Grid:
     """Abstract Grid container."""
+    topology = "rect"
+    wraps_columns = False
+
     def __init__(self, rows: int, columns: int, levels: int = 1):
         self.rows = rows
         self.columns = columns
         self.levels = levels
-        self.topology = "rect"
-        self.grid = [[[Cell(r, c, l) for c in range(columns)] for r in range(rows)] for l in range(levels)]
+        self.shape = "rectangle" # Last form applied by mask_shape
+        self.version = 0 # Bumped by every link, unlink and activity change
+        self.seed: Optional[int] = None # Seed the maze was generated from, when known
+        self._active_index: Optional[List[Cell]] = None
+        self.grid = [[[Cell(r, c, l, self) for c in range(columns)] for r in range(rows)] for l in range(levels)]
         self._configure_cells()
-        
+
+    def planar_deltas(self, r: int, c: int) -> Tuple[Tuple[int, int], ...]:
+        """Offset table of same-level neighbors for the cell at (r, c)."""
+        return ()
+
+    def planar_distance(self, r1: int, c1: int, r2: int, c2: int) -> int:
+        """Fewest same-level moves between two positions on the open lattice (no walls).
+
+        Never more than the maze distance, so it is an admissible, consistent A* heuristic.
+        """
+        return 0
+
+    def neighbor_coords(self, r: int, c: int, l: int) -> List[Tuple[int, int, int]]:
+        """In-bounds neighbor positions: planar deltas first, then the floor below and above."""
+        coords = []
+        for dr, dc in self.planar_deltas(r, c):
+            nr, nc = r + dr, c + dc
+            if self.wraps_columns: nc %= self.columns
+            if 0 <= nr < self.rows and 0 <= nc < self.columns:
+                coords.append((nr, nc, l))
+        for dl in [-1, 1]:
+            if 0 <= l+dl < self.levels:
+                coords.append((r, c, l+dl))
+        return coords
+
     def _configure_cells(self):
-        pass
+        for level in self.grid:
+            for row in level:
+                for cell in row:
+                    for r, c, l in self.neighbor_coords(cell.row, cell.column, cell.level):
+                        cell.neighbors.append(self.grid[l][r][c])
 
     def get_cell(self, row, col, level=0) -> Optional[Cell]:
         if 0 <= level < self.levels and 0 <= row < self.rows and 0 <= col < self.columns:
             cell = self.grid[level][row][col]
-            if cell.active: return cell
+            if cell._active: return cell
         return None
 
-    def random_cell(self) -> Optional[Cell]:
-        active_cells = list(self.each_cell())
-        if not active_cells: return None
-        return random.choice(active_cells)
+    def _index(self) -> List[Cell]:
+        """Unordered active-cell index, built on first use and then kept in sync by activity changes."""
+        if self._active_index is None:
+            self._active_index = list(self.each_cell())
+            for slot, cell in enumerate(self._active_index): cell._slot = slot
+        return self._active_index
+
+    def _on_activity_change(self, cell: Cell, active: bool):
+        self.version += 1
+        index = self._active_index
+        if index is None: return
+        if active:
+            cell._slot = len(index); index.append(cell)
+        else: # Swap-remove keeps removal O(1)
+            last = index.pop()
+            if last is not cell:
+                index[cell._slot] = last; last._slot = cell._slot
+
+    def random_cell(self, rng=random) -> Optional[Cell]:
+        index = self._index()
+        if not index: return None
+        return rng.choice(index)
 
     def size(self) -> int:
-        return len(list(self.each_cell()))
+        return len(self._index())
 
     def each_cell(self) -> Iterator[Cell]:
         for level in self.grid:
             for row in level:
                 for cell in row:
-                    if cell.active: yield cell
+                    if cell._active: yield cell
+
+    def each_cell_in_level(self, level: int) -> Iterator[Cell]:
+        for row in self.grid[level]:
+            for cell in row:
+                if cell._active: yield cell
 
     def mask_shape(self, shape: str):
         """Disables cells outside the desired shape."""
+        self.shape = shape
         for level in self.grid:
             for row in level:
                 for cell in row:
-                    nx, ny = self._get_normalized_coords(cell.row, cell.column)
-                    keep = True
-                    if shape == "circle":
-                        keep = (nx**2 + ny**2) <= 1.1 
-                    elif shape == "triangle":
-                        keep = (ny > -0.7) and (ny < 1.732 * nx + 1.2) and (ny < -1.732 * nx + 1.2)
-                    elif shape == "hexagon":
-                        keep = max(abs(nx), abs(nx)*0.5 + abs(ny)*0.866) <= 0.98
-                    
-                    if not keep:
+                    if not self._in_shape(shape, cell.row, cell.column):
                         cell.active = False
                         for n in cell.neighbors:
                             cell.unlink(n)
                             n.unlink(cell)
 
+    def _in_shape(self, shape: str, r: int, c: int) -> bool:
+        nx, ny = self._get_normalized_coords(r, c)
+        if shape == "circle":
+            return (nx**2 + ny**2) <= 1.1
+        elif shape == "triangle":
+            return (ny > -0.7) and (ny < 1.732 * nx + 1.2) and (ny < -1.732 * nx + 1.2)
+        elif shape == "hexagon":
+            return max(abs(nx), abs(nx)*0.5 + abs(ny)*0.866) <= 0.98
+        return True
+
     def _get_normalized_coords(self, r, c):
         ny = (r / max(1, self.rows-1)) * 2 - 1
         nx = (c / max(1, self.columns-1)) * 2 - 1
         return nx, ny
 
-    def braid(self, p=0.5):
-        """Removes dead ends to create multiple paths."""
+    def braid(self, p=0.5, rng=random):
+        """Removes dead ends to create multiple paths, drawing from `rng`."""
         dead_ends = [c for c in self.each_cell() if len(c.get_links()) == 1]
-        random.shuffle(dead_ends)
+        rng.shuffle(dead_ends)
         for cell in dead_ends:
-            if len(cell.get_links()) != 1 or random.random() > p:
+            if len(cell.get_links()) != 1 or rng.random() > p:
                 continue
             unlinked = [n for n in cell.active_neighbors if not cell.is_linked(n)]
             if unlinked:
                 best = [n for n in unlinked if len(n.get_links()) == 1]
-                target = random.choice(best if best else unlinked)
+                target = rng.choice(best if best else unlinked)
                 cell.link(target)
 
 class SquareCellGrid(Grid):
-    def _configure_cells(self):
-        self.topology = "rect"
-        for level in self.grid:
-            for row in level:
-                for cell in row:
-                    r, c, l = cell.row, cell.column, cell.level
-                    for dr, dc in [(-1,0), (1,0), (0,1), (0,-1)]:
-                        if 0 <= r+dr < self.rows and 0 <= c+dc < self.columns:
-                            cell.neighbors.append(self.grid[l][r+dr][c+dc])
-                    for dl in [-1, 1]:
-                        if 0 <= l+dl < self.levels:
-                            cell.neighbors.append(self.grid[l+dl][r][c])
+    topology = "rect"
+    DELTAS = ((-1, 0), (1, 0), (0, 1), (0, -1))
+
+    def planar_deltas(self, r, c):
+        return self.DELTAS
+
+    def planar_distance(self, r1, c1, r2, c2):
+        return abs(r1 - r2) + abs(c1 - c2)
 
 class HexCellGrid(Grid):
-    def _configure_cells(self):
-        self.topology = "hex"
-        for level in self.grid:
-            for row in level:
-                for cell in row:
-                    r, c, l = cell.row, cell.column, cell.level
-                    if r % 2 == 0:
-                        deltas = [(1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (0, 1)]
-                    else:
-                        deltas = [(1, 1), (1, 0), (0, -1), (-1, 0), (-1, 1), (0, 1)]
-                    for dr, dc in deltas:
-                        if 0 <= r+dr < self.rows and 0 <= c+dc < self.columns:
-                            cell.neighbors.append(self.grid[l][r+dr][c+dc])
-                    for dl in [-1, 1]:
-                        if 0 <= l+dl < self.levels:
-                            cell.neighbors.append(self.grid[l+dl][r][c])
+    topology = "hex"
+    EVEN_DELTAS = ((1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (0, 1))
+    ODD_DELTAS = ((1, 1), (1, 0), (0, -1), (-1, 0), (-1, 1), (0, 1))
+
+    def planar_deltas(self, r, c):
+        return self.EVEN_DELTAS if r % 2 == 0 else self.ODD_DELTAS
+
+    def planar_distance(self, r1, c1, r2, c2):
+        # Odd rows are shifted right: to cube coordinates (x, z = row), y = -x - z
+        dx = (c1 - (r1 - (r1 & 1)) // 2) - (c2 - (r2 - (r2 & 1)) // 2)
+        dz = r1 - r2
+        return max(abs(dx), abs(dz), abs(dx + dz))
 
     def _get_normalized_coords(self, r, c):
         nx = ((c + 0.5 * (r % 2)) / self.columns) * 2 - 1
@@ -145,22 +212,16 @@ class HexCellGrid(Grid):
         return nx, ny
 
 class TriCellGrid(Grid):
-    def _configure_cells(self):
-        self.topology = "tri"
-        for level in self.grid:
-            for row in level:
-                for cell in row:
-                    r, c, l = cell.row, cell.column, cell.level
-                    if (r + c) % 2 == 0:
-                        deltas = [(0, -1), (0, 1), (-1, 0)]
-                    else:
-                        deltas = [(0, -1), (0, 1), (1, 0)]
-                    for dr, dc in deltas:
-                        if 0 <= r+dr < self.rows and 0 <= c+dc < self.columns:
-                            cell.neighbors.append(self.grid[l][r+dr][c+dc])
-                    for dl in [-1, 1]:
-                        if 0 <= l+dl < self.levels:
-                            cell.neighbors.append(self.grid[l+dl][r][c])
+    topology = "tri"
+    UPRIGHT_DELTAS = ((0, -1), (0, 1), (-1, 0))
+    INVERTED_DELTAS = ((0, -1), (0, 1), (1, 0))
+
+    def planar_deltas(self, r, c):
+        return self.UPRIGHT_DELTAS if (r + c) % 2 == 0 else self.INVERTED_DELTAS
+
+    def planar_distance(self, r1, c1, r2, c2):
+        # Every move crosses exactly one line of the three strip families: rows and the two diagonals
+        return abs(r1 - r2) + abs((c1 - r1) // 2 - (c2 - r2) // 2) + abs((c1 + r1 + 1) // 2 - (c2 + r2 + 1) // 2)
 
     def _get_normalized_coords(self, r, c):
         nx = (c / self.columns) * 2 - 1
@@ -168,22 +229,271 @@ class TriCellGrid(Grid):
         return nx, ny
 
 class PolarCellGrid(Grid):
-    def _configure_cells(self):
-        self.topology = "polar"
-        for level in self.grid:
-            for row in level:
-                for cell in row:
-                    r, c, l = cell.row, cell.column, cell.level
-                    cw = self.grid[l][r][(c + 1) % self.columns]
-                    ccw = self.grid[l][r][(c - 1) % self.columns]
-                    cell.neighbors.append(cw); cell.neighbors.append(ccw)
-                    if r > 0: cell.neighbors.append(self.grid[l][r-1][c])
-                    if r < self.rows - 1: cell.neighbors.append(self.grid[l][r+1][c])
-                    for dl in [-1, 1]:
-                        if 0 <= l+dl < self.levels:
-                            cell.neighbors.append(self.grid[l+dl][r][c])
-    
+    topology = "polar"
+    wraps_columns = True
+    DELTAS = ((0, 1), (0, -1), (-1, 0), (1, 0)) # cw, ccw, inward, outward
+
+    def planar_deltas(self, r, c):
+        return self.DELTAS
+
+    def planar_distance(self, r1, c1, r2, c2):
+        dc = abs(c1 - c2)
+        return abs(r1 - r2) + min(dc, self.columns - dc)
+
     def _get_normalized_coords(self, r, c):
         radius_norm = r / max(1, self.rows)
         angle = (c / max(1, self.columns)) * 2 * math.pi
-        return radius_norm * math.cos(angle), radius_norm * math.sin(angle)
\ No newline at end of file
+        return radius_norm * math.cos(angle), radius_norm * math.sin(angle)
+
+# --- COMPACT STORAGE ---
+
+class CellView:
+    """Cell-compatible facade over one slot of an ArrayGrid.
+
+    Views are created on demand and compare by index, so they can be used as
+    dict keys and set members exactly like `Cell` objects.
+    """
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid: 'ArrayGrid', index: int):
+        self.grid = grid
+        self.index = index
+
+    # Coordinates are decoded on access: most views are only hashed and linked.
+    @property
+    def row(self) -> int:
+        return self.index % self.grid.layer_size // self.grid.columns
+
+    @property
+    def column(self) -> int:
+        return self.index % self.grid.columns
+
+    @property
+    def level(self) -> int:
+        return self.index // self.grid.layer_size
+
+    @property
+    def active(self) -> bool:
+        return bool(self.grid.active_mask[self.index])
+
+    @active.setter
+    def active(self, value: bool):
+        self.grid.set_active(self.index, value)
+
+    @property
+    def links(self) -> Mapping['CellView', bool]:
+        # Read-only: the links live in the grid's bitmasks, so go through `link`/`unlink`.
+        return MappingProxyType({n: True for n in self.get_links()})
+
+    @property
+    def neighbors(self) -> List['CellView']:
+        return [CellView(self.grid, j) for _, j in self.grid.neighbor_slots(self.index)]
+
+    @property
+    def active_neighbors(self) -> List['CellView']:
+        mask = self.grid.active_mask
+        return [CellView(self.grid, j) for _, j in self.grid.neighbor_slots(self.index) if mask[j]]
+
+    def link(self, cell: 'CellView', bidi=True):
+        self.grid.link_index(self.index, cell.index, bidi)
+
+    def unlink(self, cell: 'CellView', bidi=True):
+        self.grid.unlink_index(self.index, cell.index, bidi)
+
+    def is_linked(self, cell: 'CellView') -> bool:
+        d = self.grid.direction(self.index, cell.index)
+        return d >= 0 and bool(self.grid.link_bits[self.index] >> d & 1)
+
+    def get_links(self) -> List['CellView']:
+        return [CellView(self.grid, j) for j in self.grid.linked_indices(self.index)]
+
+    def __eq__(self, other):
+        return isinstance(other, CellView) and other.index == self.index and other.grid is self.grid
+
+    def __hash__(self):
+        return self.index
+
+    def __lt__(self, other):
+        return self.index < other.index # index order is (level, row, column) order
+
+    def __repr__(self):
+        return f"CellView({self.row}, {self.column}, {self.level})"
+
+class ArrayGrid(Grid):
+    """Grid backend that stores links as per-cell wall bitmasks.
+
+    Bit `d` of `link_bits[i]` is set when cell `i` is linked through direction
+    `d`: the topology's planar deltas first, then the floor below and above.
+    Activity is a byte mask and neighbors are computed from the offset tables,
+    so no per-cell objects exist until a `CellView` is requested.
+
+    `link_bits` and `active_mask` may be passed in as any byte-indexable buffers
+    (e.g. slices of a memory map) to wrap existing storage instead of allocating.
+    """
+    def __init__(self, rows: int, columns: int, levels: int = 1, link_bits=None, active_mask=None):
+        self.rows = rows
+        self.columns = columns
+        self.levels = levels
+        self.layer_size = rows * columns
+        self.count = self.layer_size * levels
+        self.link_bits = array('B', bytes(self.count)) if link_bits is None else link_bits
+        self.active_mask = bytearray(b'\x01') * self.count if active_mask is None else active_mask
+        self.shape = "rectangle"
+        self.version = 0
+        self.seed: Optional[int] = None
+        self._active_index: Optional[array] = None
+        self._slots: Optional[array] = None
+        # Every topology's offset table depends only on row/column parity.
+        self._tables = [[(d, dr, dc, dr * columns + dc) for d, (dr, dc) in enumerate(self.planar_deltas(r, c))]
+                        for r in (0, 1) for c in (0, 1)]
+        # Index offset -> (direction, dr, dc, wrapped) candidates, in table order, for `direction`.
+        self._offsets = []
+        for table in self._tables:
+            offsets = {}
+            for d, dr, dc, off in table:
+                offsets.setdefault(off, []).append((d, dr, dc, False))
+                if self.wraps_columns and dc: offsets.setdefault(off - dc * columns, []).append((d, dr, dc, True))
+            self._offsets.append(offsets)
+        # (parity << 8 | link bits) -> (index offset, dc) per set bit, filled by `linked_indices`.
+        self._decoded: Dict[int, List[Tuple[int, int]]] = {}
+
+    def index(self, row: int, col: int, level: int = 0) -> int:
+        return (level * self.rows + row) * self.columns + col
+
+    def cell_at(self, index: int) -> CellView:
+        return CellView(self, index)
+
+    def _direction_table(self, r: int, c: int) -> List[Tuple[int, int, int, int]]:
+        """(direction, dr, dc, index offset) rows of the offset table at (r, c)."""
+        return self._tables[(r & 1) << 1 | (c & 1)]
+
+    def neighbor_slots(self, i: int) -> List[Tuple[int, int]]:
+        """(direction, index) pairs for every in-bounds neighbor of cell `i`."""
+        l, rem = divmod(i, self.layer_size)
+        r, c = divmod(rem, self.columns)
+        rows, cols = self.rows, self.columns
+        table = self._direction_table(r, c)
+        slots = []
+        for d, dr, dc, off in table:
+            if 0 <= r + dr < rows:
+                if 0 <= c + dc < cols: slots.append((d, i + off))
+                elif self.wraps_columns: slots.append((d, i + off - dc * cols))
+        k = len(table)
+        if l > 0: slots.append((k, i - self.layer_size))
+        if l < self.levels - 1: slots.append((k + 1, i + self.layer_size))
+        return slots
+
+    def direction(self, i: int, j: int) -> int:
+        """Direction bit leading from cell `i` to cell `j`, or -1 if not adjacent."""
+        delta = j - i
+        l, rem = divmod(i, self.layer_size)
+        r, c = divmod(rem, self.columns)
+        # Same candidates and order as `neighbor_slots`: planar slots first, then the floors.
+        parity = (r & 1) << 1 | (c & 1)
+        for d, dr, dc, wrapped in self._offsets[parity].get(delta, ()):
+            if 0 <= r + dr < self.rows and (0 <= c + dc < self.columns) != wrapped: return d
+        k = len(self._tables[parity])
+        if delta == -self.layer_size and l > 0: return k
+        if delta == self.layer_size and l < self.levels - 1: return k + 1
+        return -1
+
+    def linked_indices(self, i: int) -> List[int]:
+        bits = self.link_bits[i]
+        if not bits: return []
+        # Set bits are always in bounds, so they decode straight from the offsets.
+        cols = self.columns
+        r, c = divmod(i % self.layer_size, cols)
+        key = ((r & 1) << 1 | (c & 1)) << 8 | bits
+        decoded = self._decoded.get(key)
+        if decoded is None:
+            table = self._direction_table(r, c)
+            decoded = [(off, dc) for d, dr, dc, off in table if bits >> d & 1]
+            k = len(table)
+            if bits >> k & 1: decoded.append((-self.layer_size, 0))
+            if bits >> (k + 1) & 1: decoded.append((self.layer_size, 0))
+            self._decoded[key] = decoded
+        return [i + off if 0 <= c + dc < cols else i + off - dc * cols for off, dc in decoded]
+
+    def link_index(self, i: int, j: int, bidi=True):
+        # Like `Cell.link`, inactive cells are left unlinked; non-adjacent pairs have no wall bit at all.
+        if not self.active_mask[i] or not self.active_mask[j]: return
+        d = self.direction(i, j)
+        if d < 0: raise ValueError(f"cells {i} and {j} are not adjacent")
+        self.link_bits[i] |= 1 << d
+        if bidi: self.link_bits[j] |= 1 << self.direction(j, i)
+        self.version += 1
+
+    def unlink_index(self, i: int, j: int, bidi=True):
+        d = self.direction(i, j)
+        if d < 0: return
+        self.link_bits[i] &= ~(1 << d)
+        if bidi: self.link_bits[j] &= ~(1 << self.direction(j, i))
+        self.version += 1
+
+    def set_active(self, i: int, value: bool):
+        if bool(self.active_mask[i]) == bool(value): return
+        self.active_mask[i] = 1 if value else 0
+        if not value:
+            for j in self.linked_indices(i): self.unlink_index(i, j)
+        self._on_activity_change(i, bool(value))
+
+    def _index(self) -> array:
+        if self._active_index is None:
+            mask = self.active_mask
+            self._active_index = array('i', [i for i in range(self.count) if mask[i]])
+            self._slots = array('i', [-1]) * self.count
+            for slot, i in enumerate(self._active_index): self._slots[i] = slot
+        return self._active_index
+
+    def _on_activity_change(self, i: int, active: bool):
+        self.version += 1
+        index = self._active_index
+        if index is None: return
+        if active:
+            self._slots[i] = len(index); index.append(i)
+        else:
+            last = index.pop()
+            if last != i:
+                index[self._slots[i]] = last; self._slots[last] = self._slots[i]
+            self._slots[i] = -1
+
+    def random_cell(self, rng=random) -> Optional[CellView]:
+        index = self._index()
+        if not index: return None
+        return CellView(self, rng.choice(index))
+
+    def get_cell(self, row, col, level=0) -> Optional[CellView]:
+        if 0 <= level < self.levels and 0 <= row < self.rows and 0 <= col < self.columns:
+            i = (level * self.rows + row) * self.columns + col
+            if self.active_mask[i]: return CellView(self, i)
+        return None
+
+    def each_cell(self) -> Iterator[CellView]:
+        mask = self.active_mask
+        for i in range(self.count):
+            if mask[i]: yield CellView(self, i)
+
+    def each_cell_in_level(self, level: int) -> Iterator[CellView]:
+        mask = self.active_mask
+        for i in range(level * self.layer_size, (level + 1) * self.layer_size):
+            if mask[i]: yield CellView(self, i)
+
+    def mask_shape(self, shape: str):
+        """Disables cells outside the desired shape."""
+        self.shape = shape
+        for r in range(self.rows):
+            for c in range(self.columns):
+                if self._in_shape(shape, r, c): continue
+                for l in range(self.levels):
+                    self.set_active(self.index(r, c, l), False)
+
+class ArraySquareGrid(ArrayGrid, SquareCellGrid): pass
+class ArrayHexGrid(ArrayGrid, HexCellGrid): pass
+class ArrayTriGrid(ArrayGrid, TriCellGrid): pass
+class ArrayPolarGrid(ArrayGrid, PolarCellGrid): pass
+
+ARRAY_GRIDS = {cls.topology: cls for cls in (ArraySquareGrid, ArrayHexGrid, ArrayTriGrid, ArrayPolarGrid)}
+
+def compact_grid_class(GridClass) -> type:
+    """Returns the array-backed counterpart of a topology class."""
+    return ARRAY_GRIDS[GridClass.topology]
@@ -0,0 +1,179 @@
+# maze_vectorized.py
+"""NumPy generators that write straight into an `ArrayGrid`'s wall bitmasks.
+
+`Kruskals`, `BinaryTree` and `Sidewinder` return these from `passages` when
+NumPy is installed and the grid is array-backed; otherwise they run their
+per-cell Python loops. Passages are built as flat arrays of (cell, direction)
+pairs without creating a `CellView`. `generate` or-s them into `link_bits` in
+bulk (`carve`), and `generate_step` links them one at a time in the same order
+(`link_steps`), so both build the same maze. The NumPy RNG is seeded from the
+generator's `rng`, so a seeded generator still reproduces its maze; the maze
+differs from the Python loop's for the same seed.
+"""
+import random
+from typing import Tuple
+
+from maze_topology import ArrayGrid, Grid
+
+try:
+    import numpy as np
+except ImportError: # optional: generators fall back to their Python loops
+    np = None
+
+HAVE_NUMPY = np is not None
+
+def vectorizable(grid: Grid) -> bool:
+    return HAVE_NUMPY and hasattr(grid, "link_bits")
+
+def _numpy_rng(rng: random.Random):
+    return np.random.default_rng(rng.getrandbits(64))
+
+def _coords(grid: ArrayGrid):
+    """Row and column of every cell of one level, as flat arrays."""
+    return np.divmod(np.arange(grid.layer_size), grid.columns)
+
+def _planar_steps(grid: ArrayGrid):
+    """Per planar direction: (direction, reverse direction, neighbour row, neighbour
+    column, in-bounds mask) over one level, for every parity class at once."""
+    rows, cols = grid.rows, grid.columns
+    r, c = _coords(grid)
+    parity = (r & 1) << 1 | (c & 1)
+    steps = []
+    for d in range(len(grid._tables[0])):
+        dr = np.array([table[d][1] for table in grid._tables])[parity]
+        dc = np.array([table[d][2] for table in grid._tables])[parity]
+        nr, nc = r + dr, c + dc
+        if grid.wraps_columns: nc %= cols
+        ok = (nr >= 0) & (nr < rows) & (nc >= 0) & (nc < cols)
+        # The way back: the direction in the neighbour's table whose delta undoes this one
+        back = (nr & 1) << 1 | (nc & 1)
+        reverse = np.full(grid.layer_size, -1)
+        for p, table in enumerate(grid._tables):
+            for e, er, ec, _ in table:
+                reverse[(back == p) & (dr == -er) & (dc == -ec)] = e
+        steps.append((d, reverse, nr, nc, ok))
+    return steps
+
+def carve(grid: ArrayGrid, u, du, v, dv):
+    """Sets direction bits `du` on cells `u` and `dv` on cells `v` (paired passages)."""
+    bits = np.frombuffer(grid.link_bits, dtype=np.uint8)
+    np.bitwise_or.at(bits, u, np.left_shift(1, du).astype(np.uint8))
+    np.bitwise_or.at(bits, v, np.left_shift(1, dv).astype(np.uint8))
+    grid.version += 1
+
+def link_steps(grid: ArrayGrid, passages: Tuple):
+    """Links the passages one at a time, yielding each linked pair of views."""
+    u, _, v, _ = passages
+    for i, j in zip(u.tolist(), v.tolist()):
+        grid.link_index(i, j)
+        yield grid.cell_at(i), grid.cell_at(j)
+
+def edge_arrays(grid: ArrayGrid) -> Tuple:
+    """(u, du, v, dv): every pair of adjacent active cells once, with the direction bit
+    from each side; planar edges first, then floor-to-floor ones."""
+    mask = np.frombuffer(bytes(grid.active_mask), dtype=np.uint8).astype(bool)
+    layer, cols = grid.layer_size, grid.columns
+    base = np.arange(layer)
+    us, dus, vs, dvs = [], [], [], []
+    for d, reverse, nr, nc, ok in _planar_steps(grid):
+        n = nr * cols + nc
+        keep = ok & (n > base)
+        for l in range(grid.levels):
+            u, v = base[keep] + l * layer, n[keep] + l * layer
+            live = mask[u] & mask[v]
+            us.append(u[live]); vs.append(v[live])
+            dus.append(np.full(int(live.sum()), d)); dvs.append(reverse[keep][live])
+    k = len(grid._tables[0])
+    for l in range(grid.levels - 1):
+        u = base + l * layer
+        u = u[mask[u] & mask[u + layer]]
+        us.append(u); vs.append(u + layer)
+        dus.append(np.full(len(u), k + 1)); dvs.append(np.full(len(u), k))
+    return tuple(np.concatenate(a).astype(np.int64) for a in (us, dus, vs, dvs))
+
+def kruskal(grid: ArrayGrid, rng: random.Random) -> Tuple:
+    """Randomized Kruskal: shuffled edge arrays and an iterative union-find. Returns
+    the passages (u, du, v, dv) in the order they were taken."""
+    u, du, v, dv = edge_arrays(grid)
+    order = _numpy_rng(rng).permutation(len(u))
+    parent = list(range(grid.count))
+    taken, need = [], len(grid._index()) - 1
+    for e, a, b in zip(order.tolist(), u[order].tolist(), v[order].tolist()):
+        while parent[a] != a: # find, inlined, with path halving
+            parent[a] = a = parent[parent[a]]
+        while parent[b] != b:
+            parent[b] = b = parent[parent[b]]
+        if a != b:
+            parent[a] = b
+            taken.append(e)
+            if len(taken) == need: break
+    taken = np.array(taken, dtype=np.int64)
+    return u[taken], du[taken], v[taken], dv[taken]
+
+def binary_tree(grid: ArrayGrid, rng: random.Random) -> Tuple:
+    """Binary Tree: each cell links to a random neighbour in an earlier row or further
+    east on its own row, or else to the floor above, drawn for all cells at once.
+    Returns the passages (u, du, v, dv), level by level."""
+    rng = _numpy_rng(rng)
+    layer, cols = grid.layer_size, grid.columns
+    mask = np.frombuffer(bytes(grid.active_mask), dtype=np.uint8).astype(bool).reshape(grid.levels, layer)
+    r, c = _coords(grid)
+    steps = [(d, rev, nr * cols + nc, ok & ((nr < r) | ((nr == r) & (nc > c))))
+             for d, rev, nr, nc, ok in _planar_steps(grid)]
+    k = len(grid._tables[0])
+    us, dus, vs, dvs = [], [], [], []
+    for l in range(grid.levels):
+        live = mask[l]
+        allowed = np.stack([ok & live & mask[l][np.where(ok, n, 0)] for _, _, n, ok in steps])
+        count = allowed.sum(axis=0)
+        pick = (rng.random(layer) * count).astype(np.int64)
+        chosen = np.argmax(allowed.cumsum(axis=0) > pick, axis=0) # the pick-th allowed direction
+        cells = np.flatnonzero(count > 0)
+        d = chosen[cells]
+        n = np.stack([s[2] for s in steps])[d, cells]
+        rev = np.stack([s[1] for s in steps])[d, cells]
+        us.append(cells + l * layer); dus.append(d); vs.append(n + l * layer); dvs.append(rev)
+        if l < grid.levels - 1: # vertical bias when no planar neighbour qualifies
+            up = np.flatnonzero(live & (count == 0) & mask[l + 1])
+            us.append(up + l * layer); dus.append(np.full(len(up), k + 1))
+            vs.append(up + (l + 1) * layer); dvs.append(np.full(len(up), k))
+    return tuple(np.concatenate(a).astype(np.int64) for a in (us, dus, vs, dvs))
+
+def row_streamable(grid: ArrayGrid) -> bool:
+    """True for unmasked grids whose every cell has east (0, 1) and south (1, 0) neighbours."""
+    return all(grid.active_mask) and all(
+        (0, 1) in [(dr, dc) for _, dr, dc, _ in t] and (1, 0) in [(dr, dc) for _, dr, dc, _ in t]
+        for t in grid._tables)
+
+def sidewinder(grid: ArrayGrid, rng: random.Random) -> Tuple:
+    """Sidewinder on an unmasked grid: each row's run-closing coin flips and each run's
+    southward exit are drawn as whole arrays. The last row is one open corridor, and a
+    random cell of it climbs to the next floor, as in the Python loop. Returns the
+    passages (u, du, v, dv), level by level."""
+    rng = _numpy_rng(rng)
+    rows, cols, layer = grid.rows, grid.columns, grid.layer_size
+    r, c = _coords(grid)
+    parity = (r & 1) << 1 | (c & 1)
+    def bit(delta): # direction bit of `delta` at every cell of a level
+        return np.array([next(d for d, dr, dc, _ in t if (dr, dc) == delta) for t in grid._tables])[parity]
+    east, west, south, north = bit((0, 1)), bit((0, -1)), bit((1, 0)), bit((-1, 0))
+    k = len(grid._tables[0])
+    us, dus, vs, dvs = [], [], [], []
+    for l in range(grid.levels):
+        base = l * layer
+        carry = rng.integers(0, 2, size=(rows, cols), dtype=np.int8).astype(bool) # keep the run going east
+        carry[rows - 1] = True # the last row is one corridor
+        carry[:, cols - 1] = False # and no run passes the row's end
+        flat = carry.ravel()
+        e = np.flatnonzero(flat)
+        us.append(e + base); dus.append(east[e]); vs.append(e + 1 + base); dvs.append(west[e + 1])
+        # Every run above the last row closes with one southward exit
+        ends = np.flatnonzero(~flat[:(rows - 1) * cols])
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        exits = starts + (rng.random(len(ends)) * (ends - starts + 1)).astype(np.int64)
+        us.append(exits + base); dus.append(south[exits]); vs.append(exits + cols + base); dvs.append(north[exits + cols])
+        if l < grid.levels - 1:
+            top = base + (rows - 1) * cols + int(rng.integers(cols))
+            us.append(np.array([top])); dus.append(np.array([k + 1]))
+            vs.append(np.array([top + layer])); dvs.append(np.array([k]))
+    return tuple(np.concatenate(a).astype(np.int64) for a in (us, dus, vs, dvs))
@@ -4,6 +4,11 @@ import config
 from typing import Tuple, List, Set, Optional, Dict
 from maze_topology import Grid, Cell
 
+try:
+    import numpy as np
+except ImportError: # optional: FOV rays fall back to a per-segment Python loop
+    np = None
+
 class MazeRenderer:
     def __init__(self, grid: Grid, cell_radius: float, grid_type: str, top_margin: int, bottom_margin: int):
         self.grid = grid
@@ -15,6 +20,10 @@ class MazeRenderer:
         self._segment_cache: Dict[int, List[Tuple[Tuple[float, float], Tuple[float, float]]]] = {}
         self._pixel_cache: Dict[Tuple[int, int], Tuple[float, float]] = {}
         self._spatial_segments: Dict[int, Dict[Tuple[int, int], List[Tuple[Tuple[float, float], Tuple[float, float]]]]] = {}
+        # Per level, the spatial hash as NumPy arrays: (x1, y1, x2, y2) rows and each bucket's row numbers
+        self._segment_arrays: Dict[int, Tuple['np.ndarray', Dict[Tuple[int, int], 'np.ndarray']]] = {}
+        # Per level, the wall outline pieces for the sweep and each spatial bucket's piece numbers
+        self._sweep_pieces: Dict[int, Tuple[List[Tuple[Tuple[float, float], Tuple[float, float]]], Dict[Tuple[int, int], List[int]]]] = {}
 
     def get_pixel(self, r, c, scale=1.0, offset=(0,0)):
         if scale == 1.0 and offset == (0,0) and (r, c) in self._pixel_cache:
@@ -58,6 +67,10 @@ class MazeRenderer:
         else: # Inverted v
             return (cx, cy - R), (cx + s/2, cy + R/2), (cx - s/2, cy + R/2)
 
+    def layout_key(self) -> Tuple[float, ...]:
+        """Everything besides the grid's links that the unscaled wall geometry depends on."""
+        return (self.cell_radius, self.inset_factor, self.top_margin, self.bottom_margin, config.SCREEN_WIDTH, config.SCREEN_HEIGHT)
+
     def _get_segments(self, level: int) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
         """Lazy-load and cache flattened segments for the level."""
         if level in self._segment_cache:
@@ -72,20 +85,25 @@ class MazeRenderer:
         self._segment_cache[level] = segments
         return segments
 
-    def get_occlusion_polygons(self, level: int, scale: float = 1.0, offset: Tuple[float, float] = (0, 0), thickness_mult: float = 1.0) -> List[List[Tuple[float, float]]]:
-        """Calculates solid wall geometry using a Post-and-Beam model."""
-        polygons = []
+    def get_occlusion_polygons(self, level: int, scale: float = 1.0, offset: Tuple[float, float] = (0, 0), thickness_mult: float = 1.0, merge: bool = True) -> List[Tuple[Tuple[float, float], ...]]:
+        """Calculates solid wall geometry using a Post-and-Beam model.
+        Polygons are plain tuples so the garbage collector can stop tracking them.
+
+        With `merge`, walls shared by two cells are emitted once, collinear walls that
+        meet end to end become one beam, and posts a beam fully covers are dropped.
+        Without it there is one beam per cell edge, as the geometry used to be."""
         R = self.cell_radius * scale
         T = R * (1.0 - self.inset_factor) * thickness_mult
-        posts = {} 
+        posts = {} # rounded vertex -> exact vertex
+        walls = [] # wall centrelines (v1, v2)
 
         def add_post(px, py):
             key = (round(px, 2), round(py, 2))
-            if key not in posts:
-                posts[key] = [(px - T, py - T), (px + T, py - T), (px + T, py + T), (px - T, py + T)]
+            if key not in posts: posts[key] = (px, py)
 
         if self.grid_type == "rect":
             s = R * 2
+            ext = T if merge else -T # rect beams stop short of their posts; merged ones swallow them
             ox, oy = config.SCREEN_WIDTH / 2 + offset[0], (config.SCREEN_HEIGHT - self.top_margin + self.bottom_margin) / 2 + offset[1]
             start_x, start_y = ox - (self.grid.columns * s)/2, oy - (self.grid.rows * s)/2
             for r in range(self.grid.rows + 1):
@@ -94,15 +112,13 @@ class MazeRenderer:
                     add_post(px, py)
                     if r < self.grid.rows:
                         c1, c2 = self.grid.get_cell(r, c-1, level), self.grid.get_cell(r, c, level)
-                        if not c1 or not c2 or not c1.is_linked(c2):
-                            polygons.append([(px - T, py + T), (px + T, py + T), (px + T, py + s - T), (px - T, py + s - T)])
+                        if not c1 or not c2 or not c1.is_linked(c2): walls.append(((px, py), (px, py + s)))
                     if c < self.grid.columns:
                         c1, c2 = self.grid.get_cell(r-1, c, level), self.grid.get_cell(r, c, level)
-                        if not c1 or not c2 or not c1.is_linked(c2):
-                            polygons.append([(px + T, py - T), (px + s - T, py - T), (px + s - T, py + T), (px + T, py + T)])
+                        if not c1 or not c2 or not c1.is_linked(c2): walls.append(((px, py), (px + s, py)))
         else:
-            for cell in self.grid.each_cell():
-                if cell.level != level: continue
+            ext = 0.0
+            for cell in self.grid.each_cell_in_level(level):
                 cx, cy = self.get_pixel(cell.row, cell.column, scale, offset)
                 r, c = cell.row, cell.column
                 edges = []
@@ -128,11 +144,69 @@ class MazeRenderer:
                     n = self.grid.get_cell(r + dr, target_c, level)
                     if not n or not cell.is_linked(n):
                         add_post(v1[0], v1[1]); add_post(v2[0], v2[1])
-                        dx, dy = v2[0] - v1[0], v2[1] - v1[1]; dist = math.sqrt(dx*dx + dy*dy)
-                        if dist > 0:
-                            nx, ny = -dy/dist * T, dx/dist * T
-                            polygons.append([(v1[0]-nx, v1[1]-ny), (v1[0]+nx, v1[1]+ny), (v2[0]+nx, v2[1]+ny), (v2[0]-nx, v2[1]-ny)])
-        return list(posts.values()) + polygons
+                        walls.append((v1, v2))
+
+        if merge: walls, covered = self._merge_walls(walls, posts, T, ext)
+        else: covered = set()
+        polygons = [((px - T, py - T), (px + T, py - T), (px + T, py + T), (px - T, py + T)) for key, (px, py) in posts.items() if key not in covered]
+        for v1, v2 in walls:
+            dx, dy = v2[0] - v1[0], v2[1] - v1[1]; dist = math.sqrt(dx*dx + dy*dy)
+            if dist > 0:
+                ux, uy = dx/dist * ext, dy/dist * ext
+                nx, ny = -dy/dist * T, dx/dist * T
+                a, b = (v1[0] - ux, v1[1] - uy), (v2[0] + ux, v2[1] + uy)
+                polygons.append(((a[0]-nx, a[1]-ny), (a[0]+nx, a[1]+ny), (b[0]+nx, b[1]+ny), (b[0]-nx, b[1]-ny)))
+        return polygons
+
+    @staticmethod
+    def _merge_walls(walls: List[Tuple[Tuple[float, float], Tuple[float, float]]], posts: Dict[Tuple[float, float], Tuple[float, float]],
+                     T: float, ext: float) -> Tuple[List[Tuple[Tuple[float, float], Tuple[float, float]]], Set[Tuple[float, float]]]:
+        """Dedupes wall centrelines and chains collinear ones that meet end to end into runs.
+        Returns the runs and the (rounded) posts whose square the run's beam, `ext` longer
+        at both ends and `T` either side, fully covers. Vertices match by the same 2-decimal
+        snapping as the posts, so runs join exactly where the single edges did."""
+        def key(p): return (round(p[0], 2), round(p[1], 2))
+        edges = {}  # (from key, to key) -> exact (from, to), oriented so from key < to key
+        for v1, v2 in walls:
+            k1, k2 = key(v1), key(v2)
+            if k1 == k2: continue
+            if k2 < k1: v1, v2, k1, k2 = v2, v1, k2, k1
+            edges.setdefault((k1, k2), (v1, v2))
+        outgoing: Dict[Tuple[float, float], list] = {}
+        for (k1, k2), (v1, v2) in edges.items():
+            dx, dy = v2[0] - v1[0], v2[1] - v1[1]; dist = math.sqrt(dx*dx + dy*dy)
+            outgoing.setdefault(k1, []).append((k2, v2, dx / dist, dy / dist))
+
+        def follow(k, ux, uy):  # the edge leaving `k` straight on, if any
+            for edge in outgoing.get(k, ()):
+                if abs(edge[2] * uy - edge[3] * ux) < 1e-6 and edge[2] * ux + edge[3] * uy > 0: return edge
+            return None
+
+        continued = set()  # edges a collinear edge leads into
+        for k1, out in outgoing.items():
+            for k2, _, ux, uy in out:
+                nxt = follow(k2, ux, uy)
+                if nxt: continued.add((k2, nxt[0]))
+        runs, covered = [], set()
+        for k1, out in outgoing.items():
+            for k2, v2, ux, uy in out:
+                if (k1, k2) in continued: continue  # not the first edge of its run
+                v1, keys = edges[(k1, k2)][0], [k1, k2]
+                nxt = follow(k2, ux, uy)
+                while nxt:
+                    k2, v2 = nxt[0], nxt[1]; keys.append(k2)
+                    nxt = follow(k2, ux, uy)
+                runs.append((v1, v2))
+                if abs(ux) > 1e-6 and abs(uy) > 1e-6: continue  # a tilted beam never covers a square post
+                length = (v2[0] - v1[0]) * ux + (v2[1] - v1[1]) * uy
+                for k in keys:
+                    if k in covered: continue
+                    px, py = posts.get(k, k)
+                    if all(abs((px + sx - v1[0]) * -uy + (py + sy - v1[1]) * ux) <= T + 1e-6 and
+                           -ext - 1e-6 <= (px + sx - v1[0]) * ux + (py + sy - v1[1]) * uy <= length + ext + 1e-6
+                           for sx in (-T, T) for sy in (-T, T)):
+                        covered.add(k)
+        return runs, covered
 
     def precalculate_spatial_data(self, level: int):
         """Builds a spatial hash for wall segments to speed up FOV."""
@@ -140,52 +214,301 @@ class MazeRenderer:
         grid_size = self.cell_radius * 4
         spatial_map = {}
         
-        for p1, p2 in segments:
-            gx1, gy1 = int(p1[0] // grid_size), int(p1[1] // grid_size)
-            gx2, gy2 = int(p2[0] // grid_size), int(p2[1] // grid_size)
-            for gx in range(min(gx1, gx2), max(gx1, gx2) + 1):
-                for gy in range(min(gy1, gy2), max(gy1, gy2) + 1):
+        for seg in segments:
+            (x1, y1), (x2, y2) = seg if seg[0][0] <= seg[1][0] else (seg[1], seg[0])
+            slope = (y2 - y1) / (x2 - x1) if x2 != x1 else 0.0
+            # Only the buckets the segment crosses: its y extent within each bucket column,
+            # since merged walls run diagonally across many buckets
+            for gx in range(int(x1 // grid_size), int(x2 // grid_size) + 1):
+                ya = y1 + (max(x1, gx * grid_size) - x1) * slope
+                yb = y1 + (min(x2, (gx + 1) * grid_size) - x1) * slope if x2 != x1 else y2
+                for gy in range(int(min(ya, yb) // grid_size), int(max(ya, yb) // grid_size) + 1):
                     key = (gx, gy)
                     if key not in spatial_map: spatial_map[key] = []
-                    spatial_map[key].append((p1, p2))
+                    spatial_map[key].append(seg) # the segment itself, so FOV can dedupe by id()
         self._spatial_segments[level] = spatial_map
+        self._segment_arrays.pop(level, None)
+        self._sweep_pieces.pop(level, None)
 
-    def create_fov_geometry(self, origin: Tuple[float, float], level: int, radius: float = 300) -> arcade.shape_list.ShapeElementList:
+    def create_fov_geometry(self, origin: Tuple[float, float], level: int, radius: float = 300, rays: Optional[int] = None,
+                            engine: Optional[str] = None) -> arcade.shape_list.ShapeElementList:
         """Low-Poly FOV with spatial partitioning for high performance."""
+        outer_points = self.fov_polygon(origin, level, radius, rays, engine)
+        shapes = arcade.shape_list.ShapeElementList()
+        if len(outer_points) > 2:
+            shapes.append(arcade.shape_list.create_polygon(outer_points, (255, 255, 255, 255)))
+        return shapes
+
+    def fov_polygon(self, origin: Tuple[float, float], level: int, radius: float = 300, rays: Optional[int] = None,
+                    engine: Optional[str] = None) -> List[Tuple[float, float]]:
+        """The visible region around `origin`, as a polygon pushed slightly into the walls it meets.
+
+        `engine` (default `config.FOV_ENGINE`) is "rays", where `rays` evenly spaced rays (default
+        `config.FOV_RAYS`) stop at the nearest wall, all cast at once with NumPy when it is installed;
+        or "sweep", the exact visibility polygon from an angular sweep (see `_sweep_polygon`), whose
+        open stretches follow a `rays`-gon inscribed in the radius."""
         if level not in self._spatial_segments:
             self.precalculate_spatial_data(level)
-            
+        rays, engine = rays or config.FOV_RAYS, engine or config.FOV_ENGINE
         grid_size = self.cell_radius * 4
         gx, gy = int(origin[0] // grid_size), int(origin[1] // grid_size)
         range_inc = int(radius // grid_size) + 1
-        
-        active_segments = []
-        seen = set()
-        spatial_map = self._spatial_segments[level]
-        
-        for dx in range(-range_inc, range_inc + 1):
-            for dy in range(-range_inc, range_inc + 1):
-                cell_segments = spatial_map.get((gx + dx, gy + dy), [])
-                for seg in cell_segments:
-                    if id(seg) not in seen:
-                        active_segments.append(seg)
-                        seen.add(id(seg))
+        keys = [(gx + dx, gy + dy) for dx in range(-range_inc, range_inc + 1) for dy in range(-range_inc, range_inc + 1)]
 
         T = self.cell_radius * (1.0 - self.inset_factor)
+        if engine == "sweep": return self._sweep_polygon(origin, self._sweep_segments(level, keys), radius, rays, T * 0.4)
+        if engine != "rays": raise ValueError(f"Unknown FOV engine {engine!r}")
+        if np is not None: return self._cast_rays_numpy(origin, level, keys, radius, rays, T * 0.4)
+
+        active_segments = self._active_segments(level, keys)
         outer_points = []
-        for i in range(60):
-            angle = math.radians(i * 6)
+        for i in range(rays):
+            angle = 2 * math.pi * i / rays
             dx, dy, min_t = math.cos(angle), math.sin(angle), radius
             for p1, p2 in active_segments:
                 t = self._ray_segment_intersect(origin, (dx, dy), p1, p2)
-                if t is not None and t < min_t:
-                    min_t = t + (T * 0.4) # Push slightly into wall for watertight mask
+                if t is not None and t < min_t: min_t = t
+            if min_t < radius: min_t += T * 0.4 # Push slightly into wall for watertight mask
             outer_points.append((origin[0] + dx * min_t, origin[1] + dy * min_t))
-        
-        shapes = arcade.shape_list.ShapeElementList()
-        if len(outer_points) > 2:
-            shapes.append(arcade.shape_list.create_polygon(outer_points, (255, 255, 255, 255)))
-        return shapes
+        return outer_points
+
+    def _active_segments(self, level: int, keys) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """The segments in the spatial buckets at `keys`, each once."""
+        active_segments = []
+        seen = set()
+        spatial_map = self._spatial_segments[level]
+        for key in keys:
+            for seg in spatial_map.get(key, ()):
+                if id(seg) not in seen:
+                    active_segments.append(seg)
+                    seen.add(id(seg))
+        return active_segments
+
+    def _sweep_segments(self, level: int, keys) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """The wall outline pieces (see `_wall_outline`) of the segments in the spatial buckets at
+        `keys`, each once. The outline and its buckets of piece numbers are built once per level."""
+        if level not in self._sweep_pieces:
+            segments = self._get_segments(level)
+            number, pieces = {}, []
+            for seg, split in zip(segments, self._wall_outline(segments, self.cell_radius)):
+                number[id(seg)] = range(len(pieces), len(pieces) + len(split))
+                pieces.extend(split)
+            buckets = {key: [n for seg in segs for n in number[id(seg)]] for key, segs in self._spatial_segments[level].items()}
+            self._sweep_pieces[level] = (pieces, buckets)
+        pieces, buckets = self._sweep_pieces[level]
+        return [pieces[n] for n in set().union(*(buckets[key] for key in keys if key in buckets))]
+
+    @staticmethod
+    def _wall_outline(segments, bucket: float) -> List[List[Tuple[Tuple[float, float], Tuple[float, float]]]]:
+        """For each of `segments`, the pieces of it on the outline of the walls' union, turned so
+        the wall is on their left.
+
+        `segments` lists the closed outlines of convex polygons one after another, as
+        `_get_segments` does. Each edge loses the stretches strictly inside another polygon, found
+        by clipping it against every polygon whose bounding box it meets (`bucket`-sized squares
+        narrow the candidates). Where two walls cross, both edges stop at the crossing, so no two
+        pieces cross; edges that only touch or run along each other are kept whole."""
+        polygons, turns, points = [], [], []
+        for a, b in segments:
+            points.append(a)
+            if b == points[0]:
+                area = sum(p[0] * q[1] - q[0] * p[1] for p, q in zip(points, points[1:] + points[:1]))
+                polygons.append(points); turns.append(1 if area > 0 else -1); points = [] # counter-clockwise or not
+        boxes, sides, cells = [], [], {}
+        for n, poly in enumerate(polygons):
+            xs, ys = [p[0] for p in poly], [p[1] for p in poly]
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+            # (q, r - q) per edge q -> r, turned so the inside is on the left of every edge
+            sides.append([(q[0], q[1], (r[0] - q[0]) * turns[n], (r[1] - q[1]) * turns[n]) for q, r in zip(poly, poly[1:] + poly[:1])])
+            for gx in range(int(min(xs) // bucket), int(max(xs) // bucket) + 1):
+                for gy in range(int(min(ys) // bucket), int(max(ys) // bucket) + 1):
+                    if (gx, gy) not in cells: cells[(gx, gy)] = []
+                    cells[(gx, gy)].append(n)
+        outline = []
+        for n, poly in enumerate(polygons):
+            x0, y0, x1, y1 = boxes[n]
+            near = {m for gx in range(int(x0 // bucket), int(x1 // bucket) + 1) for gy in range(int(y0 // bucket), int(y1 // bucket) + 1)
+                    for m in cells[(gx, gy)] if m != n}
+            near = [m for m in near if boxes[m][0] < x1 and boxes[m][2] > x0 and boxes[m][1] < y1 and boxes[m][3] > y0]
+            for a, b in zip(poly, poly[1:] + poly[:1]):
+                dx, dy = b[0] - a[0], b[1] - a[1]
+                (lx, hx), (ly, hy) = sorted((a[0], b[0])), sorted((a[1], b[1]))
+                inside = [] # (t0, t1) stretches of a + t (b - a) strictly inside another polygon
+                for m in near:
+                    box = boxes[m]
+                    if hx <= box[0] or lx >= box[2] or hy <= box[1] or ly >= box[3]: continue
+                    t0, t1 = 0.0, 1.0
+                    for qx, qy, ex, ey in sides[m]:
+                        num, den = ex * (a[1] - qy) - ey * (a[0] - qx), ex * dy - ey * dx
+                        if -1e-12 < den < 1e-12:
+                            if num <= 1e-9: break # parallel, not strictly inside
+                        elif den > 0:
+                            if -num / den > t0: t0 = -num / den
+                        elif -num / den < t1: t1 = -num / den
+                        if t1 - t0 <= 1e-9: break
+                    else:
+                        inside.append((t0, t1))
+                t, pieces = 0.0, []
+                for t0, t1 in sorted(inside) + [(1.0, 1.0)]:
+                    if t0 - t > 1e-9:
+                        p, q = (a[0] + dx * t, a[1] + dy * t), (a[0] + dx * t0, a[1] + dy * t0)
+                        pieces.append((p, q) if turns[n] > 0 else (q, p))
+                    t = max(t, t1)
+                outline.append(pieces)
+        return outline
+
+    @staticmethod
+    def _sweep_polygon(origin, segments, radius, sides, push) -> List[Tuple[float, float]]:
+        """Exact visibility polygon of `origin` among `segments`, bounded by a regular `sides`-gon
+        inscribed in `radius`. `segments` are wall outline pieces (see `_wall_outline`): no two
+        cross, and each has its wall on the left.
+
+        Segments beyond the radius or facing away from the origin are dropped (the origin must be
+        outside the walls), and the rest split where they cross the -x axis, so each spans an angle
+        interval in [-pi, pi]. Their endpoints and the bounding polygon's corners, sorted by angle,
+        are the events. Segments that do not cross keep one order along every ray they share, so
+        the open ones are kept in a list sorted by distance, nearest first: an opening segment is
+        placed by binary search, comparing distances along the ray halfway through the angles both
+        span, and a closing one is removed. Between two events the nearest open segment or the
+        bounding polygon, whichever is nearer, bounds the polygon. Sorting the events is
+        O(s log s), and each event costs O(log k) comparisons plus a list move of the k open
+        segments. Points on walls are pushed `push` further out along their ray."""
+        ox, oy = origin
+        inner = radius * math.cos(math.pi / sides) # the bounding polygon's inradius
+        pieces = [] # (start angle, end angle, start point, edge vector, origin-to-line cross product, start direction, end direction, within inner)
+        def add(a, b, p, q):
+            ex, ey = q[0] - p[0], q[1] - p[1]
+            lp, lq = math.hypot(*p), math.hypot(*q)
+            pieces.append((a, b, p, (ex, ey), p[0] * ey - p[1] * ex, (p[0] / lp, p[1] / lp), (q[0] / lq, q[1] / lq), max(lp, lq) <= inner))
+        for (x1, y1), (x2, y2) in segments:
+            px, py, ex, ey = x1 - ox, y1 - oy, x2 - x1, y2 - y1
+            cross = px * ey - py * ex
+            if cross > -1e-9: continue # seen edge-on, or from the wall's side: a nearer face hides it
+            length2, along = ex * ex + ey * ey, -(px * ex + py * ey)
+            if 0 < along < length2: far = cross * cross > radius * radius * length2 # closest to the origin inside
+            else: far = min(px * px + py * py, (px + ex) * (px + ex) + (py + ey) * (py + ey)) > radius * radius
+            if far: continue
+            p, q = (px + ex, py + ey), (px, py) # counter-clockwise from p to q
+            a, b = math.atan2(p[1], p[0]), math.atan2(q[1], q[0])
+            if a >= b: # wraps through the -x axis: split there
+                if a - b <= math.pi: continue # a sliver whose ends share one angle
+                c = (p[0] + (q[0] - p[0]) * (p[1] / (p[1] - q[1])) if p[1] != q[1] else p[0], 0.0)
+                if p[1] > 0: add(a, math.pi, p, c)
+                if q[1] < 0: add(-math.pi, b, c, q)
+            else:
+                add(a, b, p, q)
+        angles = [-math.pi + 2 * math.pi * i / sides for i in range(sides)] + [math.pi]
+        ring = [(radius * math.cos(a), radius * math.sin(a)) for a in angles]
+        edges = [(ring[i], (ring[i + 1][0] - ring[i][0], ring[i + 1][1] - ring[i][1])) for i in range(sides)]
+
+        def nearer(i, j): # whether open piece i is nearer than j, halfway through the angles both span
+            _, _, _, (ex, ey), cross, si, ei, _ = pieces[i]
+            _, _, _, (fx, fy), other, sj, ej, _ = pieces[j]
+            lo, hi = si if pieces[i][0] >= pieces[j][0] else sj, ei if pieces[i][1] <= pieces[j][1] else ej
+            dx, dy = lo[0] + hi[0], lo[1] + hi[1]
+            return cross / (dx * ey - dy * ex) < other / (dx * fy - dy * fx)
+
+        def distance(bound, c, s): # along the ray (c, s) to a wall piece (>= 0) or a bounding edge (< 0)
+            p, (ex, ey) = edges[~bound] if bound < 0 else pieces[bound][2:4]
+            return (p[0] * ey - p[1] * ex) / (c * ey - s * ex)
+
+        points = []
+        def emit(bound, angle):
+            c, s = math.cos(angle), math.sin(angle)
+            t = distance(bound, c, s)
+            if bound >= 0: t += push # Push slightly into wall for watertight mask
+            point = (ox + c * t, oy + s * t)
+            if not points or abs(point[0] - points[-1][0]) > 1e-9 or abs(point[1] - points[-1][1]) > 1e-9: points.append(point)
+
+        events = sorted([(a, 1, i) for i, (a, *_) in enumerate(pieces)] + [(b, 0, i) for i, (_, b, *_) in enumerate(pieces)] +
+                        [(a, 2, 0) for a in angles])
+        order, current, k = [], None, 0 # open pieces, nearest first; the piece or edge bounding the polygon
+        def switch(bound, angle):
+            nonlocal current
+            if bound == current: return
+            if current is not None: emit(current, angle)
+            emit(bound, angle); current = bound
+        while True:
+            angle = events[k][0]
+            while k < len(events) and events[k][0] == angle: # all events at this angle
+                _, kind, i = events[k]
+                if kind == 0: order.remove(i)
+                elif kind == 1:
+                    lo, hi = 0, len(order)
+                    while lo < hi:
+                        mid = (lo + hi) // 2
+                        if nearer(order[mid], i): lo = mid + 1
+                        else: hi = mid
+                    order.insert(lo, i)
+                k += 1
+            if k == len(events): break
+            if order and pieces[order[0]][7]: switch(order[0], angle); continue # wholly inside the bounding polygon
+            upto = events[k][0]
+            edge = ~min(int((angle + upto + 2 * math.pi) * sides / (4 * math.pi)), sides - 1)
+            if not order: switch(edge, angle); continue
+            wall = order[0]
+            c0, s0, c1, s1 = math.cos(angle), math.sin(angle), math.cos(upto), math.sin(upto)
+            first = wall if distance(wall, c0, s0) <= distance(edge, c0, s0) else edge
+            last = wall if distance(wall, c1, s1) <= distance(edge, c1, s1) else edge
+            switch(first, angle)
+            if last != first: # the wall crosses the bounding edge in between
+                (px, py), (ex, ey) = pieces[wall][2:4]
+                (rx, ry), (fx, fy) = edges[~edge]
+                s = ((rx - px) * fy - (ry - py) * fx) / (ex * fy - ey * fx)
+                switch(last, min(max(math.atan2(py + ey * s, px + ex * s), angle), upto))
+        if current is not None: emit(current, angle)
+        return points
+
+    def _level_arrays(self, level: int):
+        """The level's segments as one (n, 4) array and its spatial hash as row-number arrays, built once."""
+        if level not in self._segment_arrays:
+            segments = self._get_segments(level)
+            number = {id(seg): i for i, seg in enumerate(segments)}
+            coords = np.array([(p1[0], p1[1], p2[0], p2[1]) for p1, p2 in segments], dtype=np.float64).reshape(-1, 4)
+            buckets = {key: np.array([number[id(seg)] for seg in segs], dtype=np.intp) for key, segs in self._spatial_segments[level].items()}
+            self._segment_arrays[level] = (coords, buckets)
+        return self._segment_arrays[level]
+
+    def _cast_rays_numpy(self, origin, level, keys, radius, rays, push) -> List[Tuple[float, float]]:
+        """The rays against the segments in the buckets at `keys`, as flat NumPy arrays.
+
+        Segments wholly beyond `radius` are dropped, and each remaining one is only tested
+        against the rays inside the arc it spans from the origin. The (ray, segment) pairs then
+        number about rays x the walls a ray passes, instead of rays x every nearby segment."""
+        coords, buckets = self._level_arrays(level)
+        found = [buckets[key] for key in keys if key in buckets]
+        step = 2 * np.pi / rays
+        angles = np.arange(rays) * step
+        cos, sin = np.cos(angles), np.sin(angles)
+        min_t = np.full(rays, float(radius))
+        if found:
+            x1, y1, x2, y2 = coords[np.unique(np.concatenate(found))].T
+            v1x, v1y, v2x, v2y = origin[0] - x1, origin[1] - y1, x2 - x1, y2 - y1
+            # Nearest point of each segment to the origin, for the radius cull
+            length2 = v2x * v2x + v2y * v2y
+            along = np.clip((v1x * v2x + v1y * v2y) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+            near = (v2x * along - v1x) ** 2 + (v2y * along - v1y) ** 2 <= radius * radius
+            v1x, v1y, v2x, v2y = v1x[near], v1y[near], v2x[near], v2y[near]
+            # The arc each segment spans, start angle plus the shorter way round to its other end
+            a, b = np.arctan2(-v1y, -v1x), np.arctan2(v2y - v1y, v2x - v1x)
+            span = (b - a) % (2 * np.pi)
+            start = np.where(span > np.pi, b, a)
+            span = np.where(span > np.pi, 2 * np.pi - span, span)
+            first = np.ceil(start / step - 1e-6).astype(np.int64)
+            count = np.maximum(np.floor((start + span) / step + 1e-6).astype(np.int64) - first + 1, 0)
+            seg = np.repeat(np.arange(len(first)), count)
+            ray = (np.repeat(first, count) + np.arange(len(seg)) - np.repeat(np.cumsum(count) - count, count)) % rays
+            v1x, v1y, v2x, v2y, dx, dy = v1x[seg], v1y[seg], v2x[seg], v2y[seg], cos[ray], sin[ray]
+            # Same algebra as _ray_segment_intersect, with v3 = (-dy, dx)
+            dot = v2y * dx - v2x * dy
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = (v2x * v1y - v2y * v1x) / dot
+                u = (v1y * dx - v1x * dy) / dot
+            hit = (np.abs(dot) >= 1e-9) & (t >= 0) & (u >= 0) & (u <= 1)
+            np.minimum.at(min_t, ray[hit], t[hit])
+        min_t = np.where(min_t < radius, min_t + push, min_t) # Push slightly into wall for watertight mask
+        xs, ys = origin[0] + cos * min_t, origin[1] + sin * min_t
+        return list(zip(xs.tolist(), ys.tolist()))
 
     def _ray_segment_intersect(self, or_pos, or_dir, p1, p2):
         v1, v2, v3 = (or_pos[0] - p1[0], or_pos[1] - p1[1]), (p2[0] - p1[0], p2[1] - p1[1]), (-or_dir[1], or_dir[0])
@@ -195,22 +518,47 @@ class MazeRenderer:
         u = (v1[0] * v3[0] + v1[1] * v3[1]) / dot
         return t if (t >= 0 and 0 <= u <= 1) else None
 
-    def create_wall_shapes(self, level: int, scale=1.0, offset=(0,0), thickness_mult=1.0):
-        shapes = arcade.shape_list.ShapeElementList()
-        polygons = self.get_occlusion_polygons(level, scale, offset, thickness_mult)
-        for poly in polygons: shapes.append(arcade.shape_list.create_polygon(poly, config.WALL_COLOR))
-        return shapes
+    def cache_level_geometry(self, level: int, polygons: List[Tuple[Tuple[float, float], ...]], segments=None, spatial=None):
+        """Seeds the FOV segment cache and spatial hash from prebuilt unscaled wall polygons,
+        or from their `segments` and `spatial` hash when those are at hand (e.g. from the maze cache)."""
+        if segments is None:
+            segments = []
+            for poly in polygons:
+                for i in range(len(poly)):
+                    segments.append((poly[i], poly[(i + 1) % len(poly)]))
+        self._segment_cache[level] = segments
+        if spatial is None: self.precalculate_spatial_data(level)
+        else: self._spatial_segments[level] = spatial; self._segment_arrays.pop(level, None); self._sweep_pieces.pop(level, None)
 
-    def create_stair_shapes(self, level: int, scale=1.0, offset=(0,0)):
-        shapes = arcade.shape_list.ShapeElementList()
+    def get_stair_polygons(self, level: int, scale=1.0, offset=(0,0)) -> List[Tuple[Tuple[Tuple[float, float], ...], Tuple[int, ...]]]:
+        """(triangle, color) pairs marking the stairs of a level."""
+        polygons = []
         size = 8 * scale
-        for cell in self.grid.each_cell():
-            if cell.level != level: continue
+        for cell in self.grid.each_cell_in_level(level):
             cx, cy = self.get_pixel(cell.row, cell.column, scale, offset)
             for link in cell.get_links():
-                if link.level > cell.level: shapes.append(arcade.shape_list.create_polygon([(cx, cy+size), (cx-size, cy-size*0.75), (cx+size, cy-size*0.75)], arcade.color.AZURE))
-                elif link.level < cell.level: shapes.append(arcade.shape_list.create_polygon([(cx, cy-size), (cx-size, cy+size*0.75), (cx+size, cy+size*0.75)], arcade.color.BROWN))
-        return shapes
+                if link.level > cell.level: polygons.append((((cx, cy+size), (cx-size, cy-size*0.75), (cx+size, cy-size*0.75)), arcade.color.AZURE))
+                elif link.level < cell.level: polygons.append((((cx, cy-size), (cx-size, cy+size*0.75), (cx+size, cy+size*0.75)), arcade.color.BROWN))
+        return polygons
+
+    @staticmethod
+    def make_shapes(polygons: List[Tuple[Tuple[Tuple[float, float], ...], Tuple[int, ...]]]) -> list:
+        """Triangulates (points, color) pairs into shapes. CPU only, so it may run off the window thread."""
+        return [arcade.shape_list.create_polygon(poly, color) for poly, color in polygons]
+
+    @staticmethod
+    def upload_shapes(shapes: list) -> arcade.shape_list.ShapeElementList:
+        """Batches prebuilt shapes for drawing. Touches the GL context: window thread only."""
+        shape_list = arcade.shape_list.ShapeElementList()
+        for shape in shapes: shape_list.append(shape)
+        return shape_list
+
+    def create_wall_shapes(self, level: int, scale=1.0, offset=(0,0), thickness_mult=1.0):
+        polygons = self.get_occlusion_polygons(level, scale, offset, thickness_mult)
+        return self.upload_shapes(self.make_shapes([(poly, config.WALL_COLOR) for poly in polygons]))
+
+    def create_stair_shapes(self, level: int, scale=1.0, offset=(0,0)):
+        return self.upload_shapes(self.make_shapes(self.get_stair_polygons(level, scale, offset)))
 
     def get_maze_size(self) -> Tuple[float, float]:
         R = self.cell_radius
@@ -9,14 +9,19 @@ import random
 import time
 import traceback
 import pyglet.gl as gl
-from typing import List, Tuple, Optional, Type, Iterator
-from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, Grid, Cell
+from typing import List, Tuple, Optional, Type, Iterator, Union
+from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, Grid, Cell, compact_grid_class
 from maze_algorithms import (
     RecursiveBacktracker, RandomizedPrims, AldousBroder,
     BinaryTree, Wilsons, Kruskals, Sidewinder, RecursiveDivision,
     HuntAndKill, Ellers,
-    MazeGenerator, MazeSolver, BFS_Solver, DFS_Solver, AStar_Solver
+    MazeGenerator, MazeSolver, BFS_Solver, DFS_Solver, AStar_Solver, SolverTrace,
+    BidirectionalBFS_Solver, BidirectionalAStar_Solver
 )
+from maze_analysis import DistanceFields, TreeIndex
+from maze_storage import save_grid, load_grid
+from maze_builder import MazeBuildJob, maze_rng
+from maze_cache import maze_key, shared_cache
 from renderer import MazeRenderer
 from adventure_engine import AdventureEngine
 
@@ -104,7 +109,7 @@ class ProfileSelectView(arcade.View):
             engine = AdventureEngine(self.slots[self.selection])
             params = engine.get_next_maze_params()
             game = GameView()
-            game.setup(mode="ADVENTURE", adventure_slot=self.slots[self.selection], **params)
+            game.setup(mode="ADVENTURE", adventure_slot=self.slots[self.selection], engine=engine, **params)
             self.window.show_view(game)
         elif key == arcade.key.DELETE:
             path = f"player_profile_{self.slots[self.selection]}.json"
@@ -113,6 +118,8 @@ class ProfileSelectView(arcade.View):
             self.update_ui()
 
 class CreativeMenuView(arcade.View):
+    last_seed: Optional[int] = None # Seed of the last Creative maze, for replaying it from the maze cache
+
     def __init__(self):
         super().__init__()
         self.cell_types: List[Tuple[str, Type[Grid]]] = [("Square", SquareCellGrid), ("Hexagonal", HexCellGrid), ("Triangular", TriCellGrid), ("Polar", PolarCellGrid)]
@@ -139,6 +146,8 @@ class CreativeMenuView(arcade.View):
         self.random_endpoints: bool = True
         self.explorative_map: bool = False
         self.collect_stars: bool = False
+        self.compact_storage: bool = False
+        self.replay_seed: bool = False
         self.title_text: Optional[arcade.Text] = None
         self.option_texts: List[arcade.Text] = []
 
@@ -165,13 +174,16 @@ class CreativeMenuView(arcade.View):
             f"R: Show Trace -> {'ON' if self.show_trace else 'OFF'}",
             f"X: Explorative Map -> {'ON' if self.explorative_map else 'OFF'}",
             f"S: Collect Stars -> {'ON' if self.collect_stars else 'OFF'}",
+            f"B: Grid Storage -> {'COMPACT' if self.compact_storage else 'OBJECTS'}",
+            f"K: Seed -> {'REPLAY ' + str(CreativeMenuView.last_seed) if self.replay_seed and CreativeMenuView.last_seed is not None else 'RANDOM'}",
             f"T: Theme -> {config.CURRENT_THEME_NAME.upper()}",
+            f"O: Open Saved Maze -> {'AVAILABLE' if os.path.exists(config.SAVE_FILE) else 'NONE'}",
             "", "PRESS ENTER TO START", "PRESS ESC TO BACK"
         ]
         self.option_texts = []
         for i, line in enumerate(options):
             color = config.WALL_COLOR if ":" in line else config.HIGHLIGHT_COLOR
-            self.option_texts.append(arcade.Text(line, cw, ch + 130 - (i * 32), color, font_size=16, anchor_x="center"))
+            self.option_texts.append(arcade.Text(line, cw, ch + 130 - (i * 30), color, font_size=16, anchor_x="center"))
 
     def on_draw(self):
         try:
@@ -193,9 +205,12 @@ class CreativeMenuView(arcade.View):
         elif key == arcade.key.R: self.show_trace = not self.show_trace
         elif key == arcade.key.X: self.explorative_map = not self.explorative_map
         elif key == arcade.key.S: self.collect_stars = not self.collect_stars
+        elif key == arcade.key.B: self.compact_storage = not self.compact_storage
+        elif key == arcade.key.K: self.replay_seed = not self.replay_seed
         elif key == arcade.key.T:
             config.apply_theme("light" if config.CURRENT_THEME_NAME == "dark" else "dark")
             arcade.set_background_color(config.BG_COLOR); self.setup_ui()
+        elif key == arcade.key.O: self.load_game(); changed = False
         elif key == arcade.key.ENTER: self.start_game(); changed = False
         elif key == arcade.key.ESCAPE: self.window.show_view(MainMenuView()); changed = False
         else: changed = False
@@ -203,9 +218,21 @@ class CreativeMenuView(arcade.View):
 
     def start_game(self):
         game = GameView(); mode = "CREATIVE"
-        _, GridClass = self.cell_types[self.cell_idx]; shape = self.shapes[self.shape_idx]; _, rows, cols = self.sizes[self.size_idx]
+        _, GridClass = self.cell_types[self.cell_idx]
+        if self.compact_storage: GridClass = compact_grid_class(GridClass)
+        shape = self.shapes[self.shape_idx]; _, rows, cols = self.sizes[self.size_idx]
         gen_name, GenClass = self.generators[self.gen_idx]
-        game.setup(GridClass, shape, rows, cols, self.levels, GenClass(), gen_name, self.animate, 0.5 if self.multi_path else 0.0, self.show_trace, self.random_endpoints, mode=mode, explorative_map=self.explorative_map, collect_stars=self.collect_stars)
+        seed = CreativeMenuView.last_seed if self.replay_seed and CreativeMenuView.last_seed is not None else random.getrandbits(32)
+        CreativeMenuView.last_seed = seed
+        game.setup(GridClass, shape, rows, cols, self.levels, GenClass(seed), gen_name, self.animate, 0.5 if self.multi_path else 0.0, self.show_trace, self.random_endpoints, mode=mode, explorative_map=self.explorative_map, collect_stars=self.collect_stars, seed=seed)
+        self.window.show_view(game)
+
+    def load_game(self):
+        if not os.path.exists(config.SAVE_FILE): return
+        try: grid = load_grid(config.SAVE_FILE)
+        except (OSError, ValueError): traceback.print_exc(); return
+        game = GameView()
+        game.setup(type(grid), grid.shape, grid.rows, grid.columns, grid.levels, None, "Saved Maze", False, 0.0, self.show_trace, self.random_endpoints, mode="CREATIVE", grid=grid, explorative_map=self.explorative_map, collect_stars=self.collect_stars)
         self.window.show_view(game)
 
 class GameView(arcade.View):
@@ -220,9 +247,10 @@ class GameView(arcade.View):
         self.current_level: int = 0; self.braid_pct: float = 0.0
         self.path_history: List[Tuple[Tuple[int, int], int]] = []; self.show_trace: bool = True
         self.current_solver_idx: int = 0
-        self.solvers: List[Tuple[MazeSolver, str, Tuple[int, int, int]]] = [(BFS_Solver(), "BFS", config.COLOR_SOL_BFS), (DFS_Solver(), "DFS", config.COLOR_SOL_DFS), (AStar_Solver(), "A*", config.COLOR_SOL_ASTAR)]
+        self.solvers: List[Tuple[MazeSolver, str, Tuple[int, int, int]]] = [(BFS_Solver(), "BFS", config.COLOR_SOL_BFS), (DFS_Solver(), "DFS", config.COLOR_SOL_DFS), (AStar_Solver(), "A*", config.COLOR_SOL_ASTAR), (BidirectionalBFS_Solver(), "Bi-BFS", config.COLOR_SOL_BIBFS), (BidirectionalAStar_Solver(), "Bi-A*", config.COLOR_SOL_BIASTAR)]
         self.solution_path: List[Tuple[int, int, int]] = []; self.show_solution: bool = False; self.solving: bool = False
-        self.sol_iterator: Optional[Iterator] = None; self.gen_iterator: Optional[Iterator] = None; self.generating: bool = False
+        self.sol_iterator: Optional[SolverTrace] = None; self.fields: Optional[Union[DistanceFields, TreeIndex]] = None; self.gen_iterator: Optional[Iterator] = None; self.generating: bool = False
+        self.build_job: Optional[MazeBuildJob] = None; self.build_failed: bool = False; self.cache_key = None
         self.hud_text_1: Optional[arcade.Text] = None; self.hud_text_2: Optional[arcade.Text] = None; self.hud_stats: Optional[arcade.Text] = None
         self.status_text: Optional[arcade.Text] = None; self.stair_prompt: Optional[arcade.Text] = None
         self.current_stair_options: List[Tuple[int, str]] = []; self.top_margin: int = 80; self.bottom_margin: int = 60
@@ -234,42 +262,54 @@ class GameView(arcade.View):
         self.start_pos: Tuple[int, int, int] = (0,0,0); self.end_pos: Tuple[int, int, int] = (0,0,0)
         self.step_count: int = 0; self.start_time: float = 0; self.solve_duration: float = 0
         self.mode: str = "CREATIVE"; self.used_solution: bool = False; self.used_map: bool = False
+        self.seed: Optional[int] = None; self.layout_rng: random.Random = random.Random()
         self.explorative_map: bool = False; self.collect_stars: bool = False
         self.stars: List[Cell] = []; self.stars_collected: set = set()
-        self.adventure_slot: int = 1
+        self.adventure_slot: int = 1; self.engine: Optional[AdventureEngine] = None
         self.maze_camera = arcade.camera.Camera2D(); self.gui_camera = arcade.camera.Camera2D()
         self.map_camera = arcade.camera.Camera2D()
         self.panning_keys = set()
 
-    def setup(self, GridClass: Type[Grid], shape: str, rows: int, cols: int, levels: int, generator: MazeGenerator, gen_name: str, animate: bool, braid_pct: float, show_trace: bool, random_endpoints: bool, mode: str = "CREATIVE", **kwargs):
-        self.gen_name, self.braid_pct, self.grid, self.mode = gen_name, braid_pct, GridClass(rows, cols, levels), mode
-        self.used_solution, self.used_map = False, False
+    def setup(self, GridClass: Type[Grid], shape: str, rows: int, cols: int, levels: int, generator: Optional[MazeGenerator], gen_name: str, animate: bool, braid_pct: float, show_trace: bool, random_endpoints: bool, mode: str = "CREATIVE", **kwargs):
+        # A prebuilt grid (e.g. a loaded maze file) skips masking and generation
+        prebuilt: Optional[Grid] = kwargs.get("grid")
+        self.gen_name, self.braid_pct, self.mode = gen_name, braid_pct, mode
+        self.grid = prebuilt if prebuilt is not None else GridClass(rows, cols, levels)
+        # The seed names the maze: `generator` must be seeded with it; braiding and layout get their own streams
+        self.seed = kwargs.get("seed", getattr(prebuilt, "seed", None))
+        if self.seed is None: self.seed = random.getrandbits(32)
+        if prebuilt is None: self.grid.seed = self.seed
+        self.layout_rng = maze_rng(self.seed, "layout")
+        self.fields = DistanceFields(self.grid)
+        self.engine = kwargs.get("engine")
+        self.used_solution, self.used_map, self.build_failed = False, False, False
         self.adventure_slot = kwargs.get("adventure_slot", 1)
         self.explorative_map = kwargs.get("explorative_map", False)
         self.collect_stars = kwargs.get("collect_stars", False)
         self.stars, self.stars_collected = [], set()
         self.show_fov = kwargs.get("dark_mode", False)
         self.fov_radius_cells = kwargs.get("fov_radius", 6.0)
-        self.grid.mask_shape(shape)
-        rad = 45; gtype = "hex" if GridClass == HexCellGrid else ("tri" if GridClass == TriCellGrid else ("polar" if GridClass == PolarCellGrid else "rect"))
-        self.renderer = MazeRenderer(self.grid, rad, gtype, self.top_margin, self.bottom_margin)
+        if prebuilt is None: self.grid.mask_shape(shape)
+        # Names the maze in the maze cache; loaded grids are not cached
+        self.cache_key = maze_key(self.grid, generator, braid_pct, self.seed) if prebuilt is None and generator is not None else None
+        rad = 45; gtype = self.grid.topology
+        self.renderer = kwargs.get("renderer") or self.make_renderer(self.grid)
         self.show_trace, self.current_level, self.path_history, self.solution_path, self.show_map, self.game_won = show_trace, 0, [], [], False, False
         self.cells_visited, self.player_list, self.grid_shapes, self.step_count = set(), arcade.SpriteList(), arcade.shape_list.ShapeElementList(), 0
-        for cell in self.grid.each_cell():
-            if cell.level == 0:
-                cx, cy = self.renderer.get_pixel(cell.row, cell.column)
-                if gtype == "hex": pts = [(cx + rad*math.cos(math.radians(a)), cy + rad*math.sin(math.radians(a))) for a in [30, 90, 150, 210, 270, 330]]
-                elif gtype == "tri": pts = self.renderer.get_tri_verts(cell.row, cell.column, cx, cy, rad)
-                else: pts = [(cx-rad, cy-rad), (cx+rad, cy-rad), (cx+rad, cy+rad), (cx-rad, cy+rad)]
-                self.grid_shapes.append(arcade.shape_list.create_line_loop(pts, (60, 60, 60), 1))
-        self.setup_ui_text(); valid_cells = list(self.grid.each_cell())
-        if valid_cells:
+        for cell in self.grid.each_cell_in_level(0):
+            cx, cy = self.renderer.get_pixel(cell.row, cell.column)
+            if gtype == "hex": pts = [(cx + rad*math.cos(math.radians(a)), cy + rad*math.sin(math.radians(a))) for a in [30, 90, 150, 210, 270, 330]]
+            elif gtype == "tri": pts = self.renderer.get_tri_verts(cell.row, cell.column, cx, cy, rad)
+            else: pts = [(cx-rad, cy-rad), (cx+rad, cy-rad), (cx+rad, cy+rad), (cx-rad, cy+rad)]
+            self.grid_shapes.append(arcade.shape_list.create_line_loop(pts, (60, 60, 60), 1))
+        self.setup_ui_text()
+        if self.grid.size():
             if random_endpoints:
-                s_c = random.choice(valid_cells); e_c = random.choice(valid_cells)
-                while e_c == s_c and len(valid_cells)>1: e_c = random.choice(valid_cells)
+                s_c = self.grid.random_cell(self.layout_rng); e_c = self.grid.random_cell(self.layout_rng)
+                while e_c == s_c and self.grid.size()>1: e_c = self.grid.random_cell(self.layout_rng)
                 self.start_pos, self.end_pos = (s_c.row, s_c.column, s_c.level), (e_c.row, e_c.column, e_c.level)
             else:
-                valid_cells.sort(key=lambda c: (c.level, c.row, c.column))
+                valid_cells = sorted(self.grid.each_cell(), key=lambda c: (c.level, c.row, c.column))
                 s_c, e_c = valid_cells[0], valid_cells[-1]; self.start_pos, self.end_pos = (s_c.row, s_c.column, s_c.level), (e_c.row, e_c.column, e_c.level)
         gx, gy = self.renderer.get_pixel(self.grid.rows//2, self.grid.columns//2); self.maze_camera.position = (gx, gy)
         
@@ -279,8 +319,19 @@ class GameView(arcade.View):
         avail_h = (config.SCREEN_HEIGHT - self.top_margin - self.bottom_margin) * 0.9
         self.maze_camera.zoom = min(avail_w / maze_w, avail_h / maze_h, 1.5)
         
-        if animate: self.generating, self.gen_iterator = True, generator.generate_step(self.grid)
-        else: generator.generate(self.grid); self.finish_generation()
+        if kwargs.get("build_job"): self.generating, self.build_job = False, kwargs["build_job"] # Prefetched, maybe still running
+        elif animate and prebuilt is None: self.generating, self.gen_iterator = True, generator.generate_step(self.grid)
+        else: self.start_build(None if prebuilt is not None else generator)
+
+    def make_renderer(self, grid: Grid) -> MazeRenderer:
+        return MazeRenderer(grid, 45, grid.topology, self.top_margin, self.bottom_margin)
+
+    def maze_difficulty(self) -> int:
+        """Granular difficulty of this maze for the learning model."""
+        base_diff = (self.grid.rows * self.grid.columns * self.grid.levels) / 100.0
+        if self.show_fov: base_diff *= 1.5
+        if self.explorative_map: base_diff *= 1.3
+        return int(base_diff)
 
     def setup_ui_text(self):
         self.hud_text_1 = arcade.Text("", 20, config.SCREEN_HEIGHT-25, config.TEXT_COLOR, font_size=12, bold=True)
@@ -302,29 +353,46 @@ class GameView(arcade.View):
         if instant: self.maze_camera.position = (self.player_sprite.center_x, self.player_sprite.center_y)
         else: cx, cy = self.maze_camera.position; self.maze_camera.position = (cx+(self.player_sprite.center_x-cx)*0.1, cy+(self.player_sprite.center_y-cy)*0.1)
 
+    def on_hide_view(self):
+        if self.build_job: self.build_job.cancel(); self.build_job = None
+
+    def start_build(self, generator: Optional[MazeGenerator] = None):
+        """Generates (if given a generator), braids and builds geometry on a worker thread."""
+        self.generating = False
+        self.build_job = MazeBuildJob(self.grid, self.renderer, generator, self.braid_pct, self.grid.seed, shared_cache(), self.cache_key).start()
+
     def finish_generation(self):
+        """Uploads the finished job's polygons and places the player, stars and timer."""
+        job, self.build_job = self.build_job, None
         try:
-            if self.braid_pct > 0: self.grid.braid(self.braid_pct)
-            self.generating = False; self.wall_shapes_layers = [self.renderer.create_wall_shapes(l) for l in range(self.grid.levels)]
-            self.stair_shapes_layers = [self.renderer.create_stair_shapes(l) for l in range(self.grid.levels)]; self.generate_map_shapes()
-            
+            if job.error:
+                # Nothing to play: say why and leave only ESC active
+                self.build_failed = True
+                if self.status_text: self.status_text.text = f"GENERATION FAILED: {job.error} | ESC: Back"
+                return
+            upload = self.renderer.upload_shapes
+            self.wall_shapes_layers = [upload(shapes) for shapes in job.walls]
+            self.stair_shapes_layers = [upload(shapes) for shapes in job.stairs]
+            self.map_wall_shapes = [upload(shapes) for shapes in job.map_walls]
+            self.map_stair_shapes = [upload(shapes) for shapes in job.map_stairs]
+            self.fit_map_camera()
+            self.fields = job.index or self.fields
+
             if self.collect_stars:
                 potential = [c for c in self.grid.each_cell() if (c.row, c.column, c.level) not in [self.start_pos, self.end_pos]]
-                if len(potential) >= 3: self.stars = random.sample(potential, 3)
+                if len(potential) >= 3: self.stars = self.layout_rng.sample(potential, 3)
                 else: self.stars = potential
 
             sr, sc, sl = self.start_pos; self.player_cell = self.grid.get_cell(sr, sc, sl); px, py = self.renderer.get_pixel(sr, sc)
             self.player_sprite = arcade.Sprite(); self.player_sprite.texture = arcade.make_circle_texture(int(self.renderer.cell_radius*0.6), config.PLAYER_COLOR)
             self.player_sprite.center_x, self.player_sprite.center_y = px, py; self.player_list.append(self.player_sprite)
             self.target_pos, self.path_history, self.start_time, self.cells_visited = (px, py), [((sr, sc), sl)], time.time(), set([(sr, sc, sl)]); self.update_hud(); self.scroll_to_player(True)
+            # Build the likely next maze while this one is played
+            if self.mode == "ADVENTURE" and self.engine: self.engine.start_prefetch(self.maze_difficulty(), len(self.stars), self.make_renderer)
         except Exception: traceback.print_exc()
 
-    def generate_map_shapes(self):
+    def fit_map_camera(self):
         mw, mh = self.renderer.get_maze_size()
-        # Stack levels vertically with a gap
-        self.map_wall_shapes = [self.renderer.create_wall_shapes(l, offset=(0, l * mh * 1.5), thickness_mult=0.6) for l in range(self.grid.levels)]
-        self.map_stair_shapes = [self.renderer.create_stair_shapes(l, offset=(0, l * mh * 1.5)) for l in range(self.grid.levels)]
-        
         # Calculate initial zoom to fit the whole stack
         total_h = self.grid.levels * mh * 1.5
         self.map_camera.zoom = min(config.SCREEN_WIDTH / (mw * 1.2), config.SCREEN_HEIGHT / (total_h * 1.2))
@@ -368,9 +436,7 @@ class GameView(arcade.View):
             
             if self.show_solution and self.solution_path:
                 pts = [self.renderer.get_pixel(r,c,1.0,off) for r,c,lv in self.solution_path if lv==l]
-                if len(pts)>1: 
-                    sol_colors = [config.COLOR_SOL_BFS, config.COLOR_SOL_DFS, config.COLOR_SOL_ASTAR]
-                    arcade.draw_line_strip(pts, sol_colors[self.current_solver_idx], 3)
+                if len(pts)>1: arcade.draw_line_strip(pts, self.solution_style()[1], 3)
             
             if self.show_trace and len(self.path_history)>1:
                 pts = [self.renderer.get_pixel(r,c,1.0,off) for (r,c),lv in self.path_history if lv==l]
@@ -394,6 +460,13 @@ class GameView(arcade.View):
         arcade.draw_text("EXPLODED ARCHITECTURAL VIEW", config.SCREEN_WIDTH/2, config.SCREEN_HEIGHT-40, config.HIGHLIGHT_COLOR, font_size=20, anchor_x="center", bold=True)
         self._draw_map_legend()
 
+    def solution_style(self) -> Tuple[str, Tuple[int, int, int]]:
+        """Legend label and colour of the shown path. The star route comes from the distance
+        fields whichever solver is selected, so it has its own colour instead of the solver's."""
+        if hasattr(self, '_multi_sol_shown'): return "OPTIMAL ROUTE", config.COLOR_SOL_ROUTE
+        sol_colors = [config.COLOR_SOL_BFS, config.COLOR_SOL_DFS, config.COLOR_SOL_ASTAR, config.COLOR_SOL_BIBFS, config.COLOR_SOL_BIASTAR]
+        return "SOLUTION", sol_colors[self.current_solver_idx]
+
     def _draw_map_legend(self):
         lx, ly = 30, 150
         legend_items = [
@@ -402,7 +475,7 @@ class GameView(arcade.View):
             ("GOAL", config.GOAL_COLOR, "circle"),
             ("STAR", arcade.color.GOLD, "star"),
             ("TRACE", config.PATH_TRACE_COLOR, "line"),
-            ("SOLUTION", self.solvers[self.current_solver_idx][2], "line"),
+            (*self.solution_style(), "line"),
             (f"FOG: {'ACTIVE' if self.explorative_map else 'OFF'}", arcade.color.GRAY, "rect")
         ]
         arcade.draw_rect_filled(arcade.LBWH(lx-10, ly-10, 150, len(legend_items)*25 + 15), config.BG_COLOR + (180,))
@@ -440,7 +513,8 @@ class GameView(arcade.View):
             if self.show_map: self.gui_camera.use(); self.draw_map_overlay(); return
             self.maze_camera.use()
             
-            if self.generating:
+            if self.build_job: self.grid_shapes.draw() # The worker owns the grid until it is done
+            elif self.generating:
                 self.grid_shapes.draw()
                 for cell in self.grid.each_cell():
                     cx, cy = self.renderer.get_pixel(cell.row, cell.column)
@@ -491,7 +565,7 @@ class GameView(arcade.View):
                 self.player_list.draw()
             
             self.gui_camera.use()
-            if self.generating: 
+            if self.generating or self.build_job or self.build_failed:
                 if self.status_text: self.status_text.draw()
             else:
                 hud_bg = config.BG_COLOR + (180,)
@@ -508,21 +582,24 @@ class GameView(arcade.View):
         """Helper to draw paths and solutions."""
         if self.show_solution and self.solution_path:
             pts = [self.renderer.get_pixel(r,c) for r,c,lv in self.solution_path if lv==self.current_level]
-            if len(pts)>1: 
-                sol_colors = [config.COLOR_SOL_BFS, config.COLOR_SOL_DFS, config.COLOR_SOL_ASTAR]
-                arcade.draw_line_strip(pts, sol_colors[self.current_solver_idx], 4)
+            if len(pts)>1: arcade.draw_line_strip(pts, self.solution_style()[1], 4)
         if self.show_trace and len(self.path_history)>1:
             pts = [self.renderer.get_pixel(r,c) for (r,c),lv in self.path_history if lv==self.current_level]
             if len(pts)>1: arcade.draw_line_strip(pts, config.PATH_TRACE_COLOR, 2)
 
     def on_update(self, delta_time: float):
         try:
+            if self.build_failed: return
+            if self.build_job:
+                if self.build_job.done: self.finish_generation()
+                elif self.status_text: self.status_text.text = f"{self.build_job.stage}... {int(self.build_job.progress * 100)}%"
+                return
             if self.generating:
                 try: 
                     # Adaptive generation speed based on grid size
                     steps_per_frame = max(50, self.grid.size() // 100)
                     for _ in range(steps_per_frame): next(self.gen_iterator)
-                except (StopIteration, TypeError): self.finish_generation()
+                except (StopIteration, TypeError): self.start_build()
                 self.scroll_to_player(); return
             self.scroll_to_player()
             if self.game_won: return
@@ -547,9 +624,15 @@ class GameView(arcade.View):
                 self.map_camera.position = (cx + dx, cy + dy)
 
             if self.solving and self.sol_iterator:
-                try: 
-                    for _ in range(5): self.solution_path = next(self.sol_iterator)
-                except StopIteration: self.solving = False
+                self.solving = self.sol_iterator.advance(5)
+                self.solution_path = self.sol_iterator.path
+            elif self.show_solution and self.player_cell and self.solution_path and not hasattr(self, '_multi_sol_shown') \
+                    and self.solution_path[0] != (self.player_cell.row, self.player_cell.column, self.player_cell.level):
+                solver, goal = self.solvers[self.current_solver_idx][0], self.grid.get_cell(*self.end_pos)
+                # A shortest path follows the player with a walk up the goal-rooted field instead of a new search;
+                # any other solver's path is its own, so it searches again from the player
+                if solver.optimal: self.solution_path = self.fields.path(self.player_cell, goal)
+                else: self.solving, self.sol_iterator = True, SolverTrace(solver.solve_step(self.grid, self.player_cell, goal))
             if self.player_sprite and self.target_pos:
                 dx, dy = self.target_pos[0]-self.player_sprite.center_x, self.target_pos[1]-self.player_sprite.center_y
                 self.player_sprite.center_x += dx*0.4; self.player_sprite.center_y += dy*0.4
@@ -576,7 +659,9 @@ class GameView(arcade.View):
         except Exception: traceback.print_exc()
 
     def on_key_press(self, key: int, modifiers: int):
-        if self.generating or (self.game_won and key != arcade.key.ENTER): return
+        if (self.build_job or self.build_failed) and key == arcade.key.ESCAPE:
+            self.window.show_view(ProfileSelectView() if self.mode == "ADVENTURE" else CreativeMenuView()); return
+        if self.generating or self.build_job or self.build_failed or (self.game_won and key != arcade.key.ENTER): return
         
         # Track panning keys
         if key in [arcade.key.W, arcade.key.S, arcade.key.A, arcade.key.D, arcade.key.UP, arcade.key.DOWN, arcade.key.LEFT, arcade.key.RIGHT]:
@@ -584,20 +669,19 @@ class GameView(arcade.View):
 
         if self.game_won and key == arcade.key.ENTER:
             if self.mode == "ADVENTURE":
-                engine = AdventureEngine(self.adventure_slot)
-                # Calculate granular difficulty for the learning model
-                base_diff = (self.grid.rows * self.grid.columns * self.grid.levels) / 100.0
-                if self.show_fov: base_diff *= 1.5
-                if self.explorative_map: base_diff *= 1.3
-                engine.process_result(self.solve_duration, self.step_count, self.used_solution, self.used_map, int(base_diff), len(self.stars_collected))
-                params = engine.get_next_maze_params(); game = GameView(); game.setup(mode="ADVENTURE", adventure_slot=self.adventure_slot, **params); self.window.show_view(game)
+                engine = self.engine or AdventureEngine(self.adventure_slot)
+                shortest = self.fields.distance(self.grid.get_cell(*self.start_pos), self.grid.get_cell(*self.end_pos))
+                engine.process_result(self.solve_duration, self.step_count, self.used_solution, self.used_map, self.maze_difficulty(), len(self.stars_collected), shortest)
+                # Reuses the prefetched maze when the updated profile still asks for it
+                params = engine.get_next_maze_params(); game = GameView(); game.setup(mode="ADVENTURE", adventure_slot=self.adventure_slot, engine=engine, **params); self.window.show_view(game)
             else: self.window.show_view(CreativeMenuView())
             return
         
         # Reset Logic
         if key == arcade.key.BACKSPACE:
             if self.mode == "ADVENTURE":
-                engine = AdventureEngine(self.adventure_slot)
+                engine = self.engine or AdventureEngine(self.adventure_slot)
+                engine.discard_prefetch()
                 loss = engine.process_reset()
                 # Could add a popup text here, but simple reset for now
             self.window.show_view(MainMenuView()) # return to main menu or restart level?
@@ -611,10 +695,10 @@ class GameView(arcade.View):
             # Tiered Solution Logic
             if not self.show_solution:
                 self.show_solution = True; self.used_solution = True
-                self.solving, self.sol_iterator = True, self.solvers[self.current_solver_idx][0].solve_step(self.grid, self.player_cell, self.grid.get_cell(*self.end_pos))
+                self.solving, self.sol_iterator = True, SolverTrace(self.solvers[self.current_solver_idx][0].solve_step(self.grid, self.player_cell, self.grid.get_cell(*self.end_pos)))
             elif self.collect_stars and len(self.stars_collected) < len(self.stars) and not hasattr(self, '_multi_sol_shown'):
-                # Second press: Multi-target solution
-                self.solving, self.sol_iterator = True, self.solvers[self.current_solver_idx][0].solve_multi(self.grid, self.player_cell, [s for s in self.stars if s not in self.stars_collected], self.grid.get_cell(*self.end_pos))
+                # Second press: the optimal route through the remaining stars, the same for every solver
+                self.solving, self.sol_iterator = True, SolverTrace(MazeSolver().solve_multi(self.grid, self.player_cell, [s for s in self.stars if s not in self.stars_collected], self.grid.get_cell(*self.end_pos), self.fields))
                 self._multi_sol_shown = True
             else:
                 self.show_solution = False; self.solving = False
@@ -624,7 +708,7 @@ class GameView(arcade.View):
         if self.show_map:
             if key in [arcade.key.EQUAL, arcade.key.PLUS]: self.map_camera.zoom = min(self.map_camera.zoom + 0.05, 2.0)
             elif key == arcade.key.MINUS: self.map_camera.zoom = max(self.map_camera.zoom - 0.05, 0.05)
-            elif key in [arcade.key.KEY_0, arcade.key.NUM_0]: self.generate_map_shapes() # Reset to auto-fit
+            elif key in [arcade.key.KEY_0, arcade.key.NUM_0]: self.fit_map_camera() # Reset to auto-fit
             return
         if key in [arcade.key.EQUAL, arcade.key.PLUS]: self.maze_camera.zoom = min(self.maze_camera.zoom + 0.1, 3.0); self.update_hud()
         elif key == arcade.key.MINUS: self.maze_camera.zoom = max(self.maze_camera.zoom - 0.1, 0.1); self.update_hud()
@@ -649,9 +733,15 @@ class GameView(arcade.View):
                     if target and self.player_cell.is_linked(target): self.player_cell = target; px, py = self.renderer.get_pixel(target.row, target.column); self.player_sprite.center_x, self.player_sprite.center_y = px, py; self.target_pos = (px, py); self.step_count += 1; self.update_hud(); break
         elif key == arcade.key.TAB:
             self.current_solver_idx = (self.current_solver_idx + 1) % len(self.solvers); self.update_hud()
-            if self.show_solution and self.grid: self.solving, self.sol_iterator = True, self.solvers[self.current_solver_idx][0].solve_step(self.grid, self.player_cell, self.grid.get_cell(*self.end_pos))
+            if hasattr(self, '_multi_sol_shown'): del self._multi_sol_shown  # back to the selected solver's path
+            if self.show_solution and self.grid: self.solving, self.sol_iterator = True, SolverTrace(self.solvers[self.current_solver_idx][0].solve_step(self.grid, self.player_cell, self.grid.get_cell(*self.end_pos)))
         elif key == arcade.key.P: arcade.get_image().save("maze_export.png")
-        elif key == arcade.key.ESCAPE: self.window.show_view(ProfileSelectView() if self.mode == "ADVENTURE" else CreativeMenuView())
+        elif key == arcade.key.F5:
+            try: save_grid(self.grid, config.SAVE_FILE, compress=True)
+            except OSError: traceback.print_exc()
+        elif key == arcade.key.ESCAPE:
+            if self.engine: self.engine.discard_prefetch()
+            self.window.show_view(ProfileSelectView() if self.mode == "ADVENTURE" else CreativeMenuView())
 
     def on_key_release(self, key: int, modifiers: int):
         if key in self.panning_keys:
@@ -0,0 +1,96 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+from renderer import MazeRenderer
+from adventure_engine import AdventureEngine
+from maze_cache import MazeCache
+
+def make_renderer(grid):
+    return MazeRenderer(grid, 45, grid.topology, 80, 60)
+
+class TestAdventurePrefetch(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.cache = patch("maze_cache._shared", MazeCache())  # memory only
+        self.cache.start()
+        self.engine = AdventureEngine(1)
+        self.engine.data["skill_profile"] = {"spatial": 6.0, "perception": 1.0, "structural": 9.0, "efficiency": 2.0, "collection": 1.0}
+
+    def tearDown(self):
+        self.engine.discard_prefetch()
+        self.cache.stop()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_score_run_is_pure(self):
+        before = dict(self.engine.data["skill_profile"])
+        profile, momentum, score, exp = AdventureEngine.score_run(before, 0, 10.0, False, False, 20)
+        self.assertEqual(self.engine.data["skill_profile"], before)
+        self.engine.process_result(10.0, 50, False, False, 20)
+        self.assertEqual(self.engine.data["skill_profile"], profile)
+        self.assertEqual(self.engine.data["momentum"], momentum)
+        self.assertTrue(os.path.exists(self.engine.profile_path))
+
+    def test_par_run_claims_prefetch(self):
+        job = self.engine.start_prefetch(20, 0, make_renderer)
+        self.assertTrue(job.wait(30))
+        self.engine.process_result(20 / 10.0 * 15.0, 50, False, False, 20)  # a par run
+        params = self.engine.get_next_maze_params()
+        self.assertIs(params["build_job"], job)
+        self.assertIs(params["grid"], job.grid)
+        self.assertIsInstance(params["grid"], params["GridClass"])
+        self.assertEqual((job.grid.rows, job.grid.columns), (params["rows"], params["cols"]))
+        self.assertEqual(job.grid.seed, params["seed"])  # the prefetched maze keeps its own seed
+        self.assertIsNone(self.engine.prefetch)
+
+    def test_grid_is_built_on_worker(self):
+        threads = []
+        def recording_renderer(grid):
+            threads.append(threading.current_thread())
+            return make_renderer(grid)
+        job = self.engine.start_prefetch(20, 0, recording_renderer)
+        self.engine.process_result(20 / 10.0 * 15.0, 50, False, False, 20)
+        params = self.engine.get_next_maze_params()  # claimed at once: waits for the grid, not the maze
+        self.assertIsNotNone(params["grid"])
+        self.assertIs(params["renderer"], job.renderer)
+        self.assertEqual(params["grid"].shape, params["shape"])
+        self.assertIsNotNone(params["grid"]._active_index)  # indexed on the worker, not lazily by the window
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertTrue(job.wait(30))
+
+    def test_slow_grid_is_not_waited_for(self):
+        release = threading.Event()
+        def slow_renderer(grid):
+            release.wait(30)
+            return make_renderer(grid)
+        job = self.engine.start_prefetch(20, 0, slow_renderer)
+        self.engine.process_result(20 / 10.0 * 15.0, 50, False, False, 20)
+        with patch("config.PREFETCH_WAIT", 0.05):
+            params = self.engine.get_next_maze_params()  # the window thread gives up and builds afresh
+        self.assertNotIn("grid", params)
+        self.assertIsNone(self.engine.prefetch)
+        release.set()
+        self.assertTrue(job.wait(30))
+        self.assertEqual(job.stage, "CANCELLED")
+
+    def test_mismatch_is_discarded(self):
+        job = self.engine.start_prefetch(20, 0, make_renderer)
+        self.engine.process_result(300.0, 500, True, True, 20)  # a struggle shrinks the profile
+        params = self.engine.get_next_maze_params()
+        self.assertNotIn("grid", params)
+        self.assertIsNone(self.engine.prefetch)
+        self.assertTrue(job.wait(30))
+        self.assertIn(job.stage, ("CANCELLED", "DONE"))
+
+if __name__ == '__main__':
+    unittest.main()
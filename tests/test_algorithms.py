@@ -1,6 +1,7 @@
 import unittest
-from src.maze_topology import SquareCellGrid
-from src.maze_algorithms import HuntAndKill, Ellers, RecursiveBacktracker
+import random
+from src.maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, ArrayHexGrid, ArrayTriGrid, compact_grid_class
+from src.maze_algorithms import HuntAndKill, Ellers, RecursiveBacktracker, Wilsons, BFS_Solver, DFS_Solver, AStar_Solver, SolverTrace, BidirectionalBFS_Solver, BidirectionalAStar_Solver, JunctionSolver
 
 class TestAlgorithms(unittest.TestCase):
     def test_hunt_and_kill(self):
@@ -13,6 +14,59 @@ class TestAlgorithms(unittest.TestCase):
         total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
         self.assertEqual(total_links, grid.size() - 1)
 
+    def test_hunt_and_kill_topologies(self):
+        for GridClass in (HexCellGrid, TriCellGrid, PolarCellGrid):
+            grid = GridClass(7, 9, 3)
+            grid.mask_shape("circle")
+            for cell, neighbor in HuntAndKill().generate_step(grid):
+                self.assertTrue(cell.is_linked(neighbor))
+            total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
+            self.assertEqual(total_links, grid.size() - 1)
+
+    def test_seeded_generators_reproduce(self):
+        from src.maze_algorithms import RandomizedPrims, AldousBroder, BinaryTree, Kruskals, Sidewinder, RecursiveDivision
+        def links(grid):
+            return sorted(((c.row, c.column, c.level), (n.row, n.column, n.level)) for c in grid.each_cell() for n in c.get_links())
+        for Gen in (RecursiveBacktracker, RandomizedPrims, AldousBroder, BinaryTree, Wilsons, Kruskals,
+                    Sidewinder, HuntAndKill, Ellers, RecursiveDivision):
+            for GridClass in (SquareCellGrid, ArrayHexGrid):
+                mazes = []
+                for _ in range(2):
+                    state = random.getstate()
+                    grid = GridClass(6, 7, 2)
+                    Gen(7).generate(grid)
+                    grid.braid(0.5, random.Random(3))
+                    self.assertEqual(random.getstate(), state)  # the global RNG is left alone
+                    mazes.append(links(grid))
+                self.assertEqual(mazes[0], mazes[1], Gen.__name__)
+
+    def test_row_generators_follow_triangles(self):
+        from src.maze_algorithms import Sidewinder, RecursiveDivision
+        # Only every other triangle borders the row below, so south links must pick those
+        for GridClass in (TriCellGrid, ArrayTriGrid):
+            for Gen in (Sidewinder, Ellers, RecursiveDivision):
+                grid = GridClass(9, 12)
+                Gen(5).generate(grid)
+                cells = list(grid.each_cell())
+                seen, todo = {cells[0]}, [cells[0]]
+                while todo:
+                    for n in todo.pop().get_links():
+                        if n not in seen: seen.add(n); todo.append(n)
+                self.assertEqual(len(seen), len(cells), (GridClass.__name__, Gen.__name__))
+                self.assertEqual(sum(len(c.get_links()) for c in cells) // 2, len(cells) - 1)
+
+    def test_walks_match_across_backends(self):
+        from src.maze_algorithms import RandomizedPrims, AldousBroder
+        # Array grids carve on indices but must draw the same maze as Cell objects
+        for Gen in (RecursiveBacktracker, RandomizedPrims, AldousBroder, Wilsons, HuntAndKill):
+            mazes = []
+            for GridClass in (HexCellGrid, compact_grid_class(HexCellGrid)):
+                grid = GridClass(7, 8, 2)
+                grid.mask_shape("circle")
+                steps = [((a.row, a.column, a.level), (b.row, b.column, b.level)) for a, b in Gen(4).generate_step(grid)]
+                mazes.append(steps)
+            self.assertEqual(mazes[0], mazes[1], Gen.__name__)
+
     def test_ellers(self):
         grid = SquareCellGrid(5, 5)
         algo = Ellers()
@@ -20,5 +74,99 @@ class TestAlgorithms(unittest.TestCase):
         total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
         self.assertEqual(total_links, grid.size() - 1)
 
+    def test_ellers_stream_rows(self):
+        columns, rows = 9, 4000
+        parent = list(range(columns * rows))
+        def find(x):
+            while parent[x] != x: x = parent[x]
+            return x
+        edges = 0
+        for r, (east, south) in enumerate(Ellers.stream_rows(columns, rows)):
+            pairs = [(c, c + 1) for c in east] + [(c, c + columns) for c in south]
+            for a, b in pairs:
+                a, b = find(r * columns + a), find(r * columns + b)
+                self.assertNotEqual(a, b)  # no cycles
+                parent[b] = a
+                edges += 1
+        self.assertEqual(edges, columns * rows - 1)
+
+    def test_wilsons(self):
+        grid = SquareCellGrid(8, 9, 2)
+        grid.mask_shape("circle")
+        steps = list(Wilsons().generate_step(grid))
+        self.assertEqual(len(steps), grid.size() - 1)
+        for cell, nxt in steps:
+            self.assertTrue(cell.is_linked(nxt))
+        total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
+        self.assertEqual(total_links, grid.size() - 1)
+
+    def test_compact_grid_generation(self):
+        grid = ArrayHexGrid(6, 7, 2)
+        grid.mask_shape("hexagon")
+        RecursiveBacktracker().generate(grid)
+        total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
+        self.assertEqual(total_links, grid.size() - 1)
+    def test_solver_events(self):
+        grid = SquareCellGrid(9, 11, 2)
+        RecursiveBacktracker().generate(grid)
+        start, goal = grid.get_cell(0, 0, 0), grid.get_cell(8, 10, 1)
+        for solver in (BFS_Solver(), DFS_Solver(), AStar_Solver(), BidirectionalBFS_Solver(), BidirectionalAStar_Solver(), JunctionSolver()):
+            path = solver.solve(grid, start, goal)
+            self.assertEqual(path[0], (0, 0, 0))
+            self.assertEqual(path[-1], (8, 10, 1))
+            events = list(solver.solve_step(grid, start, goal))
+            self.assertTrue(all(e.kind in ("frontier", "visit") for e in events[:-1]))
+            self.assertEqual(events[-1].kind, "path")
+            self.assertEqual(events[-1].path, path)
+            # The animated trace ends on the same path, always drawn from a search root
+            trace = SolverTrace(solver.solve_step(grid, start, goal))
+            while trace.advance(5):
+                self.assertIn(trace.path[0], ((0, 0, 0), (8, 10, 1)))
+            self.assertEqual(trace.path, path)
+
+    def test_astar_heuristics_admissible(self):
+        for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+            grid = GridClass(8, 10, 3)
+            RecursiveBacktracker().generate(grid)
+            grid.braid(1.0)
+            cells = list(grid.each_cell())
+            solver = AStar_Solver()
+            for start, goal in zip(cells[::7], cells[::-5]):
+                self.assertEqual(len(solver.solve(grid, start, goal)), len(BFS_Solver().solve(grid, start, goal)))
+                # Never above the true remaining distance from anywhere
+                h, path = solver.make_heuristic(grid, goal), BFS_Solver().solve(grid, start, goal)
+                for steps_left, pos in enumerate(reversed(path)):
+                    self.assertLessEqual(h(grid.get_cell(*pos)), steps_left)
+
+    def test_optimal_solvers_find_shortest_paths(self):
+        # The game view walks the distance field instead of re-searching only for these
+        grid = HexCellGrid(9, 11, 2)
+        RecursiveBacktracker(2).generate(grid)
+        grid.braid(1.0, random.Random(2))
+        cells = list(grid.each_cell())
+        solvers = (BFS_Solver(), DFS_Solver(), AStar_Solver(), BidirectionalBFS_Solver(), BidirectionalAStar_Solver(), JunctionSolver())
+        self.assertEqual([s.optimal for s in solvers], [True, False, True, True, True, True])
+        for start, goal in zip(cells[::6], cells[::-4]):
+            expected = len(BFS_Solver().solve(grid, start, goal))
+            for solver in solvers:
+                if solver.optimal: self.assertEqual(len(solver.solve(grid, start, goal)), expected, type(solver).__name__)
+
+    def test_bidirectional_shortest(self):
+        for grid in (SquareCellGrid(9, 11, 2), HexCellGrid(8, 9), TriCellGrid(8, 12), PolarCellGrid(6, 12)):
+            RecursiveBacktracker().generate(grid)
+            grid.braid(1.0)
+            cells = list(grid.each_cell())
+            for start, goal in zip(cells[::5], cells[::-3]):
+                expected = len(BFS_Solver().solve(grid, start, goal))
+                path = BidirectionalBFS_Solver().solve(grid, start, goal)
+                self.assertEqual(len(path), expected)
+                self.assertEqual((path[0], path[-1]), ((start.row, start.column, start.level), (goal.row, goal.column, goal.level)))
+                for a, b in zip(path, path[1:]):
+                    self.assertTrue(grid.get_cell(*a).is_linked(grid.get_cell(*b)))
+                path = BidirectionalAStar_Solver().solve(grid, start, goal)
+                self.assertEqual(path[-1], (goal.row, goal.column, goal.level))
+                for a, b in zip(path, path[1:]):
+                    self.assertTrue(grid.get_cell(*a).is_linked(grid.get_cell(*b)))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
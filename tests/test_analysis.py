@@ -0,0 +1,112 @@
+import itertools
+import random
+import unittest
+from src.maze_topology import SquareCellGrid, PolarCellGrid, ArrayHexGrid
+from src.maze_algorithms import RecursiveBacktracker, BFS_Solver
+from src.maze_analysis import DistanceFields, TreeIndex, JunctionGraph, dead_end_fill, path_index, plan_route, _held_karp, _nearest_two_opt
+
+def route_length(fields, start, order, goal):
+    stops = [start] + list(order) + [goal]
+    return sum(fields.distance(a, b) for a, b in zip(stops, stops[1:]))
+
+class TestDistanceFields(unittest.TestCase):
+    def test_paths_match_bfs(self):
+        for grid in (SquareCellGrid(7, 9, 2), ArrayHexGrid(6, 8, 2)):
+            RecursiveBacktracker().generate(grid)
+            fields, solver = DistanceFields(grid), BFS_Solver()
+            goal = grid.get_cell(5, 7, 1)
+            for start in list(grid.each_cell())[::7]:
+                path = fields.path(start, goal)
+                self.assertEqual(path, solver.solve(grid, start, goal))  # perfect maze: the path is unique
+                self.assertEqual(fields.distance(start, goal), len(path) - 1)
+
+    def test_version_invalidates(self):
+        grid = SquareCellGrid(4, 4)
+        RecursiveBacktracker().generate(grid)
+        fields = DistanceFields(grid)
+        a, b = grid.get_cell(0, 0), grid.get_cell(3, 3)
+        field = fields.field(b)
+        self.assertIs(fields.field(b), field)
+        link = a.get_links()[0]
+        a.unlink(link)
+        self.assertIsNot(fields.field(b), field)
+        self.assertEqual(fields.path(a, b) == [], fields.field(b).distance(a) < 0)
+
+    def test_route_is_optimal(self):
+        grid = SquareCellGrid(10, 10, 2)
+        RecursiveBacktracker().generate(grid)
+        grid.braid(0.8)
+        fields = DistanceFields(grid)
+        cells = list(grid.each_cell())
+        for _ in range(5):
+            start, goal, *stars = random.sample(cells, 8)
+            best = min(route_length(fields, start, p, goal) for p in itertools.permutations(stars))
+            self.assertEqual(route_length(fields, start, plan_route(fields, start, stars, goal), goal), best)
+            path = list(BFS_Solver().solve_multi(grid, start, stars, goal, fields))[-1].path
+            self.assertEqual(len(path) - 1, best)
+            self.assertTrue({(s.row, s.column, s.level) for s in stars} <= set(path))
+
+    def test_two_opt_fallback(self):
+        rng = random.Random(3)
+        points = [(rng.random(), rng.random()) for _ in range(10)]
+        d = lambda a, b: abs(a[0] - b[0]) + abs(a[1] - b[1])
+        start, goal, targets = points[0], points[1], points[2:]
+        from_start = [d(start, t) for t in targets]
+        between = [[d(a, b) for b in targets] for a in targets]
+        to_goal = [d(t, goal) for t in targets]
+        cost = lambda o: from_start[o[0]] + to_goal[o[-1]] + sum(between[a][b] for a, b in zip(o, o[1:]))
+        exact, approx = _held_karp(from_start, between, to_goal), _nearest_two_opt(from_start, between, to_goal)
+        self.assertEqual(sorted(approx), list(range(len(targets))))
+        self.assertLessEqual(cost(exact), cost(approx) + 1e-9)
+        self.assertLessEqual(cost(approx), cost(exact) * 1.5)
+
+    def test_tree_index(self):
+        for grid in (SquareCellGrid(9, 12, 3), ArrayHexGrid(8, 9, 2)):
+            grid.mask_shape("circle")
+            RecursiveBacktracker().generate(grid)
+            tree, fields = TreeIndex.build(grid), DistanceFields(grid)
+            self.assertIs(path_index(grid).__class__, TreeIndex)
+            cells = list(grid.each_cell())
+            for start, goal in zip(cells[::3], cells[::-4]):
+                self.assertEqual(tree.distance(start, goal), fields.distance(start, goal))
+                self.assertEqual(tree.path(start, goal), fields.path(start, goal))
+            grid.braid(0.5)
+            self.assertIsNone(TreeIndex.build(grid))
+            self.assertIsInstance(path_index(grid), DistanceFields)
+
+    def test_tree_index_regions(self):
+        grid = SquareCellGrid(3, 4)
+        grid.get_cell(0, 0).link(grid.get_cell(0, 1))
+        grid.get_cell(2, 2).link(grid.get_cell(2, 3))
+        tree = TreeIndex.build(grid)
+        self.assertEqual(tree.distance(grid.get_cell(0, 1), grid.get_cell(0, 0)), 1)
+        self.assertEqual(tree.distance(grid.get_cell(0, 0), grid.get_cell(2, 3)), -1)
+        self.assertEqual(tree.path(grid.get_cell(1, 1), grid.get_cell(1, 1)), [(1, 1, 0)])
+
+    def test_junction_graph(self):
+        rng = random.Random(5)
+        for grid in (SquareCellGrid(8, 9, 2), PolarCellGrid(6, 10, 2), ArrayHexGrid(7, 8)):
+            RecursiveBacktracker().generate(grid)
+            grid.braid(0.5)
+            graph, fields, cells = JunctionGraph(grid), DistanceFields(grid), list(grid.each_cell())
+            self.assertLess(len(graph.adjacency), len(cells))
+            for _ in range(30):
+                start, goal = rng.choice(cells), rng.choice(cells)
+                for g in (graph, JunctionGraph(grid, keep=(start, goal))):
+                    path = g.path(start, goal)
+                    self.assertEqual(len(path) - 1, fields.distance(start, goal))
+                    self.assertEqual((path[0], path[-1]), ((start.row, start.column, start.level), (goal.row, goal.column, goal.level)))
+                    for a, b in zip(path, path[1:]):
+                        self.assertTrue(grid.get_cell(*a).is_linked(grid.get_cell(*b)))
+
+    def test_dead_end_fill_leaves_solution(self):
+        grid = SquareCellGrid(9, 9)
+        RecursiveBacktracker().generate(grid)
+        start, goal = grid.get_cell(0, 0), grid.get_cell(8, 8)
+        alive = dead_end_fill(grid, (start, goal))
+        solution = DistanceFields(grid).path(start, goal)
+        self.assertEqual(sum(alive), len(solution))
+        self.assertTrue(all(alive[r * 9 + c] for r, c, _ in solution))
+
+if __name__ == '__main__':
+    unittest.main()
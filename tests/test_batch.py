@@ -0,0 +1,38 @@
+import random
+import unittest
+from src.maze_topology import SquareCellGrid, ArrayHexGrid
+from src.maze_algorithms import RecursiveBacktracker, BFS_Solver
+from src.maze_batch import batch_solve
+
+class TestBatchSolve(unittest.TestCase):
+    def setUp(self):
+        random.seed(5)
+
+    def check(self, grid, workers):
+        RecursiveBacktracker().generate(grid)
+        grid.braid(0.5)
+        cells = list(grid.each_cell())
+        pairs = [(random.choice(cells[:6]), random.choice(cells)) for _ in range(40)]
+        result = batch_solve(grid, pairs, paths=True, workers=workers, chunk=2)
+        solver = BFS_Solver()
+        for (start, goal), length, path in zip(pairs, result.lengths, result.paths):
+            expected = solver.solve(grid, start, goal)
+            self.assertEqual(length, len(expected) - 1)
+            self.assertEqual((path[0], path[-1]), (expected[0], expected[-1]))
+            self.assertEqual(len(path), len(expected))
+
+    def test_in_process(self):
+        self.check(SquareCellGrid(8, 9, 2), workers=1)
+
+    def test_worker_pool(self):
+        self.check(ArrayHexGrid(7, 8, 2), workers=2)
+
+    def test_coordinates_and_unreachable(self):
+        grid = SquareCellGrid(3, 3)
+        grid.get_cell(0, 0).link(grid.get_cell(0, 1))
+        result = batch_solve(grid, [((0, 0, 0), (0, 1, 0)), ((0, 0, 0), (2, 2, 0))], paths=True, workers=1)
+        self.assertEqual(list(result.lengths), [1, -1])
+        self.assertEqual(result.paths, [[(0, 0, 0), (0, 1, 0)], []])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# arcade is only needed for the GPU upload, which the job never does
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+import config
+from renderer import MazeRenderer
+from maze_builder import MazeBuildJob
+from maze_topology import SquareCellGrid, ArraySquareGrid, ArrayHexGrid
+from maze_algorithms import RecursiveBacktracker, Kruskals, BinaryTree
+
+class TestMazeBuildJob(unittest.TestCase):
+    def test_builds_maze_and_geometry_off_thread(self):
+        for GridClass, gtype in ((SquareCellGrid, "rect"), (ArrayHexGrid, "hex")):
+            grid = GridClass(9, 11, 2)
+            renderer = MazeRenderer(grid, 45, gtype, 80, 60)
+            job = MazeBuildJob(grid, renderer, RecursiveBacktracker()).start()
+            self.assertTrue(job.wait(30))
+            self.assertIsNone(job.error)
+            self.assertEqual((job.stage, job.progress), ("DONE", 1.0))
+            total_links = sum(len(c.get_links()) for c in grid.each_cell()) // 2
+            self.assertEqual(total_links, grid.size() - 1)
+            for l in range(grid.levels):
+                self.assertEqual(len(job.walls[l]), len(renderer.get_occlusion_polygons(l)))
+                self.assertEqual(len(job.map_walls[l]), len(job.walls[l]))
+                self.assertEqual(len(job.stairs[l]), len(renderer.get_stair_polygons(l)))
+                self.assertEqual(len(renderer._get_segments(l)), 4 * len(job.walls[l]))  # FOV cache seeded
+            self.assertTrue(any(job.stairs))
+            self.assertEqual(type(job.index).__name__, "TreeIndex")  # unbraided: a perfect maze
+
+    def test_traces_wall_outline_for_sweep(self):
+        grid = ArrayHexGrid(6, 8, 2)
+        renderer = MazeRenderer(grid, 45, "hex", 80, 60)
+        with patch.object(config, "FOV_ENGINE", "sweep"):
+            job = MazeBuildJob(grid, renderer, RecursiveBacktracker(3)).start()
+            self.assertTrue(job.wait(30))
+        self.assertIsNone(job.error)
+        self.assertEqual(sorted(renderer._sweep_pieces), [0, 1])
+
+    def test_job_builds_the_generate_maze(self):
+        for Generator in (Kruskals, BinaryTree):
+            grid, expected = ArraySquareGrid(9, 11, 2), ArraySquareGrid(9, 11, 2)
+            job = MazeBuildJob(grid, MazeRenderer(grid, 45, "rect", 80, 60), Generator(7)).start()
+            self.assertTrue(job.wait(30))
+            Generator(7).generate(expected)
+            self.assertEqual(bytes(grid.link_bits), bytes(expected.link_bits))
+
+    def test_cancel(self):
+        grid = SquareCellGrid(60, 60, 3)
+        job = MazeBuildJob(grid, MazeRenderer(grid, 45, "rect", 80, 60), RecursiveBacktracker())
+        job.cancel()
+        job.start()
+        self.assertTrue(job.wait(30))
+        self.assertEqual(job.stage, "CANCELLED")
+        self.assertEqual(job.walls, [])
+
+if __name__ == '__main__':
+    unittest.main()
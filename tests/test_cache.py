@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+from renderer import MazeRenderer
+from maze_builder import MazeBuildJob
+from maze_cache import MazeCache, maze_key
+from maze_topology import SquareCellGrid, ArrayHexGrid, PolarCellGrid
+from maze_algorithms import RecursiveBacktracker, Kruskals
+from maze_vectorized import HAVE_NUMPY
+
+def links(grid):
+    return sorted((c.row, c.column, c.level, n.row, n.column, n.level) for c in grid.each_cell() for n in c.get_links())
+
+def build(GridClass, gtype, cache, seed=11, braid=0.3):
+    grid = GridClass(7, 9, 2)
+    grid.mask_shape("circle")
+    generator = RecursiveBacktracker(seed)
+    job = MazeBuildJob(grid, MazeRenderer(grid, 45, gtype, 80, 60), generator, braid, seed,
+                       cache, maze_key(grid, generator, braid, seed)).start()
+    assert job.wait(30) and job.error is None
+    return job
+
+class TestMazeCache(unittest.TestCase):
+    def test_hit_rebuilds_same_maze_and_geometry(self):
+        for GridClass, gtype in ((SquareCellGrid, "rect"), (ArrayHexGrid, "hex"), (PolarCellGrid, "polar")):
+            cache = MazeCache()
+            first = build(GridClass, gtype, cache)
+            second = build(GridClass, gtype, cache)
+            self.assertIsNone(first.cached)
+            self.assertIsNotNone(second.cached)
+            self.assertEqual(cache.stats()["hits"], 1)
+            self.assertEqual(cache.stats()["misses"], 1)
+            self.assertEqual(links(second.grid), links(first.grid))
+            for l in range(2):
+                self.assertEqual(second.renderer._get_segments(l), first.renderer._get_segments(l))
+                self.assertEqual(second.renderer._spatial_segments[l], first.renderer._spatial_segments[l])
+                self.assertEqual(len(second.walls[l]), len(first.walls[l]))
+                self.assertEqual(len(second.map_walls[l]), len(first.map_walls[l]))
+
+    def test_lru_and_disk_tier(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MazeCache(capacity=2, directory=tmp)
+            jobs = [build(SquareCellGrid, "rect", cache, seed) for seed in (1, 2, 3)]
+            self.assertEqual(cache.stats()["evictions"], 1)  # seed 1 fell out of memory
+            self.assertEqual(len(os.listdir(tmp)), 3)
+            cold = MazeCache(capacity=2, directory=tmp)  # a fresh process: disk only
+            again = build(SquareCellGrid, "rect", cold, 1)
+            self.assertEqual(cold.stats()["disk_hits"], 1)
+            self.assertEqual(links(again.grid), links(jobs[0].grid))
+            build(SquareCellGrid, "rect", cold, 1)
+            self.assertEqual(cold.stats()["hits"], 1)
+
+            sizes = sorted(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+            capped = MazeCache(capacity=2, directory=tmp, max_bytes=sum(sizes[-2:]))
+            build(SquareCellGrid, "rect", capped, 4)
+            self.assertLessEqual(sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)), capped.max_bytes)
+            self.assertGreater(capped.stats()["disk_evictions"], 0)
+
+    def test_key_names_the_generation_path(self):
+        # A NumPy path builds another maze for the same seed than the Python loop
+        self.assertEqual(maze_key(ArrayHexGrid(5, 5), Kruskals(1), 0, 1).algorithm, "Kruskals+numpy" if HAVE_NUMPY else "Kruskals")
+        self.assertEqual(maze_key(SquareCellGrid(5, 5), Kruskals(1), 0, 1).algorithm, "Kruskals")
+        self.assertEqual(maze_key(ArrayHexGrid(5, 5), RecursiveBacktracker(1), 0, 1).algorithm, "RecursiveBacktracker")
+
+    def test_other_layout_rebuilds_segments(self):
+        cache = MazeCache()
+        first = build(SquareCellGrid, "rect", cache)
+        key, entry = next(iter(cache._memory.items()))
+        cache.put(key, entry._replace(layout=(0.0,)))  # as if built for another window
+        second = build(SquareCellGrid, "rect", cache)
+        self.assertIsNotNone(second.cached)
+        self.assertEqual(second.renderer._get_segments(0), first.renderer._get_segments(0))
+
+if __name__ == '__main__':
+    unittest.main()
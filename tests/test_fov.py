@@ -0,0 +1,107 @@
+import math
+import random
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+import renderer as renderer_module
+from renderer import MazeRenderer
+from maze_topology import SquareCellGrid, HexCellGrid, PolarCellGrid
+from maze_algorithms import RecursiveBacktracker
+
+def mazes():
+    for GridClass, gtype, shape in ((SquareCellGrid, "rect", "rectangle"), (HexCellGrid, "hex", "rectangle"), (PolarCellGrid, "polar", "circle")):
+        grid = GridClass(9, 12, 1)
+        grid.mask_shape(shape)
+        RecursiveBacktracker(8).generate(grid)
+        renderer = MazeRenderer(grid, 45, gtype, 80, 60)
+        yield gtype, renderer, [renderer.get_pixel(c.row, c.column) for c in list(grid.each_cell())[::30]]
+
+@unittest.skipUnless(renderer_module.np is not None, "NumPy not installed")
+class TestVectorizedRays(unittest.TestCase):
+    def test_matches_python_rays(self):
+        for gtype, renderer, origins in mazes():
+            for rays in (60, 360):
+                for origin in origins:
+                    fast = renderer.fov_polygon(origin, 0, 270, rays)
+                    with patch("renderer.np", None): slow = renderer.fov_polygon(origin, 0, 270, rays)
+                    self.assertEqual(len(fast), rays)
+                    for a, b in zip(fast, slow):
+                        self.assertAlmostEqual(a[0], b[0], places=6, msg=(gtype, origin))
+                        self.assertAlmostEqual(a[1], b[1], places=6, msg=(gtype, origin))
+
+    def test_rays_stop_at_walls(self):
+        grid = SquareCellGrid(1, 3, 1)  # a closed 1x3 corridor
+        grid.get_cell(0, 0, 0).link(grid.get_cell(0, 1, 0)); grid.get_cell(0, 1, 0).link(grid.get_cell(0, 2, 0))
+        renderer = MazeRenderer(grid, 45, "rect", 80, 60)
+        cx, cy = renderer.get_pixel(0, 1)
+        T = renderer.cell_radius * (1.0 - renderer.inset_factor)
+        points = renderer.fov_polygon((cx, cy), 0, 1000, 360)
+        self.assertAlmostEqual(min(p[1] for p in points), cy - 45 + T - 0.4 * T)  # the beam's inner face, pushed in
+        self.assertLessEqual(max(math.hypot(x - cx, y - cy) for x, y in points), math.hypot(135 - T, 45 - T) + 0.4 * T)  # the far corner
+
+    def test_new_geometry_rebuilds_arrays(self):
+        gtype, renderer, origins = next(mazes())
+        self.assertTrue(any(math.hypot(x - origins[0][0], y - origins[0][1]) < 270 for x, y in renderer.fov_polygon(origins[0], 0, 270)))
+        renderer.cache_level_geometry(0, [])  # no walls at all
+        self.assertTrue(all(math.isclose(math.hypot(x - origins[0][0], y - origins[0][1]), 270) for x, y in renderer.fov_polygon(origins[0], 0, 270)))
+
+def boundary(origin, angle, segments):
+    """Distance along a ray from `origin` to the nearest of `segments`, or None."""
+    d = (math.cos(angle), math.sin(angle))
+    hits = [t for p1, p2 in segments if (t := MazeRenderer._ray_segment_intersect(None, origin, d, p1, p2)) is not None]
+    return min(hits) if hits else None
+
+def in_wall(point, polygons):
+    """Whether `point` is inside one of the convex `polygons`."""
+    def sides(poly):
+        return {(q[0] - p[0]) * (point[1] - p[1]) - (q[1] - p[1]) * (point[0] - p[0]) > 0 for p, q in zip(poly, poly[1:] + poly[:1])}
+    return any(len(sides(poly)) == 1 for poly in polygons)
+
+class TestSweepVisibility(unittest.TestCase):
+    def test_wall_outline(self):
+        a, b = ((0, 0), (2, 0), (2, 2), (0, 2)), ((3, 1), (3, 3), (1, 3), (1, 1)) # counter-clockwise, clockwise
+        outline = MazeRenderer._wall_outline([(p[i], p[(i + 1) % 4]) for p in (a, b) for i in range(4)], 1.0)
+        self.assertEqual(len(outline), 8)
+        pieces = [piece for split in outline for piece in split]
+        self.assertAlmostEqual(sum(math.dist(p, q) for p, q in pieces), 12) # the two squares' union, none of the overlap
+        for (x1, y1), (x2, y2) in pieces: # the wall is on the left
+            self.assertTrue(in_wall(((x1 + x2) / 2 - (y2 - y1) * 0.01, (y1 + y2) / 2 + (x2 - x1) * 0.01), (a, b)))
+
+    def test_exact_visibility_polygon(self):
+        rng = random.Random(5)
+        for gtype, renderer, origins in mazes():
+            renderer.precalculate_spatial_data(0)
+            segments, polygons = renderer._get_segments(0), renderer.get_occlusion_polygons(0)
+            pieces = [piece for split in MazeRenderer._wall_outline(segments, renderer.cell_radius) for piece in split]
+            for cx, cy in origins:
+                origin, radius, sides = (cx + rng.uniform(-20, 20), cy + rng.uniform(-20, 20)), rng.choice((100, 270, 500)), rng.choice((7, 60))
+                if in_wall(origin, polygons): continue # the player never stands inside a wall
+                polygon = MazeRenderer._sweep_polygon(origin, pieces, radius, sides, 0.0)
+                ring = [(origin[0] + radius * math.cos(a), origin[1] + radius * math.sin(a)) for a in (-math.pi + 2 * math.pi * i / sides for i in range(sides))]
+                for _ in range(40):  # any direction: the polygon ends at the nearest wall, or at the bounding polygon
+                    angle = rng.uniform(-math.pi, math.pi)
+                    expected = min(t for t in (boundary(origin, angle, segments), boundary(origin, angle, list(zip(ring, ring[1:] + ring[:1])))) if t is not None)
+                    self.assertAlmostEqual(boundary(origin, angle, list(zip(polygon, polygon[1:] + polygon[:1]))), expected, places=6, msg=(gtype, origin, angle))
+
+    def test_engine_switch(self):
+        gtype, renderer, origins = next(mazes())
+        origin = origins[0]
+        sweep = renderer.fov_polygon(origin, 0, 270, 60, engine="sweep")
+        with patch.object(renderer_module.config, "FOV_ENGINE", "sweep"): self.assertEqual(renderer.fov_polygon(origin, 0, 270, 60), sweep)
+        self.assertEqual(len(renderer.fov_polygon(origin, 0, 270, 60, engine="rays")), 60)
+        with self.assertRaises(ValueError): renderer.fov_polygon(origin, 0, 270, engine="cones")
+        # Like the rays' hits, the sweep reaches past the face of every wall it meets, but not through the wall
+        T = renderer.cell_radius * (1.0 - renderer.inset_factor)
+        segments, edges = renderer._get_segments(0), list(zip(sweep, sweep[1:] + sweep[:1]))
+        for i in range(360):
+            angle = math.radians(i + 0.5)
+            hit = boundary(origin, angle, segments)
+            if hit is None or hit > 270 * math.cos(math.pi / 60): continue
+            self.assertTrue(hit <= boundary(origin, angle, edges) <= hit + 2 * T, (angle, hit))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+from renderer import MazeRenderer
+from adventure_engine import AdventureEngine
+from maze_cache import MazeCache
+from maze_pack import MazePack, build_pack, adventure_buckets, maze_metrics, HEADER, BUCKET
+from maze_topology import SquareCellGrid, ArraySquareGrid, ArrayPolarGrid
+from maze_algorithms import MazeGenerator, RecursiveBacktracker, Kruskals
+
+class Broken(MazeGenerator):
+    def generate_step(self, grid):
+        raise RuntimeError("no maze")
+        yield
+
+class TestMazePack(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.pmpk")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pick_reproduces_seeded_maze(self):
+        buckets = [("rect", "rectangle", RecursiveBacktracker, 8, 11, 2, 1.0),
+                   ("rect", "rectangle", RecursiveBacktracker, 12, 15, 2, 4.0),
+                   ("polar", "circle", Kruskals, 9, 12, 1, 1.0),
+                   ("rect", "rectangle", Broken, 8, 11, 1, 1.0)]
+        for workers in (1, 2):
+            self.assertEqual(build_pack(self.path, buckets, 4, workers=workers, seed=5), 12)
+            pack = MazePack(self.path)
+            self.assertIsNone(pack.bucket("rect", "rectangle", "Broken", 3.0))  # every maze failed
+            with open(self.path, "rb") as f:  # the failed bucket is not written at all
+                count = HEADER.unpack(f.read(HEADER.size))[2]
+                table = [BUCKET.unpack(f.read(BUCKET.size)) for _ in range(count)]
+            self.assertEqual([(row[2].rstrip(b"\0"), row[-1]) for row in table],
+                             [(b"RecursiveBacktracker", 4), (b"RecursiveBacktracker", 4), (b"Kruskals", 4)])
+            self.assertIsNone(pack.bucket("rect", "rectangle", "RecursiveBacktracker", 0.5))
+            self.assertEqual(pack.bucket("rect", "rectangle", "RecursiveBacktracker", 3.9).rows, 8)
+            self.assertEqual(pack.bucket("rect", "rectangle", "RecursiveBacktracker", 9.0).rows, 12)
+            for key, Generator, GridClass, shape in ((("rect", "rectangle", "RecursiveBacktracker"), RecursiveBacktracker, ArraySquareGrid, "rectangle"),
+                                                     (("polar", "circle", "Kruskals"), Kruskals, ArrayPolarGrid, "circle")):
+                bucket = pack.buckets[key][0]
+                self.assertEqual(bucket.count, 4)
+                for i in range(bucket.first, bucket.first + bucket.count):
+                    grid, entry = pack.grid(i), pack.entry(i)
+                    self.assertEqual((grid.rows, grid.columns, grid.levels, grid.seed), (bucket.rows, bucket.columns, bucket.levels, entry.seed))
+                    fresh = GridClass(bucket.rows, bucket.columns, bucket.levels)
+                    fresh.mask_shape(shape)
+                    Generator(entry.seed).generate(fresh)
+                    self.assertEqual(bytes(grid.link_bits), bytes(fresh.link_bits))
+                    self.assertEqual(entry[3:], maze_metrics(grid))
+                grid.braid(0.5)  # picked mazes are private copies
+                self.assertNotEqual(bytes(grid.link_bits), bytes(pack.grid(i).link_bits))
+            pack.close()
+
+    def test_engine_plays_pack_mazes(self):
+        build_pack(self.path, adventure_buckets((1, 4)), 2, workers=1, seed=1)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            with patch("maze_cache._shared", MazeCache()):
+                engine = AdventureEngine(1, pack=MazePack(self.path))
+                engine.data["skill_profile"] = {"spatial": 6.0, "perception": 1.0, "structural": 9.0, "efficiency": 2.0, "collection": 1.0}
+                # A fixed bucket: the grid and algorithm are otherwise drawn from the global `random`
+                params = engine.get_next_maze_params(prefer=(SquareCellGrid, Kruskals))
+                grid = params["grid"]
+                self.assertEqual((params["rows"], params["cols"], params["levels"]), AdventureEngine.maze_size(4))
+                self.assertEqual((grid.rows, grid.columns, grid.topology), (params["rows"], params["cols"], params["GridClass"].topology))
+                self.assertEqual(grid.seed, params["seed"])
+
+                job = engine.start_prefetch(20, 0, lambda g: MazeRenderer(g, 45, g.topology, 80, 60))
+                self.assertTrue(job.wait(30))
+                self.assertIsNone(job.error)
+                self.assertEqual(job.stage, "DONE")
+                engine.process_result(20 / 10.0 * 15.0, 50, False, False, 20)
+                self.assertIs(engine.get_next_maze_params()["build_job"], job)
+                engine.pack.close()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == '__main__':
+    unittest.main()
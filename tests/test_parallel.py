@@ -0,0 +1,37 @@
+import unittest
+from src.maze_topology import SquareCellGrid, ArrayHexGrid, ArrayPolarGrid, ArraySquareGrid
+from src.maze_algorithms import Kruskals, RandomizedPrims, RecursiveBacktracker, Wilsons
+from src.maze_analysis import TreeIndex
+from src.maze_parallel import generate_parallel, plan_tiles
+
+def is_perfect(grid):
+    # A single tree: size - 1 passages and every cell reached from one root
+    passages = sum(len(c.get_links()) for c in grid.each_cell()) // 2
+    index = TreeIndex.build(grid)
+    start = next(grid.each_cell())
+    return passages == grid.size() - 1 and index is not None and \
+        all(index.distance(start, c) >= 0 for c in grid.each_cell())
+
+class TestParallelGeneration(unittest.TestCase):
+    def test_tiles_are_even_aligned(self):
+        tiles = plan_tiles(ArraySquareGrid(23, 5, 2), 4)
+        self.assertTrue(all(r % 2 == 0 for _, r, _ in tiles))
+        self.assertEqual(sum(h for _, _, h in tiles), 46)
+
+    def test_perfect_on_every_backend(self):
+        for generator in (Kruskals(), RandomizedPrims(), RecursiveBacktracker(), Wilsons()):
+            for grid, shape in ((SquareCellGrid(13, 16, 2), "circle"), (ArrayHexGrid(14, 12, 2), "triangle"),
+                                (ArrayPolarGrid(23, 30), "triangle")):  # its last band splits in two
+                grid.mask_shape(shape)
+                generate_parallel(grid, generator, workers=1, bands=3, seed=4)
+                self.assertTrue(is_perfect(grid), (type(generator).__name__, type(grid).__name__))
+
+    def test_seed_is_reproducible_across_workers(self):
+        a, b = ArraySquareGrid(16, 16, 2), ArraySquareGrid(16, 16, 2)
+        generate_parallel(a, Wilsons(), workers=1, bands=2, seed=9)
+        generate_parallel(b, Wilsons(), workers=2, bands=2, seed=9)
+        self.assertEqual(a.link_bits, b.link_bits)
+        self.assertTrue(is_perfect(b))
+
+if __name__ == '__main__':
+    unittest.main()
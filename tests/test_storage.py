@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from src.maze_topology import HexCellGrid, PolarCellGrid, ArrayTriGrid
+from src.maze_algorithms import Ellers, Sidewinder, RecursiveBacktracker
+from src.maze_storage import stream_maze, open_grid, save_grid, load_grid
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".pmaz")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def assertSpanningTree(self, grid):
+        edges, seen = 0, set()
+        for i in range(grid.count):
+            if not grid.active_mask[i]: continue
+            for j in grid.linked_indices(i):
+                self.assertIn(i, grid.linked_indices(j))
+                self.assertTrue(grid.active_mask[j])
+                edges += 1
+        start = grid.random_cell().index
+        stack, seen = [start], {start}
+        while stack:
+            for j in grid.linked_indices(stack.pop()):
+                if j not in seen: seen.add(j); stack.append(j)
+        self.assertEqual(edges // 2, grid.size() - 1)
+        self.assertEqual(len(seen), grid.size())
+
+    def test_stream_round_trip(self):
+        for topology in ("rect", "hex", "polar"):
+            for generator in (Ellers, Sidewinder):
+                for shape in ("rectangle", "circle"):
+                    header = stream_maze(self.path, topology, 13, 17, 2, generator, shape)
+                    grid = open_grid(self.path)
+                    self.assertEqual(grid.header, header)
+                    self.assertEqual(grid.topology, topology)
+                    self.assertSpanningTree(grid)
+                    del grid
+
+    def test_mapped_grid_is_read_only(self):
+        stream_maze(self.path, "rect", 4, 5)
+        grid = open_grid(self.path)
+        a, b = grid.get_cell(0, 0), grid.get_cell(0, 1)
+        with self.assertRaises(TypeError):
+            a.unlink(b) if a.is_linked(b) else a.link(b)
+
+    def test_save_load_round_trip(self):
+        for GridClass in (HexCellGrid, PolarCellGrid, ArrayTriGrid):
+            grid = GridClass(9, 12, 2)
+            grid.mask_shape("circle")
+            RecursiveBacktracker().generate(grid)
+            for compress in (False, True):
+                save_grid(grid, self.path, compress=compress, seed=1234)
+                loaded = load_grid(self.path)
+                self.assertEqual((loaded.header.seed, loaded.shape), (1234, "circle"))
+                self.assertEqual(loaded.size(), grid.size())
+                for cell in grid.each_cell():
+                    twin = loaded.get_cell(cell.row, cell.column, cell.level)
+                    self.assertEqual(sorted((n.row, n.column, n.level) for n in twin.get_links()),
+                                     sorted((n.row, n.column, n.level) for n in cell.get_links()))
+                self.assertSpanningTree(loaded)
+        with self.assertRaises(ValueError):
+            open_grid(self.path)  # compressed
+
+    def test_seed_is_recorded(self):
+        first = stream_maze(self.path, "hex", 9, 11, 2, Ellers, "circle", seed=77)
+        links = bytes(open_grid(self.path).link_bits)
+        self.assertEqual(stream_maze(self.path, "hex", 9, 11, 2, Ellers, "circle", seed=77), first)
+        grid = open_grid(self.path)
+        self.assertEqual((grid.seed, bytes(grid.link_bits)), (77, links))
+        del grid
+        grid = HexCellGrid(5, 6)
+        grid.seed = 5
+        RecursiveBacktracker(grid.seed).generate(grid)
+        save_grid(grid, self.path)
+        self.assertEqual(load_grid(self.path).seed, 5)
+
+    def test_tri_cannot_stream(self):
+        with self.assertRaises(ValueError):
+            stream_maze(self.path, "tri", 4, 5)
+
+if __name__ == '__main__':
+    unittest.main()
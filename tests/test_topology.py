@@ -1,5 +1,5 @@
 import unittest
-from src.maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid
+from src.maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid, compact_grid_class
 
 class TestTopology(unittest.TestCase):
     def test_square_grid_neighbors(self):
@@ -35,5 +35,78 @@ class TestTopology(unittest.TestCase):
         self.assertIn(c7, c0.neighbors) # 0 should be connected to 7 (last)
         self.assertIn(c0, c7.neighbors)
 
+    def test_compact_grid_matches_object_grid(self):
+        for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+            grid = GridClass(7, 9, 2)
+            compact = compact_grid_class(GridClass)(7, 9, 2)
+            grid.mask_shape("circle"); compact.mask_shape("circle")
+            coords = lambda cells: [(c.row, c.column, c.level) for c in cells]
+            self.assertEqual(coords(grid.each_cell()), coords(compact.each_cell()))
+            for cell in grid.each_cell():
+                view = compact.get_cell(cell.row, cell.column, cell.level)
+                self.assertEqual(coords(cell.neighbors), coords(view.neighbors))
+
+    def test_compact_grid_links(self):
+        grid = compact_grid_class(PolarCellGrid)(3, 8, 2)
+        a, b = grid.get_cell(1, 0), grid.get_cell(1, 7) # wraps around
+        a.link(b)
+        self.assertTrue(b.is_linked(a))
+        self.assertEqual(a.get_links(), [b])
+        up = grid.get_cell(1, 0, 1)
+        a.link(up)
+        self.assertEqual(set(up.get_links()), {a})
+        self.assertEqual(dict(up.links), {a: True})
+        with self.assertRaises(TypeError):
+            a.links[grid.get_cell(2, 0)] = True  # links change only through link/unlink
+        with self.assertRaises(ValueError):
+            a.link(grid.get_cell(2, 4))  # not adjacent: no wall bit to set
+        a.active = False
+        self.assertEqual(b.get_links(), [])
+        self.assertEqual(up.get_links(), [])
+
+    def test_compact_direction_matches_neighbor_slots(self):
+        for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+            for rows, cols, levels in ((1, 2, 2), (2, 1, 3), (5, 7, 2)):
+                grid = compact_grid_class(GridClass)(rows, cols, levels)
+                for i in range(grid.count):
+                    slots = grid.neighbor_slots(i)
+                    for j in range(grid.count):
+                        self.assertEqual(grid.direction(i, j), next((d for d, n in slots if n == j), -1))
+                    grid.link_bits[i] = sum(1 << d for d, _ in slots)
+                    self.assertEqual(grid.linked_indices(i), [n for _, n in slots])
+
+    def test_active_index_tracks_activity(self):
+        for GridClass in (SquareCellGrid, compact_grid_class(SquareCellGrid)):
+            grid = GridClass(6, 6, 2)
+            self.assertEqual(grid.size(), 72)
+            grid.mask_shape("circle")
+            expected = len(list(grid.each_cell()))
+            self.assertEqual(grid.size(), expected)
+            cell = grid.get_cell(3, 3, 1)
+            cell.active = False
+            self.assertEqual(grid.size(), expected - 1)
+            for _ in range(50):
+                self.assertTrue(grid.random_cell().active)
+            cell.active = True
+            self.assertEqual(grid.size(), expected)
+            level_cells = list(grid.each_cell_in_level(1))
+            self.assertEqual(len(level_cells), expected // 2)
+            self.assertTrue(all(c.level == 1 for c in level_cells))
+
+    def test_planar_distance_is_lattice_distance(self):
+        for GridClass in (SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid):
+            grid = GridClass(7, 10)
+            for src in list(grid.each_cell())[::4]:
+                # BFS over all neighbors: the maze distance with every wall removed
+                dist, frontier = {src: 0}, [src]
+                while frontier:
+                    nxt = []
+                    for cell in frontier:
+                        for n in cell.neighbors:
+                            if n not in dist: dist[n] = dist[cell] + 1; nxt.append(n)
+                    frontier = nxt
+                for cell, d in dist.items():
+                    self.assertEqual(grid.planar_distance(src.row, src.column, cell.row, cell.column), d)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import random
+import unittest
+from src.maze_topology import SquareCellGrid, ArraySquareGrid, ArrayHexGrid, ArrayTriGrid, ArrayPolarGrid
+from src.maze_algorithms import Kruskals, BinaryTree, Sidewinder
+from src.maze_vectorized import HAVE_NUMPY, edge_arrays
+
+def passages(grid):
+    pairs = {(i, j) for i in grid._index() for j in grid.linked_indices(i)}
+    assert all((j, i) in pairs for i, j in pairs), "one-sided wall bit"
+    return len(pairs) // 2
+
+def reached(grid):
+    start = grid._index()[0]
+    seen, stack = {start}, [start]
+    while stack:
+        for j in grid.linked_indices(stack.pop()):
+            if j not in seen: seen.add(j); stack.append(j)
+    return len(seen)
+
+@unittest.skipUnless(HAVE_NUMPY, "NumPy not installed")
+class TestVectorizedGenerators(unittest.TestCase):
+    def setUp(self):
+        random.seed(11)
+
+    def test_edge_arrays_match_neighbors(self):
+        for GridClass in (ArraySquareGrid, ArrayHexGrid, ArrayTriGrid, ArrayPolarGrid):
+            grid = GridClass(7, 8, 2)
+            grid.mask_shape("circle")
+            u, du, v, dv = edge_arrays(grid)
+            expected = {(i, j) for i in grid._index() for _, j in grid.neighbor_slots(i) if i < j and grid.active_mask[j]}
+            self.assertEqual(set(zip(u.tolist(), v.tolist())), expected)
+            for i, d, j, e in zip(u.tolist(), du.tolist(), v.tolist(), dv.tolist()):
+                self.assertEqual((grid.direction(i, j), grid.direction(j, i)), (d, e))
+
+    def test_perfect_mazes(self):
+        for GridClass in (ArraySquareGrid, ArrayHexGrid, ArrayTriGrid, ArrayPolarGrid):
+            for shape in ("rectangle", "circle"):
+                grid = GridClass(11, 13, 3)
+                grid.mask_shape(shape)
+                Kruskals().generate(grid)
+                self.assertEqual(passages(grid), grid.size() - 1)
+                self.assertEqual(reached(grid), grid.size())
+            grid = GridClass(11, 13, 3)  # triangles take the Python loop's real south neighbours
+            Sidewinder().generate(grid)
+            self.assertEqual((passages(grid), reached(grid)), (grid.size() - 1, grid.size()))
+            if GridClass is not ArrayTriGrid:  # rows of triangles have no south neighbour everywhere
+                grid = GridClass(11, 13, 3)
+                BinaryTree().generate(grid)
+                self.assertEqual((passages(grid), reached(grid)), (grid.size() - 1, grid.size()))
+
+    def test_binary_tree_bias(self):
+        grid = ArraySquareGrid(9, 9)
+        BinaryTree().generate(grid)
+        # Every cell but the north-east corner opens north or east, never only south/west
+        for i in grid._index():
+            r, c = divmod(i, 9)
+            ups = [j for j in grid.linked_indices(i) if j < i - 1 or j == i + 1]
+            self.assertEqual(len(ups), 0 if (r, c) == (0, 8) else 1)
+
+    def test_step_stream_builds_the_same_maze(self):
+        for GridClass in (ArraySquareGrid, ArrayHexGrid, ArrayPolarGrid):
+            for Generator in (Kruskals, BinaryTree, Sidewinder):
+                bulk, stepped = GridClass(9, 9, 2), GridClass(9, 9, 2)
+                Generator(5).generate(bulk)
+                steps = list(Generator(5).generate_step(stepped))
+                self.assertEqual(len(steps), passages(bulk))
+                self.assertEqual(bytes(bulk.link_bits), bytes(stepped.link_bits), (GridClass.__name__, Generator.__name__))
+
+class TestObjectGridFallback(unittest.TestCase):
+    def test_kruskal_on_cells(self):
+        grid = SquareCellGrid(2, 2500)  # Cell grids keep the per-cell loop
+        Kruskals().generate(grid)
+        self.assertEqual(sum(len(c.get_links()) for c in grid.each_cell()) // 2, grid.size() - 1)
+
+if __name__ == '__main__':
+    unittest.main()
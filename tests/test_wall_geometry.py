@@ -0,0 +1,77 @@
+import math
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+sys.modules.setdefault("arcade", MagicMock())
+sys.modules.setdefault("arcade.shape_list", MagicMock())
+
+from renderer import MazeRenderer
+from maze_topology import SquareCellGrid, HexCellGrid, TriCellGrid, PolarCellGrid
+from maze_algorithms import RecursiveBacktracker, BinaryTree
+
+def inside(point, poly, eps=1e-6):
+    """Whether `point` lies in the convex polygon `poly`, whichever way it winds."""
+    sides = [(b[0] - a[0]) * (point[1] - a[1]) - (b[1] - a[1]) * (point[0] - a[0]) for a, b in zip(poly, poly[1:] + poly[:1])]
+    return all(c >= -eps for c in sides) or all(c <= eps for c in sides)
+
+def mazes():
+    for GridClass, gtype, shape in ((SquareCellGrid, "rect", "rectangle"), (HexCellGrid, "hex", "rectangle"),
+                                    (TriCellGrid, "tri", "rectangle"), (PolarCellGrid, "polar", "circle")):
+        for Generator in (RecursiveBacktracker, BinaryTree):
+            grid = GridClass(7, 10, 1)
+            grid.mask_shape(shape)
+            Generator(4).generate(grid)
+            yield gtype, MazeRenderer(grid, 45, gtype, 80, 60)
+
+class TestWallMerging(unittest.TestCase):
+    def test_straight_wall_is_one_beam(self):
+        grid = SquareCellGrid(1, 20, 1)
+        for c in range(19): grid.get_cell(0, c, 0).link(grid.get_cell(0, c + 1, 0))
+        renderer = MazeRenderer(grid, 45, "rect", 80, 60)
+        self.assertEqual(len(renderer.get_occlusion_polygons(0, merge=False)), 2 * 21 + 2 * 20 + 2)
+        self.assertEqual(len(renderer.get_occlusion_polygons(0)), 4)  # two long walls, two end walls, no posts
+
+    def test_merged_walls_cover_every_wall(self):
+        for gtype, renderer in mazes():
+            with self.subTest(gtype=gtype):
+                single, merged = renderer.get_occlusion_polygons(0, merge=False), renderer.get_occlusion_polygons(0)
+                self.assertLess(len(merged), len(single))
+                # Watertight: every point of every wall's beam and post is still inside some polygon
+                for poly in single:
+                    cx, cy = sum(p[0] for p in poly) / len(poly), sum(p[1] for p in poly) / len(poly)
+                    for x, y in list(poly) + [(cx, cy)]:
+                        self.assertTrue(any(inside((x, y), m) for m in merged), (x, y))
+                # and no new walls: every merged beam's middle was a wall before
+                for poly in merged:
+                    mx, my = (poly[0][0] + poly[2][0]) / 2, (poly[0][1] + poly[2][1]) / 2
+                    self.assertTrue(any(inside((mx, my), s) for s in single))
+
+    def test_rays_hit_same_walls(self):
+        for gtype, renderer in mazes():
+            if gtype != "rect": continue  # axis-aligned: the merged walls cover exactly the same area
+            single = [seg for poly in renderer.get_occlusion_polygons(0, merge=False) for seg in zip(poly, poly[1:] + poly[:1])]
+            merged = renderer._get_segments(0)
+            self.assertEqual(len(set(merged)), len(merged))
+            for cell in list(renderer.grid.each_cell())[::7]:
+                origin = renderer.get_pixel(cell.row, cell.column)
+                for i in range(0, 360, 15):
+                    d = (math.cos(math.radians(i)), math.sin(math.radians(i)))
+                    hits = [[t for p1, p2 in segs if (t := renderer._ray_segment_intersect(origin, d, p1, p2)) is not None] for segs in (single, merged)]
+                    self.assertAlmostEqual(min(hits[0]), min(hits[1]), places=6)
+
+    def test_spatial_hash_buckets_crossed_cells(self):
+        for gtype, renderer in mazes():
+            renderer.precalculate_spatial_data(0)
+            size = renderer.cell_radius * 4
+            buckets = {}
+            for key, segs in renderer._spatial_segments[0].items():
+                for seg in segs: buckets.setdefault(id(seg), set()).add(key)
+            for seg in renderer._get_segments(0):
+                for k in range(11):  # every point of the segment is in one of its buckets
+                    x = seg[0][0] + (seg[1][0] - seg[0][0]) * k / 10
+                    y = seg[0][1] + (seg[1][1] - seg[0][1]) * k / 10
+                    self.assertIn((int(x // size), int(y // size)), buckets[id(seg)])
+
+if __name__ == '__main__':
+    unittest.main()